@@ -6,8 +6,13 @@ import os
 from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_RESOURCES
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CONF_HOST,
+    CONF_PORT,
+    CONF_RESOURCES,
+    CONF_USERNAME,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
@@ -16,20 +21,29 @@ from . import const
 from .const import (
     ATTR_IMAGE_NAME,
     ATTR_IMAGE_PATH,
+    ATTR_IMAGE_STATUS,
+    ATTR_STALE_SENSORS,
+    CONF_BUDGET_COMMANDS,
+    CONF_BUDGET_CPU_SECONDS,
+    CONF_BUDGET_MEGABYTES,
     CONF_AMAZON_CUSTOM_IMG,
     CONF_AMAZON_CUSTOM_IMG_FILE,
     CONF_AMAZON_DAYS,
     CONF_AMAZON_DOMAIN,
     CONF_AMAZON_FWDS,
+    CONF_CAMERA_STREAM,
+    CONF_FAST_SCAN_INTERVAL,
     CONF_FEDEX_CUSTOM_IMG,
     CONF_FEDEX_CUSTOM_IMG_FILE,
     CONF_GENERIC_CUSTOM_IMG,
     CONF_GENERIC_CUSTOM_IMG_FILE,
     CONF_IMAGE_SECURITY,
+    CONF_IMAGE_WRITE_MODE,
     CONF_IMAP_SECURITY,
     CONF_IMAP_TIMEOUT,
     CONF_PATH,
     CONF_SCAN_INTERVAL,
+    CONF_SLOW_SCAN_INTERVAL,
     CONF_STORAGE,
     CONF_UPS_CUSTOM_IMG,
     CONF_UPS_CUSTOM_IMG_FILE,
@@ -41,20 +55,37 @@ from .const import (
     DEFAULT_AMAZON_CUSTOM_IMG,
     DEFAULT_AMAZON_CUSTOM_IMG_FILE,
     DEFAULT_AMAZON_DAYS,
+    DEFAULT_BUDGET_COMMANDS,
+    DEFAULT_BUDGET_CPU_SECONDS,
+    DEFAULT_BUDGET_MEGABYTES,
+    DEFAULT_CAMERA_STREAM,
+    DEFAULT_FAST_SCAN_INTERVAL,
     DEFAULT_FEDEX_CUSTOM_IMG,
     DEFAULT_FEDEX_CUSTOM_IMG_FILE,
     DEFAULT_GENERIC_CUSTOM_IMG,
     DEFAULT_GENERIC_CUSTOM_IMG_FILE,
+    DEFAULT_IMAGE_WRITE_MODE,
+    DEFAULT_SLOW_SCAN_INTERVAL,
     DEFAULT_UPS_CUSTOM_IMG,
     DEFAULT_UPS_CUSTOM_IMG_FILE,
     DEFAULT_WALMART_CUSTOM_IMG,
     DEFAULT_WALMART_CUSTOM_IMG_FILE,
     DOMAIN,
+    HOST_SCHEDULER,
     ISSUE_URL,
     PLATFORMS,
+    SESSIONS,
+    TIER_FAST,
+    TIER_NORMAL,
+    TIER_SLOW,
     VERSION,
 )
-from .helpers import default_image_path, hash_file, process_emails
+from .helpers import FrameStore, default_image_path, hash_file, process_emails
+from .budget import PollBudget, PollDeadline
+from .image_store import ImageStore
+from .scheduler import HostScheduler
+from .sensor_graph import PollSchedule
+from .sessions import SessionRegistry
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -110,8 +141,21 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     # Variables for data coordinator
     config = config_entry.data
 
+    # Entries polling the same mail server take turns, those on the same
+    # account share their connections
+    if HOST_SCHEDULER not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][HOST_SCHEDULER] = HostScheduler()
+    if SESSIONS not in hass.data[DOMAIN]:
+        hass.data[DOMAIN][SESSIONS] = SessionRegistry()
+
     # Setup the data coordinator
-    coordinator = MailDataUpdateCoordinator(hass, config)
+    coordinator = MailDataUpdateCoordinator(
+        hass,
+        config,
+        hass.data[DOMAIN][HOST_SCHEDULER],
+        hass.data[DOMAIN][SESSIONS],
+        config_entry.entry_id,
+    )
 
     # Fetch initial data so we have data when entities subscribe
     await coordinator.async_refresh()
@@ -156,11 +200,22 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
 
     if unload_ok:
         _LOGGER.debug("Successfully removed sensors from the %s integration", DOMAIN)
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(config_entry.entry_id)
+        await hass.async_add_executor_job(entry_data[COORDINATOR].session.close)
+        entry_data[COORDINATOR].image_store.close()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the images of a deleted entry."""
+    store = ImageStore(
+        f"{hass.config.path()}/{default_image_path(hass, config_entry.data)}",
+        entry_id=config_entry.entry_id,
+    )
+    await hass.async_add_executor_job(store.remove)
+
+
 async def async_migrate_entry(hass, config_entry):
     """Migrate an old config entry."""
     version = config_entry.version
@@ -314,16 +369,51 @@ async def async_migrate_entry(hass, config_entry):
 class MailDataUpdateCoordinator(DataUpdateCoordinator):
     """Class to manage fetching mail data."""
 
-    def __init__(self, hass, config):
+    def __init__(self, hass, config, scheduler=None, sessions=None, entry_id=None):
         """Initialize."""
-        self.interval = timedelta(minutes=config.get(CONF_SCAN_INTERVAL))
+        scan_interval = config.get(CONF_SCAN_INTERVAL)
+        fast = config.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)
+        slow = config.get(CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL)
+        # A tier interval of 0 follows the scanning interval, the slow tier
+        # never polls more often than it
+        self.schedule = PollSchedule(
+            {
+                TIER_FAST: fast or scan_interval,
+                TIER_NORMAL: scan_interval,
+                TIER_SLOW: max(slow, scan_interval),
+            }
+        )
+        self.interval = timedelta(minutes=self.schedule.tick)
+        self.budget = PollBudget(
+            config.get(CONF_BUDGET_COMMANDS, DEFAULT_BUDGET_COMMANDS),
+            config.get(CONF_BUDGET_MEGABYTES, DEFAULT_BUDGET_MEGABYTES),
+            config.get(CONF_BUDGET_CPU_SECONDS, DEFAULT_BUDGET_CPU_SECONDS),
+        )
+        self.scheduler = scheduler if scheduler is not None else HostScheduler()
+        self.breaker = self.scheduler.breaker(config.get(CONF_HOST))
+        sessions = sessions if sessions is not None else SessionRegistry()
+        self.session = sessions.session(
+            config.get(CONF_HOST),
+            config.get(CONF_PORT),
+            config.get(CONF_USERNAME),
+            config.get(CONF_IMAP_SECURITY),
+        )
         self.name = f"Mail and Packages ({config.get(CONF_HOST)})"
         self.timeout = config.get(CONF_IMAP_TIMEOUT)
+        self.deadline = PollDeadline(self.timeout)
         self.config = config
         self.hass = hass
         self._data = {}
         self._file_mtime_cache = {}
         self._hash_cache = {}
+        self.frame_store = None
+        if config.get(CONF_CAMERA_STREAM, DEFAULT_CAMERA_STREAM):
+            self.frame_store = FrameStore()
+        self.image_store = ImageStore(
+            f"{hass.config.path()}/{default_image_path(hass, config)}",
+            config.get(CONF_IMAGE_WRITE_MODE, DEFAULT_IMAGE_WRITE_MODE),
+            entry_id,
+        )
 
         _LOGGER.debug("Data will be update every %s", self.interval)
 
@@ -349,10 +439,28 @@ class MailDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def _async_update_data(self):
         """Fetch data."""
-        async with asyncio.timeout(self.timeout):
+        # The update job keeps to its own deadline, this only stops waiting
+        # for a job that overran it anyway
+        backstop = self.timeout * 2 if self.timeout else None
+        # The first refresh holds up setup, so only later polls are staggered
+        session = self.scheduler.session(
+            self.config.get(CONF_HOST), stagger=bool(self._data)
+        )
+        async with session as queue, asyncio.timeout(backstop):
             try:
                 data = await self.hass.async_add_executor_job(
-                    process_emails, self.hass, self.config
+                    process_emails,
+                    self.hass,
+                    self.config,
+                    self.frame_store,
+                    self.image_store,
+                    self.schedule,
+                    self._publish_stage,
+                    self.budget,
+                    self.deadline,
+                    queue,
+                    self.breaker,
+                    self.session,
                 )
             except Exception as error:
                 _LOGGER.error("Problem updating sensors: %s", error)
@@ -361,10 +469,38 @@ class MailDataUpdateCoordinator(DataUpdateCoordinator):
             if data:
                 self._data = data
                 await self._binary_sensor_update()
+            elif self._data:
+                # Nothing could be fetched, the last values are kept as stale
+                self._data = {
+                    **self._data,
+                    ATTR_STALE_SENSORS: list(self.config.get(CONF_RESOURCES)),
+                }
             return self._data
 
+    def _publish_stage(self, values: dict) -> None:
+        """Publish the sensor values fetched so far during an update.
+
+        Called from the update job, so the data is handed to the event loop
+        """
+        self.hass.loop.call_soon_threadsafe(self._async_publish_stage, values)
+
+    @callback
+    def _async_publish_stage(self, values: dict) -> None:
+        """Update entities with new values before the whole update finishes."""
+        # Entities only exist once the first update finished
+        if not self._data:
+            return
+        self._data = {**self._data, **values}
+        self.async_set_updated_data(self._data)
+
     async def _binary_sensor_update(self):
         """Update binary sensor states."""
+        # The image pipeline already knows which images are placeholders
+        if ATTR_IMAGE_STATUS in self._data:
+            for base_name, status in self._data[ATTR_IMAGE_STATUS].items():
+                self._data[f"{base_name}_update"] = not status["placeholder"]
+            return
+
         # USPS uses different attributes (ATTR_IMAGE_NAME instead of ATTR_*_IMAGE)
         attributes = (ATTR_IMAGE_NAME, ATTR_IMAGE_PATH)
         if set(attributes).issubset(self._data.keys()):
@@ -0,0 +1,140 @@
+"""Circuit breaker for logging into a mail server that keeps failing."""
+
+from __future__ import annotations
+
+import imaplib
+import logging
+import random
+import threading
+import time
+
+from .const import LOGIN_BACKOFF, LOGIN_MAX_BACKOFF
+
+_LOGGER = logging.getLogger(__name__)
+
+AUTH = "auth"
+NETWORK = "network"
+THROTTLE = "throttle"
+# Words of the errors mail servers give when they limit connections
+THROTTLE_WORDS = (
+    "throttl",
+    "too many",
+    "rate limit",
+    "try again later",
+    "[limit]",
+    "[unavailable]",
+)
+
+
+def failure_kind(err: Exception, default: str) -> str:
+    """Return the kind of a login failure, default if it is not obvious."""
+    text = str(err).lower()
+    if any(word in text for word in THROTTLE_WORDS):
+        return THROTTLE
+    if isinstance(err, (OSError, imaplib.IMAP4.abort)):
+        return NETWORK
+    return default
+
+
+class _Circuit:
+    """Failures in a row and when the next attempt is allowed."""
+
+    def __init__(self) -> None:
+        """Initialize a closed circuit."""
+        self.failures = 0
+        self.kind = None
+        self.open_until = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """Stop logging into a mail server that keeps failing.
+
+    A network or throttling failure opens the circuit of the host, for every
+    entry using it; a rejected login only opens that of the account. While
+    open no login is attempted until the backoff has passed: LOGIN_BACKOFF
+    for the kind of failure, doubled for every failure in a row up to
+    LOGIN_MAX_BACKOFF, plus up to a quarter more at random. The circuit is
+    then half open and one poll probes the server, closing it on success or
+    opening it again for longer on failure.
+    """
+
+    def __init__(self, host: str) -> None:
+        """Initialize the breaker of a host."""
+        self.host = host
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def allow(self, user: str, now: float = None) -> bool:
+        """Return True if a login may be attempted for an account."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            circuits = [
+                self._circuits[key] for key in (None, user) if key in self._circuits
+            ]
+            for circuit in circuits:
+                if now < circuit.open_until or circuit.probing:
+                    _LOGGER.debug(
+                        "Not logging into %s after a %s failure for %.0f seconds",
+                        self.host,
+                        circuit.kind,
+                        max(0.0, circuit.open_until - now),
+                    )
+                    return False
+            for circuit in circuits:
+                _LOGGER.debug("Probing %s after a %s failure", self.host, circuit.kind)
+                circuit.probing = True
+        return True
+
+    def success(self, user: str) -> None:
+        """Close the circuits of the host and the account."""
+        with self._lock:
+            self._circuits.pop(None, None)
+            self._circuits.pop(user, None)
+
+    def failure(self, user: str, kind: str, now: float = None) -> float:
+        """Open the circuit a failure belongs to.
+
+        Returns the seconds until the next attempt
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # The probe is over whatever failed, the host or the account
+            for key in (None, user):
+                if key in self._circuits:
+                    self._circuits[key].probing = False
+            circuit = self._circuits.setdefault(
+                user if kind == AUTH else None, _Circuit()
+            )
+            circuit.failures += 1
+            circuit.kind = kind
+            backoff = min(
+                LOGIN_MAX_BACKOFF, LOGIN_BACKOFF[kind] * 2 ** (circuit.failures - 1)
+            )
+            backoff += random.uniform(0, backoff / 4)  # nosec
+            circuit.open_until = now + backoff
+        _LOGGER.warning(
+            "Login to %s failed (%s), not retrying for %.0f seconds",
+            self.host,
+            kind,
+            backoff,
+        )
+        return backoff
+
+    def report(self, user: str, now: float = None) -> dict:
+        """Return the state of the circuit of an account."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            circuits = [
+                self._circuits[key] for key in (None, user) if key in self._circuits
+            ]
+        if not circuits:
+            return {"state": "closed", "kind": None, "failures": 0, "retry_in": 0}
+        circuit = max(circuits, key=lambda circuit: circuit.open_until)
+        retry_in = max(0.0, circuit.open_until - now)
+        return {
+            "state": "open" if retry_in else "half_open",
+            "kind": circuit.kind,
+            "failures": circuit.failures,
+            "retry_in": round(retry_in),
+        }
@@ -0,0 +1,191 @@
+"""What one poll of the mail server may spend, and for how long."""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from .scheduler import HostQueue
+
+_LOGGER = logging.getLogger(__name__)
+
+# IMAP commands that go to the server and back
+COMMANDS = frozenset(("fetch", "list", "noop", "search", "select", "status", "uid"))
+# Shortest socket timeout given to a stage that still has time left
+MIN_SOCKET_TIMEOUT = 1
+
+
+def response_size(value: Any) -> int:
+    """Return the number of bytes in an IMAP response."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(response_size(item) for item in value)
+    return 0
+
+
+class PollBudget:
+    """Count the round trips, bytes and CPU time of a poll against limits.
+
+    A limit of 0 is no limit. Once any limit is reached, optional work such
+    as delivery photos, tracking numbers and the delivered-by-others scan is
+    deferred to the next poll; counts are always fetched.
+    """
+
+    def __init__(
+        self, commands: int = 0, megabytes: int = 0, cpu_seconds: int = 0
+    ) -> None:
+        """Initialize the budget with its limits."""
+        self.limits = {
+            "commands": commands,
+            "bytes": megabytes * 1024 * 1024,
+            "cpu_seconds": cpu_seconds,
+        }
+        self.commands = 0
+        self.bytes = 0
+        self.deferred = []
+        self.denied = 0
+        self._cpu_start = time.thread_time()
+
+    def begin_poll(self) -> None:
+        """Reset the counters for a new poll, run from the update job thread."""
+        self.commands = 0
+        self.bytes = 0
+        self.deferred = []
+        self.denied = 0
+        self._cpu_start = time.thread_time()
+
+    @property
+    def cpu_seconds(self) -> float:
+        """Return the CPU time the update job used this poll."""
+        return time.thread_time() - self._cpu_start
+
+    def count(self, commands: int = 1, size: int = 0) -> None:
+        """Count round trips to the mail server and the bytes they returned."""
+        self.commands += commands
+        self.bytes += size
+
+    def exceeded(self) -> list:
+        """Return the limits reached this poll."""
+        used = {
+            "commands": self.commands,
+            "bytes": self.bytes,
+            "cpu_seconds": self.cpu_seconds,
+        }
+        return [
+            name for name, limit in self.limits.items() if limit and used[name] >= limit
+        ]
+
+    def allows(self, work: str) -> bool:
+        """Return True if there is budget left for optional work.
+
+        Work that is not allowed is remembered as deferred to the next poll
+        """
+        exceeded = self.exceeded()
+        if not exceeded:
+            return True
+        self.denied += 1
+        if work not in self.deferred:
+            _LOGGER.info(
+                "Poll budget reached (%s), deferring %s to the next poll",
+                ", ".join(exceeded),
+                work,
+            )
+            self.deferred.append(work)
+        return False
+
+    def report(self) -> dict:
+        """Return what the poll used and what it deferred."""
+        return {
+            "commands": self.commands,
+            "bytes": self.bytes,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "limits": dict(self.limits),
+            "degraded": bool(self.deferred),
+            "deferred": list(self.deferred),
+        }
+
+
+class PollDeadline:
+    """Deadline of a poll, enforced inside the update job.
+
+    Each stage of the poll (login, folder selection, every sensor and the
+    image work) only starts while there is time left, with the socket
+    timeout cut to that time so a stuck server can not hold it past the
+    deadline. A deadline of None is no deadline.
+    """
+
+    def __init__(self, seconds: float | None) -> None:
+        """Initialize the deadline with the time a poll may take."""
+        self.seconds = seconds
+        self._end = None
+
+    def begin_poll(self) -> None:
+        """Start the clock for a new poll."""
+        if self.seconds:
+            self._end = time.monotonic() + self.seconds
+
+    def remaining(self) -> float | None:
+        """Return the seconds left for the poll, None without a deadline."""
+        if self._end is None:
+            return None
+        return max(0.0, self._end - time.monotonic())
+
+    def expired(self) -> bool:
+        """Return True once the deadline has passed."""
+        return self.remaining() == 0
+
+    def limit(self, account: Any) -> bool:
+        """Cut the socket timeout of the account to the time left.
+
+        Returns False if the deadline has passed
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        if remaining == 0:
+            return False
+        try:
+            account.sock.settimeout(max(remaining, MIN_SOCKET_TIMEOUT))
+        except (AttributeError, OSError) as err:
+            _LOGGER.debug("Unable to set the socket timeout: %s", err)
+        return True
+
+
+class MeteredAccount:
+    """IMAP account that counts every command of a poll against a budget.
+
+    With a queue, each command first waits for its turn on the mail server.
+    """
+
+    def __init__(
+        self, account: Any, budget: PollBudget | None, queue: HostQueue | None = None
+    ) -> None:
+        """Wrap an IMAP account."""
+        object.__setattr__(self, "_account", account)
+        object.__setattr__(self, "_budget", budget)
+        object.__setattr__(self, "_queue", queue)
+
+    def __getattr__(self, name: str) -> Any:
+        """Return an attribute of the account, commands are counted."""
+        value = getattr(self._account, name)
+        if name not in COMMANDS:
+            return value
+
+        def command(*args: Any, **kwargs: Any) -> Any:
+            if self._queue is not None:
+                self._queue.command()
+            response = None
+            try:
+                response = value(*args, **kwargs)
+            finally:
+                if self._budget is not None:
+                    self._budget.count(1, response_size(response))
+            return response
+
+        return command
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute on the account, such as the next literal."""
+        setattr(self._account, name, value)
@@ -2,26 +2,37 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
+from collections import OrderedDict
 
 import voluptuous as vol
-from homeassistant.components.camera import Camera
+from aiohttp import web
+from homeassistant.components.camera import Camera, async_get_still_stream
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_ENTITY_ID, CONF_HOST
 from homeassistant.core import ServiceCall
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from . import const
-from .helpers import generate_delivery_gif
+from .helpers import (
+    camera_file_paths,
+    custom_no_mail_image,
+    generate_delivery_gif,
+    image_content_type,
+    image_extension,
+    resize_image_bytes,
+)
 from .const import (
-    ATTR_IMAGE_NAME,
-    ATTR_IMAGE_PATH,
+    ATTR_CAMERA_PATHS,
     CAMERA,
+    CAMERA_CACHE_BYTES,
     CAMERA_DATA,
-    CONF_CUSTOM_IMG,
-    CONF_CUSTOM_IMG_FILE,
+    CAMERA_THUMBNAIL_CACHE_BYTES,
+    CONF_CAMERA_STREAM,
     COORDINATOR,
+    DEFAULT_CAMERA_STREAM,
+    DEFAULT_DELIVERY_FRAME_DURATION,
     DOMAIN,
     SENSOR_NAME,
     VERSION,
@@ -31,6 +42,60 @@ SERVICE_UPDATE_IMAGE = "update_image"
 _LOGGER = logging.getLogger(__name__)
 
 
+class ImageCache:
+    """Least recently used cache of image bytes bounded by total size.
+
+    Entries are keyed by (path, mtime, size) so a file that changes on disk
+    is never served stale, the stat result acts as the validator.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """Initialize the cache."""
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: tuple) -> bytes | None:
+        """Return cached bytes for key, marking them as recently used."""
+        image = self._entries.get(key)
+        if image is not None:
+            self._entries.move_to_end(key)
+        return image
+
+    def put(self, key: tuple, image: bytes) -> None:
+        """Store image bytes, evicting the least recently used entries."""
+        if len(image) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= len(self._entries.pop(key))
+        self._entries[key] = image
+        self._bytes += len(image)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def invalidate(self, path: str) -> None:
+        """Drop every entry whose key starts with path."""
+        for key in [key for key in self._entries if key[0] == path]:
+            self._bytes -= len(self._entries.pop(key))
+
+
+_IMAGE_CACHE = ImageCache(CAMERA_CACHE_BYTES)
+# Resized variants keyed by (source hash, width, height)
+_THUMBNAIL_CACHE = ImageCache(CAMERA_THUMBNAIL_CACHE_BYTES)
+
+
+def _image_digest(image: bytes) -> str:
+    """Return the hash identifying image contents."""
+    return hashlib.sha1(image).hexdigest()  # nosec
+
+
+def _read_image(file_path: str) -> bytes:
+    """Return the contents of an image file."""
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
 async def async_setup_entry(hass, config, async_add_entities):
     """Set up the Camera that works with local files."""
     if CAMERA not in hass.data[DOMAIN][config.entry_id]:
@@ -99,44 +164,27 @@ class MailCam(CoordinatorEntity, Camera):
         self._host = config.data.get(CONF_HOST)
         self._unique_id = config.entry_id
 
-        # Derive config keys and default image from camera type name
         # Remove "_camera" suffix to get base name (e.g., "usps_camera" -> "usps")
         base_name = self._type.replace("_camera", "")
-
-        # USPS uses special config keys (no prefix), others use prefixed keys
         if base_name == "usps":
-            custom_img_key = CONF_CUSTOM_IMG
-            custom_img_file_key = CONF_CUSTOM_IMG_FILE
             default_image = "mail_none.gif"
         else:
-            # Derive config key names dynamically (e.g., "amazon" -> CONF_AMAZON_CUSTOM_IMG)
-            custom_img_key = getattr(
-                const, f"CONF_{base_name.upper()}_CUSTOM_IMG", None
-            )
-            custom_img_file_key = getattr(
-                const, f"CONF_{base_name.upper()}_CUSTOM_IMG_FILE", None
-            )
             default_image = f"no_deliveries_{base_name}.jpg"
 
-        # Set custom image paths
-        self._no_mail = None
-        if custom_img_key and config.data.get(custom_img_key):
-            self._no_mail = config.data.get(custom_img_file_key)
-            _LOGGER.debug(
-                "%s camera - custom image enabled: %s", self._type, self._no_mail
-            )
-
         # Set initial file path based on camera type and custom settings
-        if custom_img_key and config.data.get(custom_img_key):
-            self._file_path = config.data.get(custom_img_file_key)
+        self._no_mail = custom_no_mail_image(config.data, base_name)
+        if self._no_mail:
+            self._file_path = self._no_mail
             _LOGGER.debug(
-                "%s camera - initial file path set to: %s",
-                self._type,
-                self._file_path,
+                "%s camera - custom image enabled: %s", self._type, self._no_mail
             )
         else:
             self._file_path = f"{os.path.dirname(__file__)}/{default_image}"
 
+        self._stream = config.data.get(CONF_CAMERA_STREAM, DEFAULT_CAMERA_STREAM)
+        self._source_digest = (None, None)
+        self._camera_paths = None
+
     async def async_camera_image(
         self, width: int | None = None, height: int | None = None
     ) -> bytes | None:
@@ -144,9 +192,22 @@ class MailCam(CoordinatorEntity, Camera):
         _LOGGER.debug(
             "Camera %s attempting to read image from: %s", self._name, self._file_path
         )
+        file_path = self._file_path
         try:
-            file = await self.hass.async_add_executor_job(open, self._file_path, "rb")
-            return file.read()
+            stat = await self.hass.async_add_executor_job(os.stat, file_path)
+            key = (file_path, stat.st_mtime_ns, stat.st_size)
+            image = _IMAGE_CACHE.get(key)
+            if image is None:
+                image = await self.hass.async_add_executor_job(_read_image, file_path)
+                if image:
+                    _IMAGE_CACHE.invalidate(file_path)
+                    _IMAGE_CACHE.put(key, image)
+            else:
+                _LOGGER.debug("Camera %s image unchanged, using cache", self._name)
+            if image and (width or height):
+                image = await self._async_thumbnail(key, image, width, height)
+            self.content_type = image_content_type(image)
+            return image
         except FileNotFoundError:
             _LOGGER.info(
                 "Could not read camera %s image from file: %s",
@@ -154,16 +215,63 @@ class MailCam(CoordinatorEntity, Camera):
                 self._file_path,
             )
 
-    def check_file_path_access(self, file_path: str) -> None:
-        """Check that filepath given is readable."""
-        if not os.access(file_path, os.R_OK):
-            _LOGGER.info(
-                "Could not read camera %s image from file: %s", self._name, file_path
+    async def handle_async_mjpeg_stream(
+        self, request: web.Request
+    ) -> web.StreamResponse | None:
+        """Serve the stored frames as an MJPEG stream in stream mode."""
+        frame_store = self.coordinator.frame_store if self._stream else None
+        if frame_store is None or not frame_store.get(self._type)[0]:
+            return await super().handle_async_mjpeg_stream(request)
+
+        position = -1
+
+        async def _next_frame() -> bytes | None:
+            """Return the next frame, picking up new frames as they arrive."""
+            nonlocal position
+            frames = frame_store.get(self._type)[0]
+            if not frames:
+                return await self.async_camera_image()
+            position = (position + 1) % len(frames)
+            return frames[position]
+
+        _LOGGER.debug("Camera %s serving MJPEG stream", self._name)
+        return await async_get_still_stream(
+            request, _next_frame, "image/jpeg", frame_store.get(self._type)[1]
+        )
+
+    async def _async_thumbnail(
+        self, key: tuple, image: bytes, width: int | None, height: int | None
+    ) -> bytes:
+        """Return image downscaled to the requested size, cached per source."""
+        if self._source_digest[0] != key:
+            digest = await self.hass.async_add_executor_job(_image_digest, image)
+            if self._source_digest[1] not in (None, digest):
+                _THUMBNAIL_CACHE.invalidate(self._source_digest[1])
+            self._source_digest = (key, digest)
+
+        thumbnail_key = (self._source_digest[1], width, height)
+        thumbnail = _THUMBNAIL_CACHE.get(thumbnail_key)
+        if thumbnail is None:
+            try:
+                thumbnail = await self.hass.async_add_executor_job(
+                    resize_image_bytes, image, width, height
+                )
+            except Exception as err:
+                _LOGGER.debug("Camera %s unable to resize image: %s", self._name, err)
+                return image
+            _THUMBNAIL_CACHE.put(thumbnail_key, thumbnail)
+            _LOGGER.debug(
+                "Camera %s image resized for %sx%s: %s -> %s bytes",
+                self._name,
+                width,
+                height,
+                len(image),
+                len(thumbnail),
             )
+        return thumbnail
 
-    # pylint: disable=too-many-nested-blocks
     async def update_file_path(self) -> None:
-        """Update the file_path."""
+        """Update the file_path from the camera paths published with the data."""
         _LOGGER.debug("Camera Update: %s", self._type)
         _LOGGER.debug("Custom No Mail: %s", self._no_mail)
 
@@ -175,345 +283,64 @@ class MailCam(CoordinatorEntity, Camera):
             _LOGGER.debug("Unable to update camera image, no data.")
             return
 
-        # Derive base name from camera type (e.g., "amazon_camera" -> "amazon")
-        base_name = self._type.replace("_camera", "")
-
-        if self._type == "usps_camera":
-            # Update camera image for USPS informed delivery images
-            self._file_path = f"{os.path.dirname(__file__)}/mail_none.gif"
-            s1 = set([ATTR_IMAGE_NAME, ATTR_IMAGE_PATH])
-            if s1.issubset(self.coordinator.data.keys()):
-                image = self.coordinator.data[ATTR_IMAGE_NAME]
-                path = self.coordinator.data[ATTR_IMAGE_PATH]
-                self._file_path = f"{self.hass.config.path()}/{path}{image}"
-            else:
-                if self._no_mail:
-                    self._file_path = self._no_mail
-
-        elif self._type == "generic_camera":
-            # Update camera image for generic package deliveries
-            self._file_path = f"{os.path.dirname(__file__)}/no_deliveries_generic.jpg"
-
-            # Check if custom image is configured for generic camera
-            if self._no_mail:
-                # Use custom image (takes priority over everything)
-                self._file_path = self._no_mail
-                _LOGGER.debug(
-                    "Generic camera - using custom no mail: %s", self._file_path
-                )
-            else:
-                # Collect all delivery images from different cameras to create an animated GIF
-                delivery_images = []
-
-                # Get enabled resources from config
-                enabled_resources = self.config.data.get("resources", [])
-
-                # Loop through all cameras in CAMERA_DATA, skipping generic and USPS
-                for camera_type in CAMERA_DATA:
-                    # Skip generic camera (we're the generic camera) and USPS camera
-                    if camera_type in ("generic_camera", "usps_camera"):
-                        continue
-
-                    # Extract the base name from camera_type (e.g., "amazon_camera" -> "amazon")
-                    base_name = camera_type.replace("_camera", "")
-
-                    # Check if this camera's sensor is enabled in the configuration
-                    sensor_name = self._get_sensor_name_for_camera(camera_type)
-                    if sensor_name and sensor_name not in enabled_resources:
-                        _LOGGER.debug(
-                            "Generic camera - skipping %s (sensor %s not enabled)",
-                            base_name,
-                            sensor_name,
-                        )
-                        continue
-
-                    # Set image attributes (UPS, Amazon, Walmart all use the same pattern)
-                    image_attr_name = f"ATTR_{base_name.upper()}_IMAGE"
-
-                    image_attr = getattr(const, image_attr_name, None)
-                    path_suffix = f"{base_name}/"  # All cameras have subdirectory
-                    no_mail_check = "no_deliveries"  # All cameras default no mail
-
-                    if image_attr is not None:
-                        # Check if this camera's image data is available
-                        required_keys = set([image_attr, ATTR_IMAGE_PATH])
-                        if required_keys.issubset(self.coordinator.data.keys()):
-                            image = self.coordinator.data[image_attr]
-                            path = (
-                                f"{self.coordinator.data[ATTR_IMAGE_PATH]}{path_suffix}"
-                            )
-                            delivery_file_path = (
-                                f"{self.hass.config.path()}/{path}{image}"
-                            )
-
-                            # Check if not a "no mail" image (default or custom)
-                            # and file exists
-                            is_no_mail = image.startswith(
-                                no_mail_check
-                            ) or self._is_custom_no_mail_image(  # Default no mail images
-                                base_name, delivery_file_path
-                            )  # Custom no mail images
-
-                            # Check if there are actual current deliveries for this carrier
-                            delivery_count_key = f"{base_name}_delivered"
-                            has_current_deliveries = (
-                                delivery_count_key in self.coordinator.data
-                                and self.coordinator.data[delivery_count_key] > 0
-                            )
-
-                            if (
-                                not is_no_mail
-                                and os.path.exists(delivery_file_path)
-                                and has_current_deliveries
-                            ):
-                                delivery_images.append(delivery_file_path)
-                            elif is_no_mail:
-                                _LOGGER.debug(
-                                    "Generic camera - filtered out %s no-mail image: %s",
-                                    base_name,
-                                    image,
-                                )
-                            elif not has_current_deliveries:
-                                _LOGGER.debug(
-                                    "Generic camera - filtered out %s "
-                                    "(no current deliveries, count=%s): %s",
-                                    base_name,
-                                    self.coordinator.data.get(delivery_count_key, 0),
-                                    image,
-                                )
-
-                # Create animated GIF if we have multiple delivery images
-                if len(delivery_images) > 0:
-                    gif_path = f"{os.path.dirname(__file__)}/generic_deliveries.gif"
-
-                    # Generate animated GIF using helper function
-                    gif_created = await generate_delivery_gif(delivery_images, gif_path)
-
-                    if gif_created:
-                        self._file_path = gif_path
-                        _LOGGER.debug(
-                            "Generic camera - created animated GIF with %d delivery images",
-                            len(delivery_images),
-                        )
-                    else:
-                        _LOGGER.warning(
-                            "Failed to create animated GIF, using first delivery image"
-                        )
-                        self._file_path = delivery_images[0]
-                else:
-                    # No deliveries found, use default generic no mail image
-                    _LOGGER.debug(
-                        "Generic camera - no deliveries found, using default: %s",
-                        self._file_path,
-                    )
-
-        else:
-            # Handle generic delivery cameras (Amazon, UPS, Walmart, FedEx) with unified logic
-            # Set default image path
-            self._file_path = (
-                f"{os.path.dirname(__file__)}/no_deliveries_{base_name}.jpg"
+        previous_path = self._file_path
+        camera_paths = self.coordinator.data.get(ATTR_CAMERA_PATHS)
+        if camera_paths is None:
+            # Data that was not published by a poll, check the paths here
+            camera_paths = await self.hass.async_add_executor_job(
+                camera_file_paths, self.hass, self.config.data, self.coordinator.data
             )
+        camera_path = camera_paths.get(self._type, {})
+        self._file_path = camera_path.get("path", self._file_path)
 
-            # Check if custom image is configured
-            if self._no_mail:
-                # Use custom image (takes priority over everything)
-                self._file_path = self._no_mail
-                _LOGGER.debug(
-                    "%s camera - using custom no mail: %s", self._type, self._file_path
-                )
-            else:
-                # Use coordinator data (actual deliveries or generated "no delivery" images)
-                image_attr_name = f"ATTR_{base_name.upper()}_IMAGE"
-                image_attr = getattr(const, image_attr_name, None)
-                if image_attr:
-                    required_keys = set([image_attr, ATTR_IMAGE_PATH])
-                    if required_keys.issubset(self.coordinator.data.keys()):
-                        image = self.coordinator.data[image_attr]
-                        # Normalize image_path to avoid double slashes
-                        image_path = (
-                            self.coordinator.data[ATTR_IMAGE_PATH].rstrip("/") + "/"
-                        )
-                        path = f"{image_path}{base_name}/"
-                        coordinator_file_path = (
-                            f"{self.hass.config.path()}/{path}{image}"
-                        )
-                        _LOGGER.info(
-                            "=== %s CAMERA UPDATE === coordinator %s = '%s'",
-                            self._type,
-                            image_attr,
-                            image,
-                        )
-                        _LOGGER.info(
-                            "%s camera - checking for file: %s",
-                            self._type,
-                            coordinator_file_path,
-                        )
-                        # Log all image-related keys in coordinator for this camera
-                        all_image_keys = {
-                            k: self.coordinator.data.get(k, "NOT SET")
-                            for k in self.coordinator.data.keys()
-                            if "image" in k.lower()
-                        }
-                        _LOGGER.info(
-                            "%s camera - All image keys in coordinator: %s",
-                            self._type,
-                            all_image_keys,
-                        )
-                        # Verify file exists before using it, fall back to default if not
-                        if os.path.exists(coordinator_file_path) and os.access(
-                            coordinator_file_path, os.R_OK
-                        ):
-                            self._file_path = coordinator_file_path
-                            _LOGGER.debug(
-                                "%s camera - found coordinator file: %s",
-                                self._type,
-                                self._file_path,
-                            )
-                        else:
-                            _LOGGER.warning(
-                                "%s camera - coordinator file not found or "
-                                "not readable: %s (exists: %s, readable: %s)",
-                                self._type,
-                                coordinator_file_path,
-                                os.path.exists(coordinator_file_path),
-                                (
-                                    os.access(coordinator_file_path, os.R_OK)
-                                    if os.path.exists(coordinator_file_path)
-                                    else False
-                                ),
-                            )
-                            # List directory contents for debugging
-                            path_dir = os.path.dirname(coordinator_file_path)
-                            _LOGGER.warning(
-                                "%s camera - Directory path: %s (exists: %s)",
-                                self._type,
-                                path_dir,
-                                os.path.exists(path_dir),
-                            )
-                            if os.path.exists(path_dir):
-                                try:
-                                    files_in_dir = os.listdir(path_dir)
-                                    _LOGGER.warning(
-                                        "%s camera - directory exists, files found: %s",
-                                        self._type,
-                                        files_in_dir,
-                                    )
-                                    _LOGGER.warning(
-                                        "%s camera - Expected file '%s' in directory: %s",
-                                        self._type,
-                                        image,
-                                        (
-                                            image in files_in_dir
-                                            if files_in_dir
-                                            else False
-                                        ),
-                                    )
-                                    # Try to find any image file in the directory
-                                    # if the expected one isn't there
-                                    # Prefer the most recent file (by modification
-                                    # time) to show latest delivery
-                                    image_files = []
-                                    for file in files_in_dir:
-                                        if file.endswith(
-                                            (".jpg", ".jpeg", ".png", ".gif")
-                                        ):
-                                            potential_file = os.path.join(
-                                                path_dir, file
-                                            )
-                                            if os.path.exists(
-                                                potential_file
-                                            ) and os.access(potential_file, os.R_OK):
-                                                # Skip "no_deliveries" default images
-                                                if "no_deliveries" not in file:
-                                                    image_files.append(
-                                                        (
-                                                            potential_file,
-                                                            os.path.getmtime(
-                                                                potential_file
-                                                            ),
-                                                        )
-                                                    )
-                                    if image_files:
-                                        # Sort by modification time (most recent first)
-                                        image_files.sort(
-                                            key=lambda x: x[1], reverse=True
-                                        )
-                                        self._file_path = image_files[0][0]
-                                        _LOGGER.debug(
-                                            "%s camera - found alternative "
-                                            "image file (most recent): %s",
-                                            self._type,
-                                            self._file_path,
-                                        )
-                                except Exception as err:
-                                    _LOGGER.debug(
-                                        "%s camera - error listing directory %s: %s",
-                                        self._type,
-                                        path_dir,
-                                        err,
-                                    )
-                            else:
-                                _LOGGER.warning(
-                                    "%s camera - directory does not exist: %s",
-                                    self._type,
-                                    path_dir,
-                                )
-
-        self.check_file_path_access(self._file_path)
-        self.async_write_ha_state()
-
-    def _is_custom_no_mail_image(self, base_name: str, file_path: str) -> bool:
-        """Check if the given file path is a custom 'no mail' image for the specified camera.
-
-        Args:
-            base_name: The base name of the camera (e.g., 'amazon', 'ups', 'walmart', 'usps')
-            file_path: The full file path to check
+        if self._type == "generic_camera":
+            await self._async_update_generic(camera_path.get("images", []))
 
-        Returns:
-            True if this is a custom 'no mail' image, False otherwise
-        """
-        # Handle USPS camera differently (uses CONF_CUSTOM_IMG instead of CONF_USPS_CUSTOM_IMG)
-        if base_name == "usps":
-            custom_img_key = "CONF_CUSTOM_IMG"
-            custom_img_file_key = "CONF_CUSTOM_IMG_FILE"
-        else:
-            # Handle other cameras (Amazon, UPS, Walmart)
-            custom_img_key = f"CONF_{base_name.upper()}_CUSTOM_IMG"
-            custom_img_file_key = f"CONF_{base_name.upper()}_CUSTOM_IMG_FILE"
-
-        custom_img_conf = getattr(const, custom_img_key, None)
-        custom_img_file_conf = getattr(const, custom_img_file_key, None)
-
-        if (
-            custom_img_conf
-            and custom_img_file_conf
-            and self.config.data.get(custom_img_conf)
-        ):
-            custom_file_path = self.config.data.get(custom_img_file_conf)
-            if custom_file_path and os.path.exists(custom_file_path):
-                # Check if the file path matches the custom "no mail" image
-                return os.path.abspath(file_path) == os.path.abspath(custom_file_path)
+        if previous_path != self._file_path:
+            _IMAGE_CACHE.invalidate(previous_path)
 
-        return False
+        self.async_write_ha_state()
 
-    def _get_sensor_name_for_camera(self, camera_type: str) -> str:
-        """Get the sensor name that corresponds to a camera type.
+    async def _async_update_generic(self, delivery_images: list) -> None:
+        """Animate or stream the delivery images of the generic camera."""
+        frame_store = self.coordinator.frame_store if self._stream else None
+        if frame_store is not None:
+            frame_store.clear(self._type)
 
-        Args:
-            camera_type: The camera type (e.g., 'amazon_camera', 'ups_camera', etc.)
+        if not delivery_images:
+            return
 
-        Returns:
-            The corresponding sensor name, or None if no mapping exists
-        """
-        # Extract base name from camera type (e.g., "amazon_camera" -> "amazon")
-        base_name = camera_type.split("_")[0]
+        # In stream mode the delivery photos become stream frames and
+        # the first one is served as the still image
+        if frame_store is not None:
+            await self.hass.async_add_executor_job(
+                frame_store.load,
+                self._type,
+                delivery_images,
+                DEFAULT_DELIVERY_FRAME_DURATION,
+            )
+            self._file_path = delivery_images[0]
+            _LOGGER.debug(
+                "Generic camera - streaming %d delivery images",
+                len(delivery_images),
+            )
+            return
 
-        # Special case for USPS (uses usps_mail instead of usps_delivered)
-        if base_name == "usps":
-            return "usps_mail"
+        gif_path = (
+            f"{os.path.dirname(__file__)}/generic_deliveries"
+            f"{image_extension(self.config.data)}"
+        )
 
-        # For other cameras, use the pattern: {base_name}_delivered
-        return f"{base_name}_delivered"
+        # Generate animated GIF using helper function
+        if await generate_delivery_gif(self.hass, delivery_images, gif_path):
+            self._file_path = gif_path
+            _LOGGER.debug(
+                "Generic camera - created animated GIF with %d delivery images",
+                len(delivery_images),
+            )
+        else:
+            _LOGGER.warning("Failed to create animated GIF, using first delivery image")
+            self._file_path = delivery_images[0]
 
     async def async_on_demand_update(self):
         """Update state."""
@@ -550,7 +377,7 @@ class MailCam(CoordinatorEntity, Camera):
 
         False if entity pushes its state to HA.
         """
-        return True
+        return False
 
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
@@ -560,6 +387,13 @@ class MailCam(CoordinatorEntity, Camera):
         )
         # Call parent to handle coordinator update
         super()._handle_coordinator_update()
+        # Stage updates during a poll carry the camera paths of the last
+        # finished poll, the images only change once a poll finishes
+        camera_paths = (self.coordinator.data or {}).get(ATTR_CAMERA_PATHS)
+        if camera_paths is not None and camera_paths is self._camera_paths:
+            _LOGGER.debug("%s camera - camera paths unchanged", self._type)
+            return
+        self._camera_paths = camera_paths
         # Schedule the file path update when coordinator data changes
         # update_file_path() will call schedule_update_ha_state() at the end
         self.hass.async_create_task(self.update_file_path())
@@ -21,6 +21,9 @@ from .const import (
     CONF_AMAZON_DAYS,
     CONF_AMAZON_DOMAIN,
     CONF_AMAZON_FWDS,
+    CONF_BUDGET_COMMANDS,
+    CONF_BUDGET_CPU_SECONDS,
+    CONF_BUDGET_MEGABYTES,
     CONF_CUSTOM_IMG,
     CONF_CUSTOM_IMG_FILE,
     CONF_AMAZON_CUSTOM_IMG,
@@ -34,15 +37,23 @@ from .const import (
     CONF_GENERIC_CUSTOM_IMG,
     CONF_GENERIC_CUSTOM_IMG_FILE,
     CONF_DURATION,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_EXTRA_FOLDERS,
     CONF_FOLDER,
     CONF_FORWARDED_EMAILS,
     CONF_GENERATE_GRID,
     CONF_GENERATE_MP4,
+    CONF_CAMERA_STREAM,
+    CONF_IMAGE_FORMAT,
+    CONF_IMAGE_HISTORY_DAYS,
+    CONF_IMAGE_WRITE_MODE,
+    CONF_SCRATCH_PATH,
     CONF_IMAGE_SECURITY,
     CONF_IMAP_SECURITY,
     CONF_IMAP_TIMEOUT,
     CONF_PATH,
     CONF_SCAN_INTERVAL,
+    CONF_SLOW_SCAN_INTERVAL,
     CONF_STORAGE,
     CONF_VERIFY_SSL,
     CONFIG_VER,
@@ -51,8 +62,13 @@ from .const import (
     DEFAULT_AMAZON_DAYS,
     DEFAULT_AMAZON_DOMAIN,
     DEFAULT_AMAZON_FWDS,
+    DEFAULT_BUDGET_COMMANDS,
+    DEFAULT_BUDGET_CPU_SECONDS,
+    DEFAULT_BUDGET_MEGABYTES,
+    DEFAULT_CAMERA_STREAM,
     DEFAULT_CUSTOM_IMG,
     DEFAULT_CUSTOM_IMG_FILE,
+    DEFAULT_FAST_SCAN_INTERVAL,
     DEFAULT_AMAZON_CUSTOM_IMG,
     DEFAULT_AMAZON_CUSTOM_IMG_FILE,
     DEFAULT_UPS_CUSTOM_IMG,
@@ -66,13 +82,19 @@ from .const import (
     DEFAULT_FOLDER,
     DEFAULT_FORWARDED_EMAILS,
     DEFAULT_GIF_DURATION,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_IMAGE_HISTORY_DAYS,
+    DEFAULT_IMAGE_WRITE_MODE,
     DEFAULT_IMAGE_SECURITY,
     DEFAULT_IMAP_TIMEOUT,
     DEFAULT_PATH,
     DEFAULT_PORT,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
     DEFAULT_STORAGE,
     DOMAIN,
+    IMAGE_FORMATS,
+    IMAGE_WRITE_MODES,
 )
 from .helpers import (
     _check_ffmpeg,
@@ -294,6 +316,11 @@ async def _validate_user_input(user_input: dict) -> tuple:
     if not valid:
         errors[CONF_STORAGE] = "path_not_found"
 
+    # The slow tier can not poll more often than the scanning interval
+    slow = user_input.get(CONF_SLOW_SCAN_INTERVAL)
+    if slow and slow < user_input.get(CONF_SCAN_INTERVAL, slow):
+        errors[CONF_SLOW_SCAN_INTERVAL] = "slow_interval_too_short"
+
     return errors, user_input
 
 
@@ -361,18 +388,24 @@ def _get_schema_step_2(data: list, user_input: list, default_dict: list) -> Any:
         """Get default value for key."""
         return user_input.get(key, default_dict.get(key, fallback_default))
 
+    mailboxes = _get_mailboxes(
+        data[CONF_HOST],
+        data[CONF_PORT],
+        data[CONF_USERNAME],
+        data[CONF_PASSWORD],
+        data[CONF_IMAP_SECURITY],
+        data[CONF_VERIFY_SSL],
+    )
+
     return vol.Schema(
         {
             vol.Required(CONF_FOLDER, default=_get_default(CONF_FOLDER)): vol.In(
-                _get_mailboxes(
-                    data[CONF_HOST],
-                    data[CONF_PORT],
-                    data[CONF_USERNAME],
-                    data[CONF_PASSWORD],
-                    data[CONF_IMAP_SECURITY],
-                    data[CONF_VERIFY_SSL],
-                )
+                mailboxes
             ),
+            vol.Optional(
+                CONF_EXTRA_FOLDERS,
+                description={"suggested_value": _get_default(CONF_EXTRA_FOLDERS, [])},
+            ): cv.multi_select(mailboxes),
             vol.Required(
                 CONF_RESOURCES, default=_get_default(CONF_RESOURCES)
             ): cv.multi_select(get_resources()),
@@ -382,6 +415,32 @@ def _get_schema_step_2(data: list, user_input: list, default_dict: list) -> Any:
             vol.Optional(
                 CONF_IMAP_TIMEOUT, default=_get_default(CONF_IMAP_TIMEOUT)
             ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+            vol.Optional(
+                CONF_FAST_SCAN_INTERVAL,
+                default=_get_default(
+                    CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_SLOW_SCAN_INTERVAL,
+                default=_get_default(
+                    CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_BUDGET_COMMANDS,
+                default=_get_default(CONF_BUDGET_COMMANDS, DEFAULT_BUDGET_COMMANDS),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_BUDGET_MEGABYTES,
+                default=_get_default(CONF_BUDGET_MEGABYTES, DEFAULT_BUDGET_MEGABYTES),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_BUDGET_CPU_SECONDS,
+                default=_get_default(
+                    CONF_BUDGET_CPU_SECONDS, DEFAULT_BUDGET_CPU_SECONDS
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
             vol.Optional(
                 CONF_DURATION, default=_get_default(CONF_DURATION)
             ): vol.Coerce(int),
@@ -554,6 +613,42 @@ def _get_schema_step_storage(user_input: list, default_dict: list) -> Any:
             vol.Required(
                 CONF_STORAGE, default=_get_default(CONF_STORAGE, DEFAULT_STORAGE)
             ): cv.string,
+            vol.Optional(
+                CONF_IMAGE_FORMAT,
+                description={
+                    "suggested_value": _get_default(
+                        CONF_IMAGE_FORMAT, DEFAULT_IMAGE_FORMAT
+                    )
+                },
+            ): vol.In(list(IMAGE_FORMATS)),
+            vol.Optional(
+                CONF_CAMERA_STREAM,
+                description={
+                    "suggested_value": _get_default(
+                        CONF_CAMERA_STREAM, DEFAULT_CAMERA_STREAM
+                    )
+                },
+            ): cv.boolean,
+            vol.Optional(
+                CONF_IMAGE_WRITE_MODE,
+                description={
+                    "suggested_value": _get_default(
+                        CONF_IMAGE_WRITE_MODE, DEFAULT_IMAGE_WRITE_MODE
+                    )
+                },
+            ): vol.In(IMAGE_WRITE_MODES),
+            vol.Optional(
+                CONF_SCRATCH_PATH,
+                description={"suggested_value": _get_default(CONF_SCRATCH_PATH)},
+            ): cv.string,
+            vol.Optional(
+                CONF_IMAGE_HISTORY_DAYS,
+                description={
+                    "suggested_value": _get_default(
+                        CONF_IMAGE_HISTORY_DAYS, DEFAULT_IMAGE_HISTORY_DAYS
+                    )
+                },
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
         }
     )
 
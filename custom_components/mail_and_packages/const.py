@@ -15,7 +15,14 @@ PLATFORM = "sensor"
 PLATFORMS = ["binary_sensor", "camera", "sensor"]
 DATA = "data"
 COORDINATOR = "coordinator_mail"
+HOST_SCHEDULER = "host_scheduler"
+SESSIONS = "sessions"
 OVERLAY = ["overlay.png", "vignette.png", "white.png"]
+GIF_PALETTE_SAMPLE = 160  # longest side of frame samples used to build a GIF palette
+CAMERA_CACHE_BYTES = 16 * 1024 * 1024  # image bytes kept in memory for all cameras
+CAMERA_THUMBNAIL_CACHE_BYTES = 8 * 1024 * 1024  # resized camera images
+IMAGE_MANIFEST = ".image_manifest.json"
+IMAGE_ENTRY_MANIFEST = ".image_manifest_{}.json"  # manifest of one config entry
 SERVICE_UPDATE_FILE_PATH = "update_file_path"
 CAMERA = "cameras"
 CONFIG_VER = 13
@@ -32,6 +39,19 @@ ATTR_IMAGE = "image"
 ATTR_IMAGE_PATH = "image_path"
 ATTR_SERVER = "server"
 ATTR_IMAGE_NAME = "image_name"
+ATTR_IMAGE_STATUS = "image_status"
+ATTR_IMAGE_WRITES = "image_writes"
+ATTR_IMAGE_GENERATION = "image_generation"
+ATTR_CAMERA_PATHS = "camera_paths"
+ATTR_SENSOR_TIMINGS = "sensor_timings"
+ATTR_POLL_BUDGET = "poll_budget"
+ATTR_STALE_SENSORS = "stale_sensors"
+ATTR_STALE = "stale"
+ATTR_QUEUE_DELAY = "queue_delay"
+ATTR_CIRCUIT = "circuit"
+ATTR_SESSION = "session"
+ATTR_FOLDERS = "folders"
+ATTR_CHANGE_DETECTION = "change_detection"
 ATTR_EMAIL = "email"
 ATTR_SUBJECT = "subject"
 ATTR_BODY = "body"
@@ -60,6 +80,7 @@ CONF_GENERIC_CUSTOM_IMG = "generic_custom_img"
 CONF_GENERIC_CUSTOM_IMG_FILE = "generic_custom_img_file"
 CONF_STORAGE = "storage"
 CONF_FOLDER = "folder"
+CONF_EXTRA_FOLDERS = "extra_folders"
 CONF_PATH = "image_path"
 CONF_DURATION = "gif_duration"
 CONF_SCAN_INTERVAL = "scan_interval"
@@ -74,6 +95,16 @@ CONF_IMAP_SECURITY = "imap_security"
 CONF_AMAZON_DOMAIN = "amazon_domain"
 CONF_ALLOW_FORWARDED_EMAILS = "allow_forwarded_emails"
 CONF_FORWARDED_EMAILS = "forwarded_emails"
+CONF_IMAGE_FORMAT = "image_format"
+CONF_CAMERA_STREAM = "camera_stream"
+CONF_IMAGE_WRITE_MODE = "image_write_mode"
+CONF_SCRATCH_PATH = "scratch_path"
+CONF_IMAGE_HISTORY_DAYS = "image_history_days"
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_SLOW_SCAN_INTERVAL = "slow_scan_interval"
+CONF_BUDGET_COMMANDS = "budget_commands"
+CONF_BUDGET_MEGABYTES = "budget_megabytes"
+CONF_BUDGET_CPU_SECONDS = "budget_cpu_seconds"
 
 # Defaults
 DEFAULT_CAMERA_NAME = "Mail USPS Camera"
@@ -116,6 +147,49 @@ DEFAULT_STORAGE = "custom_components/mail_and_packages/images/"
 
 DEFAULT_ALLOW_FORWARDED_EMAILS = False
 DEFAULT_FORWARDED_EMAILS = "(none)"
+DEFAULT_IMAGE_FORMAT = "gif"
+DEFAULT_CAMERA_STREAM = False
+DEFAULT_IMAGE_WRITE_MODE = "copy"
+DEFAULT_SCRATCH_PATH = "/dev/shm"  # nosec
+DEFAULT_IMAGE_HISTORY_DAYS = 0
+DEFAULT_FAST_SCAN_INTERVAL = 0  # minutes, 0 follows the scanning interval
+DEFAULT_SLOW_SCAN_INTERVAL = 0  # minutes, 0 follows the scanning interval
+# Poll budget, 0 for no limit
+DEFAULT_BUDGET_COMMANDS = 0
+DEFAULT_BUDGET_MEGABYTES = 0
+DEFAULT_BUDGET_CPU_SECONDS = 0
+# Shared by every config entry polling the same mail server
+HOST_SESSIONS = 2  # polls running at once
+HOST_COMMAND_RATE = 10  # commands per second, 0 for no limit
+HOST_COMMAND_BURST = 50  # commands sent without waiting
+HOST_POLL_SPACING = 15  # seconds between the start of two polls
+HOST_POLL_JITTER = 10  # seconds added at random to a poll that has to wait
+# Seconds a mail server is left alone after a failed login, doubled for every
+# failure in a row up to the maximum
+LOGIN_BACKOFF = {"auth": 300, "network": 30, "throttle": 120}
+LOGIN_MAX_BACKOFF = 3600
+# Connections and responses shared by the entries of the same mail account
+SESSION_POOL_SIZE = 2  # idle connections kept between polls
+SESSION_IDLE_SECONDS = 600  # idle connections older than this are logged out
+SESSION_CACHE_SECONDS = 60  # searches and fetches answered from the cache
+SESSION_CACHE_BYTES = 16 * 1024 * 1024  # responses kept per account
+FOLDER_FETCH_CACHE_BYTES = 16 * 1024 * 1024  # messages kept per folder
+DEFAULT_DELIVERY_FRAME_DURATION = 3  # seconds each delivery photo is shown
+STREAM_JPEG_QUALITY = 85
+
+# How placeholder images are put in place: always copied, left alone when the
+# target already holds them, or linked to the bundled image
+IMAGE_WRITE_MODES = ["copy", "skip_identical", "hardlink", "symlink"]
+
+# Files published to www/mail_and_packages when external access is allowed
+MIRROR_EXTENSIONS = (".gif", ".jpg", ".png", ".mp4", ".webp")
+
+# Animated output formats and the file extension each one is written with
+IMAGE_FORMATS = {
+    "gif": ".gif",
+    "webp": ".webp",
+    "apng": ".png",
+}
 
 # Amazon
 AMAZON_DOMAINS = [
@@ -253,6 +327,28 @@ AMAZON_OTP_SUBJECT = "A one-time password is required for your Amazon delivery"
 
 AMAZON_DELIEVERED_BY_OTHERS_SEARCH_TEXT = ["AMAZON"]
 
+# Polling tiers, sensors not listed here are in the normal tier
+TIER_FAST = "fast"
+TIER_NORMAL = "normal"
+TIER_SLOW = "slow"
+SENSOR_TIERS = {
+    AMAZON_HUB: TIER_FAST,
+    AMAZON_OTP: TIER_FAST,
+    "mail_updated": TIER_FAST,
+    # Searches the last amazon_days days of email
+    AMAZON_PACKAGES: TIER_SLOW,
+}
+
+# Sensors that write images are fetched after the others, USPS mail last, and
+# the values fetched in each stage are published as soon as it finishes
+SENSOR_STAGES = {
+    AMAZON_DELIVERED: 1,
+    "fedex_delivered": 1,
+    "ups_delivered": 1,
+    "walmart_delivered": 1,
+    "usps_mail": 2,
+}
+
 # Sensor Data
 SENSOR_DATA = {
     # USPS
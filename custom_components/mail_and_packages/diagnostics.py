@@ -7,22 +7,49 @@ from typing import Any
 
 from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.device_registry import DeviceEntry
 
-from .const import CONF_AMAZON_FWDS, COORDINATOR, DOMAIN
+from .const import (
+    ATTR_CHANGE_DETECTION,
+    ATTR_CIRCUIT,
+    ATTR_POLL_BUDGET,
+    ATTR_QUEUE_DELAY,
+    CONF_AMAZON_FWDS,
+    COORDINATOR,
+    DOMAIN,
+    HOST_SCHEDULER,
+)
 
 _LOGGER = logging.getLogger(__name__)
 REDACT_KEYS = {CONF_PASSWORD, CONF_USERNAME, CONF_AMAZON_FWDS}
 
 
 async def async_get_config_entry_diagnostics(
-    hass: HomeAssistant, config_entry: ConfigEntry  # pylint: disable=unused-argument
+    hass: HomeAssistant, config_entry: ConfigEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
     diag: dict[str, Any] = {}
     diag["config"] = config_entry.as_dict()
+
+    # What the last update used of its budget and whether it was degraded
+    entry_data = hass.data.get(DOMAIN, {}).get(config_entry.entry_id)
+    if entry_data and entry_data[COORDINATOR].data:
+        diag[ATTR_POLL_BUDGET] = entry_data[COORDINATOR].data.get(ATTR_POLL_BUDGET)
+        diag[ATTR_QUEUE_DELAY] = entry_data[COORDINATOR].data.get(ATTR_QUEUE_DELAY)
+        diag[ATTR_CHANGE_DETECTION] = entry_data[COORDINATOR].data.get(
+            ATTR_CHANGE_DETECTION
+        )
+
+    # How long the polls of every entry on the same mail server were queued
+    scheduler = hass.data.get(DOMAIN, {}).get(HOST_SCHEDULER)
+    if scheduler is not None:
+        host = config_entry.data.get(CONF_HOST)
+        diag[HOST_SCHEDULER] = scheduler.report(host)
+        diag[ATTR_CIRCUIT] = scheduler.breaker(host).report(
+            config_entry.data.get(CONF_USERNAME)
+        )
     return async_redact_data(diag, REDACT_KEYS)
 
 
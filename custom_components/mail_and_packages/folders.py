@@ -0,0 +1,317 @@
+"""Mail folders searched by a poll, skipping those that did not change."""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from typing import Any
+
+from .budget import response_size
+from .const import FOLDER_FETCH_CACHE_BYTES
+
+_LOGGER = logging.getLogger(__name__)
+
+STATUS_ITEMS = ("UIDNEXT", "UIDVALIDITY", "MESSAGES")
+STATUS_PATTERN = re.compile(rb"(UIDNEXT|UIDVALIDITY|MESSAGES|HIGHESTMODSEQ) (\d+)")
+
+
+def _ok(response: Any) -> bool:
+    """Return True for a successful IMAP response."""
+    return isinstance(response, tuple) and len(response) == 2 and response[0] == "OK"
+
+
+def parse_status(response: Any) -> dict | None:
+    """Return the items of a STATUS response, None if it can not be read."""
+    if not _ok(response) or not response[1]:
+        return None
+    line = response[1][0]
+    if not isinstance(line, bytes):
+        return None
+    return {
+        name.decode(): int(value) for name, value in STATUS_PATTERN.findall(line)
+    } or None
+
+
+def appended_only(old: dict | None, new: dict | None) -> bool:
+    """Return True if messages were only added to a folder between two statuses.
+
+    The message numbers of a folder are the same as long as nothing was
+    expunged from it: as many messages more as UIDs were handed out, and the
+    same UIDVALIDITY. A HIGHESTMODSEQ is needed to search what changed.
+    """
+    if not old or not new:
+        return False
+    if not all(
+        item in old and item in new for item in ("UIDNEXT", "MESSAGES", "HIGHESTMODSEQ")
+    ):
+        return False
+    added = new["MESSAGES"] - old["MESSAGES"]
+    return (
+        old.get("UIDVALIDITY") == new.get("UIDVALIDITY")
+        and added >= 0
+        and added == new["UIDNEXT"] - old["UIDNEXT"]
+    )
+
+
+def _numbers(response: Any) -> list | None:
+    """Return the message numbers of a search response, None if not readable."""
+    if not _ok(response) or not response[1]:
+        return None
+    line = response[1][0]
+    if line is None:
+        return []
+    if not isinstance(line, bytes) or not all(
+        number.isdigit() for number in line.split()
+    ):
+        return None
+    return [int(number) for number in line.split()]
+
+
+class FolderState:
+    """Last known status of a folder and the searches run at that status.
+
+    When only new messages arrived since, the searches of the last status
+    are kept in previous so they can be updated with the messages changed
+    after its modification sequence. Fetched messages are kept until
+    something is expunged, as the message behind a number stays the same.
+    The state is shared by the entries on the account, hold lock to use it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a folder not seen yet."""
+        self.status = None
+        self.searches = {}
+        self.previous = {}
+        self.previous_modseq = 0
+        self.fetches = {}
+        self.fetched_bytes = 0
+        self.lock = threading.Lock()
+
+    def update(self, status: dict | None) -> None:
+        """Move to a new status, forgetting what it made out of date."""
+        if appended_only(self.status, status):
+            self.previous = self.searches
+            self.previous_modseq = self.status["HIGHESTMODSEQ"]
+        else:
+            self.previous = {}
+            self.fetches = {}
+            self.fetched_bytes = 0
+        self.status = status
+        self.searches = {}
+
+    def keep_fetch(self, key: tuple, response: Any) -> None:
+        """Keep a fetched message, forgetting the oldest ones past the limit."""
+        size = response_size(response)
+        if size > FOLDER_FETCH_CACHE_BYTES:
+            return
+        while self.fetches and self.fetched_bytes + size > FOLDER_FETCH_CACHE_BYTES:
+            oldest = next(iter(self.fetches))
+            self.fetched_bytes -= response_size(self.fetches.pop(oldest))
+        self.fetches[key] = response
+        self.fetched_bytes += size
+
+
+class FolderAccount:
+    """IMAP account that searches several folders as if they were one.
+
+    The status of every folder is asked at the start of a poll. A folder is
+    only selected and searched if its status changed since the searches
+    were last run, otherwise the same searches are answered as they were
+    then. A folder that only got new messages is searched for the messages
+    changed since its last modification sequence (RFC 7162 CONDSTORE), and
+    the messages fetched before are not fetched again. With more than one
+    folder the message numbers are prefixed with the index of their folder,
+    so a fetch goes to the right one.
+    """
+
+    def __init__(self, account: Any, folders: list, states: dict) -> None:
+        """Wrap an IMAP account, states are kept between polls."""
+        object.__setattr__(self, "_account", account)
+        object.__setattr__(self, "_folders", list(folders))
+        object.__setattr__(self, "_states", states)
+        object.__setattr__(self, "_changed", set(folders))
+        object.__setattr__(self, "_seen", {})
+        object.__setattr__(self, "_selected", None)
+        object.__setattr__(self, "_literal", None)
+
+    def begin_poll(self) -> bool:
+        """Ask the status of every folder and work out which ones changed.
+
+        Returns False if no folder can be read
+        """
+        items = STATUS_ITEMS
+        capabilities = getattr(self._account, "capabilities", ())
+        if isinstance(capabilities, (list, tuple)) and "CONDSTORE" in capabilities:
+            items += ("HIGHESTMODSEQ",)
+        for folder in list(self._folders):
+            try:
+                response = self._account.status(folder, f"({' '.join(items)})")
+            except Exception as err:
+                response = "BAD", [str(err).encode()]
+            if isinstance(response, tuple) and not _ok(response):
+                _LOGGER.error("Error selecting folder: %s %s", folder, response[1])
+                self._folders.remove(folder)
+                continue
+            state = self._states.setdefault(folder, FolderState())
+            status = parse_status(response)
+            self._seen[folder] = status
+            with state.lock:
+                if status is not None and status == state.status:
+                    self._changed.discard(folder)
+                    continue
+                state.update(status)
+        _LOGGER.debug(
+            "Folders changed since the last poll: %s of %s",
+            sorted(self._changed.intersection(self._folders)),
+            self._folders,
+        )
+        return bool(self._folders)
+
+    def mailbox_state(self) -> tuple | None:
+        """Return the status of every folder, as this poll saw it.
+
+        Returns None unless every folder has a modification sequence, without
+        it a status can stay the same while messages change
+        """
+        statuses = [self._seen.get(folder) for folder in self._folders]
+        if not all(status and "HIGHESTMODSEQ" in status for status in statuses):
+            return None
+        return tuple(
+            (folder, tuple(sorted(status.items())))
+            for folder, status in zip(self._folders, statuses)
+        )
+
+    def report(self) -> dict:
+        """Return the folders searched and those answered as before."""
+        return {
+            "changed": [name for name in self._folders if name in self._changed],
+            "unchanged": [name for name in self._folders if name not in self._changed],
+        }
+
+    def _select(self, folder: str) -> bool:
+        """Select a folder unless it already is."""
+        if self._selected == folder:
+            return True
+        try:
+            self._account.select(folder, readonly=True)
+        except Exception as err:
+            _LOGGER.error("Error selecting folder: %s", err)
+            return False
+        object.__setattr__(self, "_selected", folder)
+        return True
+
+    def _search(self, folder: str, key: tuple, args: tuple, kwargs: dict) -> Any:
+        """Search one folder, or answer as before if it did not change."""
+        state = self._states[folder]
+        with state.lock:
+            current = self._current(folder)
+            if current and folder not in self._changed and key in state.searches:
+                return state.searches[key]
+            previous = state.previous.get(key) if current else None
+            modseq = state.previous_modseq
+        if not self._select(folder):
+            return "NO", [b"folder can not be selected"]
+        response = None
+        if previous is not None and args:
+            response = self._search_changed(previous, modseq, key, args, kwargs)
+        if response is None:
+            if key[-1] is not None:
+                self._account.literal = key[-1]
+            response = self._account.search(*args, **kwargs)
+        with state.lock:
+            if self._current(folder) and _ok(response):
+                state.searches[key] = response
+        return response
+
+    def _current(self, folder: str) -> bool:
+        """Return True if the shared state is at the status this poll saw.
+
+        Another entry on the account may have moved it on since.
+        """
+        status = self._seen.get(folder)
+        return status is not None and status == self._states[folder].status
+
+    def _search_changed(
+        self, previous: Any, modseq: int, key: tuple, args: tuple, kwargs: dict
+    ) -> Any:
+        """Update the search of the last status with the messages changed since.
+
+        Returns None if it has to be searched in full
+        """
+        previous = _numbers(previous)
+        if previous is None:
+            return None
+        if key[-1] is not None:
+            self._account.literal = key[-1]
+        # The criteria are ANDed and a literal is always sent last
+        since = f"MODSEQ {modseq + 1}"
+        response = self._account.search(args[0], since, *args[1:], **kwargs)
+        changed = _numbers(response)
+        if changed is None:
+            _LOGGER.debug("Searching what changed failed: %s", response)
+            return None
+        _LOGGER.debug("Messages changed since the last poll: %s", changed)
+        numbers = sorted(set(previous).union(changed))
+        return "OK", [b" ".join(b"%d" % number for number in numbers)]
+
+    def search(self, *args: Any, **kwargs: Any) -> Any:
+        """Search every folder."""
+        key = (args, tuple(sorted(kwargs.items())), self._literal)
+        object.__setattr__(self, "_literal", None)
+        if len(self._folders) == 1:
+            return self._search(self._folders[0], key, args, kwargs)
+
+        numbers = []
+        failed = None
+        for index, folder in enumerate(self._folders):
+            try:
+                response = self._search(folder, key, args, kwargs)
+            except Exception as err:
+                _LOGGER.error("Error searching folder %s: %s", folder, err)
+                response = "BAD", [str(err).encode()]
+            if not _ok(response):
+                failed = failed or response
+                continue
+            if response[1] and isinstance(response[1][0], bytes):
+                numbers += [
+                    b"%d.%s" % (index, number) for number in response[1][0].split()
+                ]
+        if failed is not None and not numbers:
+            return failed
+        return "OK", [b" ".join(numbers)]
+
+    def fetch(self, num: Any, *args: Any, **kwargs: Any) -> Any:
+        """Fetch a message from its folder."""
+        folder = self._folders[0]
+        if len(self._folders) > 1:
+            text = num.decode() if isinstance(num, bytes) else str(num)
+            index, _, num = text.partition(".")
+            folder = self._folders[int(index)]
+        state = self._states[folder]
+        # Flags change, the message itself does not
+        text = num.decode() if isinstance(num, bytes) else str(num)
+        key = (text, args, tuple(sorted(kwargs.items())))
+        cached = "FLAGS" not in str(args).upper()
+        with state.lock:
+            hit = state.fetches.get(key) if cached and self._current(folder) else None
+        if hit is not None:
+            return hit[0], list(hit[1])
+        if not self._select(folder):
+            return "NO", [b"folder can not be selected"]
+        response = self._account.fetch(num, *args, **kwargs)
+        with state.lock:
+            if cached and self._current(folder) and _ok(response):
+                state.keep_fetch(key, response)
+        return response
+
+    def __getattr__(self, name: str) -> Any:
+        """Return an attribute of the account."""
+        return getattr(self._account, name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Keep the literal for the next search, set other attributes."""
+        if name == "literal":
+            object.__setattr__(self, "_literal", value)
+            return
+        setattr(self._account, name, value)
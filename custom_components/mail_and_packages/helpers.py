@@ -12,17 +12,22 @@ import os
 import quopri
 import re
 import subprocess  # nosec
+import threading
+import time
 import uuid
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
 from datetime import timezone
 from email.header import decode_header
-from shutil import copyfile, copytree, which
-from typing import Any, List, Optional, Type, Union
+from io import BytesIO
+from shutil import copy2, copyfile, copytree, which
+from typing import Any, Callable, Iterator, List, Optional, Type, Union
 
 import aiohttp
 import dateparser
 import homeassistant.helpers.config_validation as cv
 from bs4 import BeautifulSoup
-from PIL import Image, ImageOps
+from PIL import Image, ImageOps, ImageSequence
 from voluptuous import Email, MultipleInvalid, Schema
 
 from homeassistant.config_entries import ConfigEntry
@@ -37,6 +42,13 @@ from homeassistant.core import HomeAssistant
 from homeassistant.util import ssl
 
 from . import const
+from .breaker import AUTH, NETWORK, CircuitBreaker, failure_kind
+from .budget import MeteredAccount, PollBudget, PollDeadline
+from .folders import FolderAccount
+from .image_store import ImageStore
+from .scheduler import HostQueue
+from .sensor_graph import PollSchedule, compile_graph
+from .sessions import AccountSession, SharedAccount
 from .const import (
     AMAZON_DELIEVERED_BY_OTHERS_SEARCH_TEXT,
     AMAZON_DELIVERED,
@@ -67,14 +79,25 @@ from .const import (
     ATTR_AMAZON_IMAGE,
     ATTR_BODY,
     ATTR_BODY_COUNT,
+    ATTR_CAMERA_PATHS,
     ATTR_CODE,
     ATTR_COUNT,
     ATTR_EMAIL,
     ATTR_GRID_IMAGE_NAME,
     ATTR_IMAGE_NAME,
     ATTR_IMAGE_PATH,
+    ATTR_IMAGE_STATUS,
+    ATTR_IMAGE_GENERATION,
+    ATTR_IMAGE_WRITES,
     ATTR_ORDER,
     ATTR_PATTERN,
+    ATTR_POLL_BUDGET,
+    ATTR_QUEUE_DELAY,
+    ATTR_SESSION,
+    ATTR_FOLDERS,
+    ATTR_CHANGE_DETECTION,
+    ATTR_SENSOR_TIMINGS,
+    ATTR_STALE_SENSORS,
     ATTR_SUBJECT,
     ATTR_TRACKING,
     ATTR_UPS_IMAGE,
@@ -96,11 +119,15 @@ from .const import (
     CONF_FEDEX_CUSTOM_IMG,
     CONF_FEDEX_CUSTOM_IMG_FILE,
     CONF_DURATION,
+    CONF_EXTRA_FOLDERS,
     CONF_FOLDER,
     CONF_FORWARDED_EMAILS,
     CONF_GENERATE_GRID,
     CONF_GENERATE_MP4,
+    CONF_IMAGE_FORMAT,
+    CONF_IMAGE_HISTORY_DAYS,
     CONF_IMAP_SECURITY,
+    CONF_SCRATCH_PATH,
     CONF_STORAGE,
     CONF_VERIFY_SSL,
     DEFAULT_AMAZON_DAYS,
@@ -109,10 +136,20 @@ from .const import (
     DEFAULT_UPS_CUSTOM_IMG_FILE,
     DEFAULT_WALMART_CUSTOM_IMG_FILE,
     DEFAULT_FEDEX_CUSTOM_IMG_FILE,
+    DEFAULT_DELIVERY_FRAME_DURATION,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_IMAGE_HISTORY_DAYS,
+    DEFAULT_SCRATCH_PATH,
+    DOMAIN,
+    GIF_PALETTE_SAMPLE,
+    IMAGE_FORMATS,
+    MIRROR_EXTENSIONS,
     OVERLAY,
     SENSOR_DATA,
     SENSOR_TYPES,
     SHIPPERS,
+    STREAM_JPEG_QUALITY,
+    TIER_NORMAL,
     CAMERA_DATA,
     CAMERA_EXTRACTION_CONFIG,
 )
@@ -120,6 +157,10 @@ from .const import (
 NO_SSL = "Email will be accessed without encryption using this method and is not recommended."
 _LOGGER = logging.getLogger(__name__)
 
+# Ordered (path, mtime) inputs each delivery animation was last built from
+_DELIVERY_GIF_INPUTS = {}
+_DELIVERY_GIF_LOCK = threading.Lock()
+
 # Config Flow Helpers
 
 
@@ -204,9 +245,54 @@ def default_image_path(
     return "custom_components/mail_and_packages/images/"
 
 
-def process_emails(hass: HomeAssistant, config: ConfigEntry) -> dict:
+def scratch_directory(hass: HomeAssistant, config: ConfigEntry) -> Optional[str]:
+    """Return the directory for intermediate image files.
+
+    Uses the configured scratch path, or a RAM backed tmpfs when one is
+    writable, with a sub directory per image path so entries do not collide.
+
+    Returns None when intermediate files should stay in the image directory
+    """
+    root = config.get(CONF_SCRATCH_PATH)
+    if not root:
+        if not os.access(DEFAULT_SCRATCH_PATH, os.W_OK):
+            return None
+        root = DEFAULT_SCRATCH_PATH
+    image_path = f"{hass.config.path()}/{default_image_path(hass, config)}"
+    name = hashlib.sha1(image_path.encode()).hexdigest()[:12]  # nosec
+    return os.path.join(root, DOMAIN, name, "")
+
+
+def process_emails(
+    hass: HomeAssistant,
+    config: ConfigEntry,
+    frame_store: FrameStore = None,
+    store: ImageStore = None,
+    schedule: PollSchedule = None,
+    publish: Callable[[dict], None] = None,
+    budget: PollBudget = None,
+    deadline: PollDeadline = None,
+    queue: HostQueue = None,
+    breaker: CircuitBreaker = None,
+    session: AccountSession = None,
+) -> dict:
     """Process emails and return value.
 
+    publish, when given, is called with the sensor values fetched so far
+    each time a stage of sensors finishes, before the images are published.
+    budget, when given, limits the optional work of the poll. deadline, when
+    given, bounds the time the poll takes: sensors that were not updated in
+    time keep the values of the last poll and are listed as stale. queue,
+    when given, paces the commands sent to a mail server shared with other
+    config entries. breaker, when given, skips logging into a mail server
+    that keeps failing. session, when given, shares connections and the
+    responses to searches and fetches with other entries on the same account;
+    however the poll ends, its connection is handed back to the session, or
+    logged out if a command may have been cut short. Every configured folder is searched; with a session, or more than one
+    folder, only the folders whose status changed since the last poll. With a
+    schedule too, the poll is skipped while none of them changed, on servers
+    that keep modification sequences.
+
     Returns dict containing sensor data
     """
     _LOGGER.debug("Starting process_emails function")
@@ -214,61 +300,152 @@ def process_emails(hass: HomeAssistant, config: ConfigEntry) -> dict:
     port = config.get(CONF_PORT)
     user = config.get(CONF_USERNAME)
     pwd = config.get(CONF_PASSWORD)
-    folder = config.get(CONF_FOLDER)
-    resources = config.get(CONF_RESOURCES)
     imap_security = config.get(CONF_IMAP_SECURITY)
     verify_ssl = config.get(CONF_VERIFY_SSL)
-    generate_grid = config.get(CONF_GENERATE_GRID)
 
     # Create the dict container
     data = {}
+    if store is not None:
+        store.begin_poll()
+    if budget is not None:
+        budget.begin_poll()
+    if deadline is not None:
+        deadline.begin_poll()
+
+    timeout = deadline.remaining() if deadline is not None else None
+    account = None
+    if session is not None:
+        session.begin_poll()
+        account = session.checkout(timeout)
 
-    # Login to email server and select the folder
-    account = login(host, port, user, pwd, imap_security, verify_ssl)
-
-    # Do not process if account returns false
     if not account:
-        return data
+        if breaker is not None and not breaker.allow(user):
+            return data
+
+        # Login to email server and select the folder
+        account = login(
+            host, port, user, pwd, imap_security, verify_ssl, timeout, breaker
+        )
+
+        # Do not process if account returns false
+        if not account:
+            return data
+
+    connection = account
+    reusable = False
+    try:
+        process_account(
+            hass,
+            config,
+            account,
+            data,
+            frame_store,
+            store,
+            schedule,
+            publish,
+            budget,
+            deadline,
+            queue,
+            session,
+        )
+        # A command cut short by the deadline leaves its response unread
+        reusable = deadline is None or not deadline.expired()
+    finally:
+        if session is not None:
+            if reusable:
+                session.checkin(connection)
+            else:
+                session.discard(connection)
+
+    if session is not None:
+        data[ATTR_SESSION] = session.report()
+        _LOGGER.debug("Shared session: %s", data[ATTR_SESSION])
+
+    return data
+
+
+def process_account(
+    hass: HomeAssistant,
+    config: ConfigEntry,
+    account: Any,
+    data: dict,
+    frame_store: FrameStore = None,
+    store: ImageStore = None,
+    schedule: PollSchedule = None,
+    publish: Callable[[dict], None] = None,
+    budget: PollBudget = None,
+    deadline: PollDeadline = None,
+    queue: HostQueue = None,
+    session: AccountSession = None,
+) -> None:
+    """Fetch the sensor data of a logged in account into data.
+
+    See process_emails for the arguments.
+    """
+    folder = config.get(CONF_FOLDER)
+    resources = config.get(CONF_RESOURCES)
+    generate_grid = config.get(CONF_GENERATE_GRID)
+
+    if budget is not None or queue is not None:
+        account = MeteredAccount(account, budget, queue)
 
-    if not selectfolder(account, folder):
+    if deadline is not None and not deadline.limit(account):
+        _LOGGER.warning("Timed out logging into the mail server")
+        return
+
+    folders = list(dict.fromkeys([folder, *config.get(CONF_EXTRA_FOLDERS, [])]))
+    mailbox = None
+    if session is not None or len(folders) > 1:
+        # Folders that did not change since the last poll are not searched
+        states = session.shared.folders if session is not None else {}
+        account = FolderAccount(account, folders, states)
+        if not account.begin_poll():
+            # Bail out on error
+            return
+        data[ATTR_FOLDERS] = account.report()
+        mailbox = account.mailbox_state()
+    elif not selectfolder(account, folder):
         # Bail out on error
-        return data
+        return
+
+    if session is not None:
+        account = SharedAccount(account, session, tuple(folders))
 
     # Create image file name dict container
     _image = {}
 
     # USPS Mail Image name
-    image_name = image_file_name(hass, config)
+    image_name = image_file_name(hass, config, store=store)
     _LOGGER.debug("Image name: %s", image_name)
     _image[ATTR_IMAGE_NAME] = image_name
 
     if generate_grid:
-        png_file = image_name.replace(".gif", "_grid.png")
+        png_file = f"{os.path.splitext(image_name)[0]}_grid.png"
         _LOGGER.debug("Grid image name: %s", png_file)
         _image[ATTR_GRID_IMAGE_NAME] = png_file
 
     # Amazon delivery image name
-    image_name = image_file_name(hass, config, True)
+    image_name = image_file_name(hass, config, True, store=store)
     _LOGGER.debug("Amazon Image Name: %s", image_name)
     _image[ATTR_AMAZON_IMAGE] = image_name
 
     # UPS delivery image name
     _LOGGER.debug("Generating UPS image name...")
-    ups_image_name = image_file_name(hass, config, ups=True)
+    ups_image_name = image_file_name(hass, config, ups=True, store=store)
     _LOGGER.debug("UPS Image Name: %s", ups_image_name)
     _image[ATTR_UPS_IMAGE] = ups_image_name
     _LOGGER.debug("Set ATTR_UPS_IMAGE in coordinator data: %s", ups_image_name)
 
     # Walmart delivery image name
     _LOGGER.debug("Generating Walmart image name...")
-    walmart_image_name = image_file_name(hass, config, walmart=True)
+    walmart_image_name = image_file_name(hass, config, walmart=True, store=store)
     _LOGGER.debug("Walmart Image Name: %s", walmart_image_name)
     _image[ATTR_WALMART_IMAGE] = walmart_image_name
     _LOGGER.debug("Set ATTR_WALMART_IMAGE in coordinator data: %s", walmart_image_name)
 
     # FedEx delivery image name
     _LOGGER.debug("Generating FedEx image name...")
-    fedex_image_name = image_file_name(hass, config, fedex=True)
+    fedex_image_name = image_file_name(hass, config, fedex=True, store=store)
     _LOGGER.debug("FedEx Image Name: %s", fedex_image_name)
     _image[ATTR_FEDEX_IMAGE] = fedex_image_name
     _LOGGER.debug("Set ATTR_FEDEX_IMAGE in coordinator data: %s", fedex_image_name)
@@ -351,26 +528,141 @@ def process_emails(hass: HomeAssistant, config: ConfigEntry) -> dict:
     _image[ATTR_IMAGE_PATH] = image_path
     data.update(_image)
 
-    # Only update sensors we're intrested in
-    for sensor in resources:
+    # Only update sensors we're intrested in, each one once and after the
+    # sensors it depends on. They share one IMAP connection so run one at a time.
+    context = fetch_context(hass, config, frame_store, store, budget)
+    graph = compile_graph(tuple(resources))
+    if schedule is not None:
+        # Sensors keep their values while no folder changed, the same day.
+        # Images are renamed on a new day, so every sensor runs again then.
+        today = get_today()
+        schedule.begin_poll(mailbox=(today, mailbox) if mailbox else None, day=today)
+        schedule.carry(graph, data)
+        data[ATTR_CHANGE_DETECTION] = schedule.report()
+        _LOGGER.debug("Polls skipped: %s", data[ATTR_CHANGE_DETECTION])
+
+    fetched = {}
+    stale = []
+
+    def update_sensor(sensor: str) -> None:
+        denied = budget.denied if budget is not None else 0
         try:
-            fetch(hass, config, account, data, sensor)
+            if deadline is not None and not deadline.limit(account):
+                raise TimeoutError(f"no time left after {deadline.seconds} seconds")
+            values = fetch_sensor(hass, context, account, data, sensor)
+            # Searches and fetches cut short by the socket timeout return
+            # nothing rather than fail, so their values can not be trusted
+            if deadline is not None and deadline.expired():
+                for key in values:
+                    data.pop(key, None)
+                raise TimeoutError(f"ran out of time after {deadline.seconds} seconds")
         except Exception as err:
-            _LOGGER.error("Error updating sensor: %s reason: %s", sensor, err)
+            if schedule is None or not schedule.restore(sensor, data):
+                raise
+            _LOGGER.warning(
+                "Keeping the last value of sensor: %s reason: %s", sensor, err
+            )
+            stale.append(sensor)
+            return
+        # Without its deferred work the sensor is incomplete, such as a count
+        # without its tracking numbers or delivery photo. Keep the last values
+        # instead, but no more than one poll in a row.
+        if (
+            budget is not None
+            and budget.denied > denied
+            and schedule is not None
+            and not schedule.is_stale(sensor)
+        ):
+            for key in values:
+                data.pop(key, None)
+            if schedule.restore(sensor, data):
+                _LOGGER.info(
+                    "Keeping the last value of sensor: %s reason: work deferred", sensor
+                )
+                stale.append(sensor)
+                return
+            data.update(values)
+        fetched.update(values)
+        if schedule is not None:
+            schedule.remember(sensor, values)
+
+    def publish_stage(number: int) -> None:
+        if publish is not None and fetched:
+            _LOGGER.debug("Publishing sensors fetched by stage %s", number)
+            publish(dict(fetched))
+
+    data[ATTR_SENSOR_TIMINGS] = graph.run(update_sensor, data, on_stage=publish_stage)
+    data[ATTR_STALE_SENSORS] = stale
+    # Work that can wait for the next poll is skipped once out of time
+    out_of_time = deadline is not None and deadline.expired()
+
+    if store is not None:
+        root = f"{hass.config.path()}/{image_path}"
+        images = {
+            "usps": os.path.join(root, data[ATTR_IMAGE_NAME]),
+            "amazon": os.path.join(root, "amazon", data[ATTR_AMAZON_IMAGE]),
+            "ups": os.path.join(root, "ups", ups_image_name),
+            "walmart": os.path.join(root, "walmart", walmart_image_name),
+            "fedex": os.path.join(root, "fedex", fedex_image_name),
+        }
+        data[ATTR_IMAGE_STATUS] = store.status(images)
+        data[ATTR_IMAGE_GENERATION] = store.publish(images, data[ATTR_IMAGE_STATUS])
+        collected = 0
+        # Every sensor that writes images is in the normal tier, so images are
+        # only known to be unused on polls that ran it
+        if out_of_time:
+            _LOGGER.debug("Out of time, collecting unused images next poll")
+        elif schedule is None or TIER_NORMAL in schedule.due_tiers:
+            collected = store.collect(
+                list(images.values()),
+                int(config.get(CONF_IMAGE_HISTORY_DAYS, DEFAULT_IMAGE_HISTORY_DAYS)),
+                get_today(),
+            )
+        data[ATTR_IMAGE_WRITES] = {
+            "mode": store.write_mode,
+            "bytes_written": store.bytes_written,
+            "bytes_avoided": store.bytes_avoided,
+            "files_collected": collected,
+        }
+        _LOGGER.debug("Image writes this poll: %s", data[ATTR_IMAGE_WRITES])
+        store.save()
+
+    data[ATTR_CAMERA_PATHS] = camera_file_paths(hass, config, data)
 
     # Copy image file to www directory if enabled
-    if config.get(CONF_ALLOW_EXTERNAL):
-        copy_images(hass, config)
+    if config.get(CONF_ALLOW_EXTERNAL) and not out_of_time:
+        copy_images(hass, config, store)
 
-    return data
+    if budget is not None:
+        data[ATTR_POLL_BUDGET] = budget.report()
+        _LOGGER.debug("Poll budget used: %s", data[ATTR_POLL_BUDGET])
 
+    if queue is not None:
+        data[ATTR_QUEUE_DELAY] = queue.report()
+        _LOGGER.debug("Queueing delay (seconds): %s", data[ATTR_QUEUE_DELAY])
 
-def copy_images(hass: HomeAssistant, config: ConfigEntry) -> None:
-    """Copy images to www directory if enabled."""
+
+def copy_images(
+    hass: HomeAssistant, config: ConfigEntry, store: ImageStore = None
+) -> None:
+    """Copy images to www directory if enabled.
+
+    With an image store the www directory is kept in sync incrementally
+    instead of being emptied and copied again.
+    """
     paths = []
     src = f"{hass.config.path()}/{default_image_path(hass, config)}"
     dst = f"{hass.config.path()}/www/mail_and_packages/"
 
+    if store is not None:
+        try:
+            mirror_images(src, dst)
+        except OSError as err:
+            _LOGGER.error(
+                "Problem copying files from %s to %s error returned: %s", src, dst, err
+            )
+        return
+
     # Setup paths list
     paths.append(dst)
     paths.append(dst + "amazon/")
@@ -399,6 +691,220 @@ def copy_images(hass: HomeAssistant, config: ConfigEntry) -> None:
         return
 
 
+def mirror_images(src: str, dst: str) -> dict:
+    """Make the images under dst match the images under src.
+
+    Only files whose size or modification time differ are copied, each one
+    to a temporary name that is then renamed over the published file, so a
+    public URL always serves a complete image. Images that no longer exist
+    in src are removed from dst.
+
+    Returns dict with the number of files copied, removed and unchanged
+    """
+    stats = {"copied": 0, "removed": 0, "unchanged": 0}
+    wanted = set()
+
+    for root, _dirs, files in os.walk(src):
+        target_dir = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(target_dir, exist_ok=True)
+        for file in files:
+            if not file.endswith(MIRROR_EXTENSIONS):
+                continue
+            source = os.path.join(root, file)
+            target = os.path.normpath(os.path.join(target_dir, file))
+            wanted.add(target)
+            src_stat = os.stat(source)
+            try:
+                dst_stat = os.stat(target)
+            except FileNotFoundError:
+                dst_stat = None
+            if (
+                dst_stat is not None
+                and dst_stat.st_size == src_stat.st_size
+                and dst_stat.st_mtime_ns == src_stat.st_mtime_ns
+            ):
+                stats["unchanged"] += 1
+                continue
+            temp_path = os.path.join(target_dir, f".{file}.tmp")
+            copy2(source, temp_path)
+            os.replace(temp_path, target)
+            stats["copied"] += 1
+
+    for root, _dirs, files in os.walk(dst):
+        for file in files:
+            target = os.path.normpath(os.path.join(root, file))
+            if file.endswith(MIRROR_EXTENSIONS) and target not in wanted:
+                os.remove(target)
+                stats["removed"] += 1
+
+    _LOGGER.debug("Mirrored %s to %s: %s", src, dst, stats)
+    return stats
+
+
+def camera_file_paths(hass: HomeAssistant, config: ConfigEntry, data: dict) -> dict:
+    """Return the image each camera should show for the polled data.
+
+    Every path is checked here, once per poll in the update job, so the
+    cameras can pick up their image without touching the file system.
+
+    Returns dict of camera type to a dict with the validated "path" and, for
+    the generic camera, the delivery "images" to animate
+    """
+    camera_paths = {}
+    for camera_type in CAMERA_DATA:
+        if camera_type == "generic_camera":
+            camera_paths[camera_type] = _generic_camera_path(hass, config, data)
+        else:
+            camera_paths[camera_type] = {
+                "path": _camera_path(hass, config, data, camera_type)
+            }
+    return camera_paths
+
+
+def custom_no_mail_image(config: ConfigEntry, base_name: str) -> Optional[str]:
+    """Return the custom no mail image configured for a camera, if enabled."""
+    if base_name == "usps":
+        # USPS uses the keys without a prefix
+        custom_img_key = CONF_CUSTOM_IMG
+        custom_img_file_key = CONF_CUSTOM_IMG_FILE
+    else:
+        custom_img_key = getattr(const, f"CONF_{base_name.upper()}_CUSTOM_IMG", None)
+        custom_img_file_key = getattr(
+            const, f"CONF_{base_name.upper()}_CUSTOM_IMG_FILE", None
+        )
+    if custom_img_key and custom_img_file_key and config.get(custom_img_key):
+        return config.get(custom_img_file_key)
+    return None
+
+
+def is_custom_no_mail_image(
+    config: ConfigEntry, base_name: str, file_path: str
+) -> bool:
+    """Return True if file_path is the custom no mail image of a camera."""
+    custom_file_path = custom_no_mail_image(config, base_name)
+    if custom_file_path and os.path.exists(custom_file_path):
+        return os.path.abspath(file_path) == os.path.abspath(custom_file_path)
+    return False
+
+
+def _camera_sensor(camera_type: str) -> str:
+    """Return the sensor that has to be enabled for a camera's images."""
+    base_name = camera_type.split("_")[0]
+    # USPS counts mail pieces, the shippers count deliveries
+    if base_name == "usps":
+        return "usps_mail"
+    return f"{base_name}_delivered"
+
+
+def _readable(file_path: str) -> bool:
+    """Return True if file_path exists and can be read."""
+    return os.path.exists(file_path) and os.access(file_path, os.R_OK)
+
+
+def _camera_path(
+    hass: HomeAssistant, config: ConfigEntry, data: dict, camera_type: str
+) -> str:
+    """Return the validated image path of the USPS or a shipper camera."""
+    base_name = camera_type.replace("_camera", "")
+    custom_img = custom_no_mail_image(config, base_name)
+
+    if base_name == "usps":
+        default = custom_img or f"{os.path.dirname(__file__)}/mail_none.gif"
+        if not {ATTR_IMAGE_NAME, ATTR_IMAGE_PATH}.issubset(data):
+            return default
+        file_path = (
+            f"{hass.config.path()}/{data[ATTR_IMAGE_PATH]}{data[ATTR_IMAGE_NAME]}"
+        )
+    else:
+        # A custom image takes priority over everything
+        if custom_img:
+            _LOGGER.debug("%s camera - using custom no mail: %s", base_name, custom_img)
+            return custom_img
+        default = f"{os.path.dirname(__file__)}/no_deliveries_{base_name}.jpg"
+        image_attr = getattr(const, f"ATTR_{base_name.upper()}_IMAGE", None)
+        if not image_attr or not {image_attr, ATTR_IMAGE_PATH}.issubset(data):
+            return default
+        image_path = data[ATTR_IMAGE_PATH].rstrip("/") + "/"
+        file_path = f"{hass.config.path()}/{image_path}{base_name}/{data[image_attr]}"
+
+    # Images are published atomically, the file is only missing if
+    # publishing it failed
+    if _readable(file_path):
+        _LOGGER.debug("%s camera - found coordinator file: %s", base_name, file_path)
+        return file_path
+    _LOGGER.warning(
+        "%s camera - coordinator file not found or not readable: %s, "
+        "using default: %s",
+        base_name,
+        file_path,
+        default,
+    )
+    return default
+
+
+def _generic_camera_path(hass: HomeAssistant, config: ConfigEntry, data: dict) -> dict:
+    """Return the generic camera's default image and the deliveries to animate."""
+    path = f"{os.path.dirname(__file__)}/no_deliveries_generic.jpg"
+    custom_img = custom_no_mail_image(config, "generic")
+    if custom_img:
+        _LOGGER.debug("Generic camera - using custom no mail: %s", custom_img)
+        return {"path": custom_img, "images": []}
+
+    delivery_images = []
+    enabled_resources = config.get("resources", [])
+    image_status = data.get(ATTR_IMAGE_STATUS, {})
+    for camera_type in CAMERA_DATA:
+        # The generic camera shows package deliveries, not USPS mail
+        if camera_type in ("generic_camera", "usps_camera"):
+            continue
+
+        base_name = camera_type.replace("_camera", "")
+        sensor_name = _camera_sensor(camera_type)
+        if sensor_name not in enabled_resources:
+            _LOGGER.debug(
+                "Generic camera - skipping %s (sensor %s not enabled)",
+                base_name,
+                sensor_name,
+            )
+            continue
+
+        image_attr = getattr(const, f"ATTR_{base_name.upper()}_IMAGE", None)
+        if image_attr is None or not {image_attr, ATTR_IMAGE_PATH}.issubset(data):
+            continue
+
+        image = data[image_attr]
+        delivery_file_path = (
+            f"{hass.config.path()}/{data[ATTR_IMAGE_PATH]}{base_name}/{image}"
+        )
+        is_no_mail = (
+            image.startswith("no_deliveries")
+            or image_status.get(base_name, {}).get("placeholder", False)
+            or is_custom_no_mail_image(config, base_name, delivery_file_path)
+        )
+        delivered = data.get(f"{base_name}_delivered", 0)
+
+        if is_no_mail:
+            _LOGGER.debug(
+                "Generic camera - filtered out %s no-mail image: %s",
+                base_name,
+                image,
+            )
+        elif not delivered:
+            _LOGGER.debug(
+                "Generic camera - filtered out %s "
+                "(no current deliveries, count=%s): %s",
+                base_name,
+                delivered,
+                image,
+            )
+        elif _readable(delivery_file_path):
+            delivery_images.append(delivery_file_path)
+
+    if not delivery_images:
+        _LOGGER.debug("Generic camera - no deliveries found, using default: %s", path)
+    return {"path": path, "images": delivery_images}
+
+
 def image_file_name(
     hass: HomeAssistant,
     config: ConfigEntry,
@@ -406,9 +912,13 @@ def image_file_name(
     ups: bool = False,
     walmart: bool = False,
     fedex: bool = False,
+    store: ImageStore = None,
 ) -> str:
     """Determine if filename is to be changed or not.
 
+    With an image store the decision is made from its manifest instead of
+    listing and hashing the image directory.
+
     Returns filename
     """
     _LOGGER.info(
@@ -421,8 +931,10 @@ def image_file_name(
     mail_none = None
     path = None
     image_name = None
+    kind = "usps"
 
     if amazon:
+        kind = "amazon"
         if config.get(CONF_AMAZON_CUSTOM_IMG):
             mail_none = (
                 config.get(CONF_AMAZON_CUSTOM_IMG_FILE)
@@ -433,6 +945,7 @@ def image_file_name(
         image_name = os.path.split(mail_none)[1]
         path = f"{hass.config.path()}/{default_image_path(hass, config)}amazon"
     elif ups:
+        kind = "ups"
         _LOGGER.debug("Processing UPS image file name")
         if config.get(CONF_UPS_CUSTOM_IMG):
             mail_none = (
@@ -446,6 +959,7 @@ def image_file_name(
         path = f"{hass.config.path()}/{default_image_path(hass, config)}ups"
         _LOGGER.debug("UPS path: %s", path)
     elif walmart:
+        kind = "walmart"
         _LOGGER.debug("Processing Walmart image file name")
         if config.get(CONF_WALMART_CUSTOM_IMG):
             mail_none = (
@@ -460,6 +974,7 @@ def image_file_name(
         path = f"{hass.config.path()}/{default_image_path(hass, config)}walmart"
         _LOGGER.debug("Walmart path: %s", path)
     elif fedex:
+        kind = "fedex"
         _LOGGER.debug("Processing FedEx image file name")
         if config.get(CONF_FEDEX_CUSTOM_IMG):
             mail_none = (
@@ -489,6 +1004,10 @@ def image_file_name(
             _LOGGER.error("Problem creating: %s, error returned: %s", path, err)
             return image_name
 
+    ext = ".jpg" if amazon or ups or walmart or fedex else image_extension(config)
+    if store is not None:
+        return _stored_image_file_name(store, path, mail_none, image_name, ext, kind)
+
     # SHA1 file hash check
     try:
         sha1 = hash_file(mail_none)
@@ -496,13 +1015,11 @@ def image_file_name(
         _LOGGER.error("Problem accessing file: %s, error returned: %s", mail_none, err)
         return image_name
 
-    ext = None
-    ext = ".jpg" if amazon or ups or walmart or fedex else ".gif"
-
     for file in os.listdir(path):
-        is_image_file = file.endswith(".gif") or (
-            file.endswith(".jpg") and (amazon or ups or walmart or fedex)
-        )
+        is_image_file = (
+            file.endswith(ext)
+            or (file.endswith(".gif") and (amazon or ups or walmart or fedex))
+        ) and not (file in OVERLAY or file.endswith("_grid.png"))
         if is_image_file:
             try:
                 created = datetime.datetime.fromtimestamp(
@@ -536,7 +1053,7 @@ def image_file_name(
     _LOGGER.debug("Target directory exists: %s", os.path.exists(path))
 
     try:
-        copyfile(mail_none, target_path)
+        copy_placeholder(mail_none, target_path)
         _LOGGER.debug("Successfully copied image to %s", target_path)
         _LOGGER.debug("Target file exists after copy: %s", os.path.exists(target_path))
     except Exception as err:
@@ -547,6 +1064,195 @@ def image_file_name(
     return image_name
 
 
+def _stored_image_file_name(
+    store: ImageStore, path: str, mail_none: str, image_name: str, ext: str, kind: str
+) -> str:
+    """Determine the image name for a camera from the image manifest.
+
+    Keeps the same rules as the directory scan: an image is renamed once it
+    holds a real delivery image from a previous day, and the placeholder is
+    only copied when the image is not already the placeholder. A real image
+    from today is left alone, as its sensor may not run this poll; the
+    sensor puts the placeholder back itself when it finds nothing.
+
+    Returns filename
+    """
+    try:
+        placeholder = store.digest(mail_none)
+    except OSError as err:
+        _LOGGER.error("Problem accessing file: %s, error returned: %s", mail_none, err)
+        return image_name
+    store.set_placeholder(kind, placeholder)
+
+    today = get_formatted_date()
+    created = today
+    digest = None
+    name = store.latest(kind)
+    if name is not None and name.endswith(ext):
+        try:
+            digest = store.digest(os.path.join(store.path, name))
+        except OSError:
+            digest = None
+        if digest not in (None, placeholder) and store.get(name)["created"] != today:
+            name = None
+        else:
+            created = store.get(name)["created"]
+    else:
+        name = None
+
+    if name is None:
+        digest = None
+        name = os.path.relpath(
+            os.path.join(path, f"{str(uuid.uuid4())}{ext}"), store.path
+        )
+        _LOGGER.info("=== image_file_name GENERATED NEW UUID: %s ===", name)
+    else:
+        _LOGGER.info("=== image_file_name USING EXISTING: %s ===", name)
+    image_name = os.path.basename(name)
+
+    if digest == placeholder:
+        _LOGGER.debug("Placeholder already in place for %s", name)
+        return image_name
+    if digest is not None:
+        _LOGGER.debug("Keeping today's image %s", name)
+        return image_name
+
+    target_path = os.path.join(path, image_name)
+    _LOGGER.debug("Copying %s to %s", mail_none, target_path)
+    try:
+        write_placeholder(mail_none, target_path, store)
+    except Exception as err:
+        _LOGGER.error("Error copying image: %s", err)
+        return f"no_deliveries{ext}"
+    store.record(name, placeholder, kind, created)
+    return image_name
+
+
+def image_extension(config: ConfigEntry) -> str:
+    """Return the file extension for the configured animation format."""
+    image_format = config.get(CONF_IMAGE_FORMAT, DEFAULT_IMAGE_FORMAT)
+    return IMAGE_FORMATS.get(image_format, IMAGE_FORMATS[DEFAULT_IMAGE_FORMAT])
+
+
+def copy_placeholder(source: str, target: str, atomic: bool = False) -> None:
+    """Copy a placeholder image, converting it if the target format differs.
+
+    With atomic the copy is published through a staging file.
+    """
+    source_ext = os.path.splitext(source)[1].lower()
+    target_ext = os.path.splitext(target)[1].lower()
+    if source_ext == target_ext or target_ext not in IMAGE_FORMATS.values():
+        if atomic:
+            publish_copy(source, target)
+        else:
+            copyfile(source, target)
+        return
+
+    with Image.open(source) as img:
+        duration = img.info.get("duration") or 1000
+        frames = [frame.copy() for frame in ImageSequence.Iterator(img)]
+    save_animation(frames, target, duration)
+
+
+def write_placeholder(source: str, target: str, store: ImageStore = None) -> None:
+    """Put a placeholder image in place at target.
+
+    Without an image store the placeholder is always copied. With one, its
+    write mode decides: "copy" always copies, "skip_identical" leaves a
+    target that already holds the placeholder alone, and "hardlink" or
+    "symlink" also link to the bundled image instead of copying it.
+    """
+    if store is None:
+        copy_placeholder(source, target)
+        return
+
+    digest = store.digest(source)
+    if store.write_mode != "copy":
+        try:
+            current = store.digest(target)
+        except OSError:
+            current = None
+        if current == digest:
+            store.count_write(avoided=os.path.getsize(target))
+            _LOGGER.debug("Placeholder already in place at %s", target)
+            return
+
+    same_format = (
+        os.path.splitext(source)[1].lower() == os.path.splitext(target)[1].lower()
+    )
+    if store.write_mode in ("hardlink", "symlink") and same_format:
+        linked = _link_placeholder(source, target, store.write_mode == "symlink")
+    else:
+        linked = False
+
+    if linked:
+        store.count_write(avoided=os.path.getsize(target))
+    else:
+        copy_placeholder(source, target, atomic=True)
+        store.count_write(written=os.path.getsize(target))
+
+    name = store.relative(target)
+    if name is not None:
+        store.record(name, digest)
+
+
+def _link_placeholder(source: str, target: str, symbolic: bool) -> bool:
+    """Replace target with a link to source.
+
+    Returns True if the link was made
+    """
+    temp_path = f"{target}.tmp"
+    try:
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        if symbolic:
+            os.symlink(os.path.abspath(source), temp_path)
+        else:
+            os.link(source, temp_path)
+        os.replace(temp_path, target)
+    except OSError as err:
+        _LOGGER.debug("Unable to link %s to %s, copying: %s", source, target, err)
+        return False
+    return True
+
+
+@contextmanager
+def publish_file(path: str) -> Iterator[Any]:
+    """Open a staging file that replaces path once it is completely written.
+
+    The data is flushed to disk before the staging file is renamed over path,
+    so readers see either the previous image or the new one, never a partial
+    or missing file. A link at path is replaced, never written through.
+    """
+    temp_path = f"{path}.tmp"
+    with suppress(FileNotFoundError):
+        # A leftover staging file may be a link, never write through it
+        os.remove(temp_path)
+    try:
+        with open(temp_path, "wb") as the_file:
+            yield the_file
+            the_file.flush()
+            os.fsync(the_file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.remove(temp_path)
+        raise
+
+
+def publish_bytes(path: str, data: bytes) -> None:
+    """Atomically replace the file at path with data."""
+    with publish_file(path) as the_file:
+        the_file.write(data)
+
+
+def publish_copy(source: str, target: str) -> None:
+    """Atomically replace the file at target with a copy of source."""
+    with open(source, "rb") as src, publish_file(target) as the_file:
+        for chunk in iter(lambda: src.read(1024 * 1024), b""):
+            the_file.write(chunk)
+
+
 def hash_file(filename: str) -> str:
     """Return the SHA-1 hash of the file passed into it.
 
@@ -568,8 +1274,69 @@ def hash_file(filename: str) -> str:
     return the_hash.hexdigest()
 
 
+@dataclass
+class FetchContext:
+    """Values derived from the config that every sensor in a poll uses."""
+
+    img_out_path: str
+    gif_duration: int
+    generate_mp4: bool
+    generate_grid: bool
+    amazon_fwds: list
+    forwarded_emails: list
+    nomail: Optional[str]
+    amazon_domain: Optional[str]
+    amazon_days: int
+    scratch: Optional[str]
+    frame_store: FrameStore = None
+    store: ImageStore = None
+    budget: PollBudget = None
+
+
+def fetch_context(
+    hass: HomeAssistant,
+    config: ConfigEntry,
+    frame_store: FrameStore = None,
+    store: ImageStore = None,
+    budget: PollBudget = None,
+) -> FetchContext:
+    """Work out the config derived values for a poll.
+
+    Returns FetchContext
+    """
+    amazon_fwds = cv.ensure_list_csv(config.get(CONF_AMAZON_FWDS))
+
+    # Combine the amazon forwarded emails with the configured forwarded emails (for now)
+    forwarded_emails = amazon_fwds + cv.ensure_list_csv(
+        config.get(CONF_FORWARDED_EMAILS)
+    )
+
+    return FetchContext(
+        img_out_path=f"{hass.config.path()}/{default_image_path(hass, config)}",
+        gif_duration=config.get(CONF_DURATION),
+        generate_mp4=config.get(CONF_GENERATE_MP4),
+        generate_grid=config.get(CONF_GENERATE_GRID),
+        amazon_fwds=amazon_fwds,
+        forwarded_emails=forwarded_emails,
+        # Conditional variables
+        nomail=config.get(CONF_CUSTOM_IMG_FILE) or None,
+        amazon_domain=config.get(CONF_AMAZON_DOMAIN) or None,
+        amazon_days=config.get(CONF_AMAZON_DAYS, DEFAULT_AMAZON_DAYS),
+        scratch=scratch_directory(hass, config),
+        frame_store=frame_store,
+        store=store,
+        budget=budget,
+    )
+
+
 def fetch(
-    hass: HomeAssistant, config: ConfigEntry, account: Any, data: dict, sensor: str
+    hass: HomeAssistant,
+    config: ConfigEntry,
+    account: Any,
+    data: dict,
+    sensor: str,
+    frame_store: FrameStore = None,
+    store: ImageStore = None,
 ) -> int:
     """Fetch data for a single sensor, including any sensors it depends on.
 
@@ -578,57 +1345,55 @@ def fetch(
     if sensor in data:
         return data[sensor]
 
-    img_out_path = f"{hass.config.path()}/{default_image_path(hass, config)}"
-    gif_duration = config.get(CONF_DURATION)
-    generate_mp4 = config.get(CONF_GENERATE_MP4)
-    generate_grid = config.get(CONF_GENERATE_GRID)
-    amazon_fwds = cv.ensure_list_csv(config.get(CONF_AMAZON_FWDS))
-    image_name = data[ATTR_IMAGE_NAME]
-    amazon_image_name = data[ATTR_AMAZON_IMAGE]
-    amazon_days = config.get(CONF_AMAZON_DAYS, DEFAULT_AMAZON_DAYS)
+    context = fetch_context(hass, config, frame_store, store)
+    for needed in compile_graph((sensor,)).order:
+        if needed not in data:
+            fetch_sensor(hass, context, account, data, needed)
+    return data[sensor]
 
-    # Combine the amazon forwarded emails with the configured forwarded emails (for now)
-    forwarded_emails = amazon_fwds + cv.ensure_list_csv(
-        config.get(CONF_FORWARDED_EMAILS)
-    )
 
-    # Conditional variables
-    nomail = (
-        config.get(CONF_CUSTOM_IMG_FILE) if config.get(CONF_CUSTOM_IMG_FILE) else None
-    )
-    amazon_domain = (
-        config.get(CONF_AMAZON_DOMAIN) if config.get(CONF_AMAZON_DOMAIN) else None
-    )
+def fetch_sensor(
+    hass: HomeAssistant,
+    context: FetchContext,
+    account: Any,
+    data: dict,
+    sensor: str,
+) -> int:
+    """Fetch data for a single sensor, the sensors it depends on already in data.
 
+    Returns dict of the values fetched for the sensor and its attributes
+    """
+    forwarded_emails = context.forwarded_emails
+    amazon_domain = context.amazon_domain
     count = {}
 
-    # Initialize shared variable ONCE
-    data.setdefault("amazon_delivered_by_others", 0)
-
     if sensor == "usps_mail":
         count[sensor] = get_mails(
             account,
-            img_out_path,
-            gif_duration,
-            image_name,
-            generate_mp4,
-            nomail,
-            generate_grid,
+            context.img_out_path,
+            context.gif_duration,
+            data[ATTR_IMAGE_NAME],
+            context.generate_mp4,
+            context.nomail,
+            context.generate_grid,
             forwarded_emails,
+            context.frame_store,
+            context.store,
+            context.scratch,
         )
     elif sensor == AMAZON_PACKAGES:
         count[sensor] = get_items(
             account,
             ATTR_COUNT,
             forwarded_emails,
-            amazon_days,
+            context.amazon_days,
             amazon_domain,
         )
         count[AMAZON_ORDER] = get_items(
             account,
             ATTR_ORDER,
-            amazon_fwds,
-            amazon_days,
+            context.amazon_fwds,
+            context.amazon_days,
             amazon_domain,
         )
     elif sensor == AMAZON_HUB:
@@ -649,12 +1414,12 @@ def fetch(
         )
     elif "_packages" in sensor:
         prefix = sensor.replace("_packages", "")
-        delivering = fetch(hass, config, account, data, f"{prefix}_delivering")
-        delivered = fetch(hass, config, account, data, f"{prefix}_delivered")
+        delivering = data[f"{prefix}_delivering"]
+        delivered = data[f"{prefix}_delivered"]
         count[sensor] = delivering + delivered
     elif "_delivering" in sensor:
         prefix = sensor.replace("_delivering", "")
-        delivered = fetch(hass, config, account, data, f"{prefix}_delivered")
+        delivered = data[f"{prefix}_delivered"]
         info = get_count(
             account,
             sensor,
@@ -662,6 +1427,7 @@ def fetch(
             amazon_domain=amazon_domain,
             data=data,
             forwarded_emails=forwarded_emails,
+            budget=context.budget,
         )
         count[sensor] = max(0, info[ATTR_COUNT] - delivered)
         count[f"{prefix}_tracking"] = info[ATTR_TRACKING]
@@ -670,7 +1436,7 @@ def fetch(
         for shipper in SHIPPERS:
             delivered = f"{shipper}_delivered"
             if delivered in data and delivered != sensor:
-                count[sensor] += fetch(hass, config, account, data, delivered)
+                count[sensor] += data[delivered]
     elif sensor == "zpackages_transit":
         total = 0
         for shipper in SHIPPERS:
@@ -680,14 +1446,12 @@ def fetch(
                 continue
             delivering = f"{shipper}_delivering"
             if delivering in data and delivering != sensor:
-                total += fetch(hass, config, account, data, delivering)
+                total += data[delivering]
 
         # We are going to best guess for in transit as amazon doesn't reveal who the
         # shipper is in email.
         if "amazon_packages" in data and "amazon_packages" != sensor:
-            amazon_packages = max(
-                0, fetch(hass, config, account, data, "amazon_packages")
-            )
+            amazon_packages = max(0, data["amazon_packages"])
 
             # We know if we are expecting packages from amazon, and in tranit is lower
             # than the amazon package count, we can best guess amazon is delivering the
@@ -702,35 +1466,55 @@ def fetch(
             # behalf of amazon. We use that to information to properly decrease in
             # transit. But not all shippers tell us.
             # Subtract Amazon packages we believe were delivered by other shippers
-            total -= data.get("amazon_delivered_by_others", 0)
+            total -= sum(
+                data.get(f"{shipper}_delivered_by_others", 0) for shipper in SHIPPERS
+            )
 
         count[sensor] = max(0, total)
     elif sensor == "mail_updated":
         count[sensor] = update_time()
     else:
         _LOGGER.debug("if statement sensor: %s", sensor)
-        count[sensor] = get_count(
+        info = get_count(
             account,
             sensor,
             False,
-            img_out_path,
+            context.img_out_path,
             hass,
-            amazon_image_name,
+            data[ATTR_AMAZON_IMAGE],
             amazon_domain,
             forwarded_emails,
             data=data,
-        )[ATTR_COUNT]
+            store=context.store,
+            budget=context.budget,
+        )
+        count[sensor] = info[ATTR_COUNT]
+        # Kept with the sensor, so it is carried forward and restored with it
+        if "amazon_delivered_by_others" in info:
+            count[f"{sensor}_by_others"] = info["amazon_delivered_by_others"]
 
     data.update(count)
     _LOGGER.debug("Sensor: %s Count: %s", sensor, count[sensor])
-    return count[sensor]
+    return count
 
 
 def login(
-    host: str, port: int, user: str, pwd: str, security: str, verify: bool = True
+    host: str,
+    port: int,
+    user: str,
+    pwd: str,
+    security: str,
+    verify: bool = True,
+    timeout: float = None,
+    breaker: CircuitBreaker = None,
 ) -> Union[bool, Type[imaplib.IMAP4_SSL]]:
     """Login to IMAP server.
 
+    timeout is the socket timeout in seconds, None to wait forever. breaker,
+    when given, is told whether the login worked and why it failed.
+
+    The capabilities of the account are read again once logged in.
+
     Returns account object
     """
     try:
@@ -740,15 +1524,19 @@ def login(
             else ssl.create_no_verify_ssl_context()
         )
         if security == "SSL":
-            account = imaplib.IMAP4_SSL(host=host, port=port, ssl_context=ssl_context)
+            account = imaplib.IMAP4_SSL(
+                host=host, port=port, ssl_context=ssl_context, timeout=timeout
+            )
         elif security == "startTLS":
-            account = imaplib.IMAP4(host=host, port=port)
+            account = imaplib.IMAP4(host=host, port=port, timeout=timeout)
             account.starttls(ssl_context)
         else:
-            account = imaplib.IMAP4(host=host, port=port)
+            account = imaplib.IMAP4(host=host, port=port, timeout=timeout)
 
     except Exception as err:
         _LOGGER.error("Network error while connecting to server: %s", err)
+        if breaker is not None:
+            breaker.failure(user, failure_kind(err, NETWORK))
         return False
 
     # If login fails give error message
@@ -756,8 +1544,21 @@ def login(
         account.login(user, pwd)
     except Exception as err:
         _LOGGER.error("Error logging into IMAP Server: %s", err)
+        if breaker is not None:
+            breaker.failure(user, failure_kind(err, AUTH))
         return False
 
+    if breaker is not None:
+        breaker.success(user)
+
+    # Servers such as Gmail and Dovecot only list some capabilities once
+    # logged in, CONDSTORE among them
+    try:
+        typ, dat = account.capability()
+        if typ == "OK" and dat and isinstance(dat[-1], bytes):
+            account.capabilities = tuple(dat[-1].decode().upper().split())
+    except Exception as err:
+        _LOGGER.debug("Error reading the capabilities of IMAP Server: %s", err)
     return account
 
 
@@ -940,8 +1741,19 @@ def get_mails(
     custom_img: str = None,
     gen_grid: bool = False,
     forwarded_emails: list[str] = None,
+    frame_store: FrameStore = None,
+    store: ImageStore = None,
+    scratch_dir: str = None,
 ) -> int:
-    """Create GIF image based on the attachments in the inbox."""
+    """Create GIF image based on the attachments in the inbox.
+
+    When a frame store is given the resized mailpieces are also handed to it
+    for the camera stream, and unless an mp4 or grid is wanted from the
+    animation only the first mailpiece is written to disk as the still image.
+
+    Mailpieces are extracted and resized in scratch_dir when given, only the
+    finished image is written to image_output_path.
+    """
     image_count = 0
     images = []
     images_delete = []
@@ -973,17 +1785,35 @@ def get_mails(
         except Exception as err:
             _LOGGER.critical("Error creating directory: %s", err)
 
-    # Clean up image directory
-    _LOGGER.debug("Cleaning up image directory: %s", image_output_path)
-    cleanup_images(image_output_path)
+    # Clean up image directory, with an image store old images are collected
+    # at the end of the poll instead
+    if store is None:
+        _LOGGER.debug("Cleaning up image directory: %s", image_output_path)
+        cleanup_images(image_output_path)
 
     # Copy overlays to image directory
     _LOGGER.debug("Checking for overlay files in: %s", image_output_path)
     copy_overlays(image_output_path)
 
+    # Intermediate files go to the scratch directory if there is one
+    work_path = image_output_path
+    if scratch_dir is not None:
+        try:
+            os.makedirs(scratch_dir, exist_ok=True)
+            cleanup_images(scratch_dir)
+            work_path = scratch_dir
+        except OSError as err:
+            _LOGGER.warning("Unable to use scratch directory %s: %s", scratch_dir, err)
+
     if server_response == "OK":
         _LOGGER.debug("Informed Delivery email found processing...")
+        # Content hashes of the mailpieces of earlier digests, a forwarded copy
+        # of a digest or a mailpiece repeated in a later digest is skipped
+        # before it is written, resized and encoded again
+        seen = set()
+        duplicates = 0
         for num in data[0].split():
+            pieces = set()
             msg = email_fetch(account, num, "(RFC822)")[1]
             for response_part in msg:
                 if isinstance(response_part, tuple):
@@ -1010,11 +1840,15 @@ def get_mails(
                                 filename = random_filename()
                                 data = str(image["src"]).split(",")[1]
                                 try:
-                                    with open(
-                                        image_output_path + filename, "wb"
-                                    ) as the_file:
-                                        the_file.write(base64.b64decode(data))
-                                        images.append(image_output_path + filename)
+                                    data = base64.b64decode(data)
+                                    digest = hashlib.sha1(data).hexdigest()  # nosec
+                                    if digest in seen:
+                                        duplicates += 1
+                                        continue
+                                    pieces.add(digest)
+                                    with open(work_path + filename, "wb") as the_file:
+                                        the_file.write(data)
+                                        images.append(work_path + filename)
                                         image_count = image_count + 1
                                 except Exception as err:
                                     _LOGGER.critical("Error opening filepath: %s", err)
@@ -1029,12 +1863,16 @@ def get_mails(
                             if any(junk in filename for junk in junkmail):
                                 _LOGGER.debug("Discarding junk mail.")
                                 continue
+                            payload = part.get_payload(decode=True)
+                            digest = hashlib.sha1(payload).hexdigest()  # nosec
+                            if digest in seen:
+                                duplicates += 1
+                                continue
+                            pieces.add(digest)
                             try:
-                                with open(
-                                    image_output_path + filename, "wb"
-                                ) as the_file:
-                                    the_file.write(part.get_payload(decode=True))
-                                    images.append(image_output_path + filename)
+                                with open(work_path + filename, "wb") as the_file:
+                                    the_file.write(payload)
+                                    images.append(work_path + filename)
                                     image_count = image_count + 1
                             except Exception as err:
                                 _LOGGER.critical("Error opening filepath: %s", err)
@@ -1042,6 +1880,10 @@ def get_mails(
 
                         elif part.get_content_type() == "multipart":
                             continue
+            seen |= pieces
+
+        if duplicates:
+            _LOGGER.debug("Skipped %s mailpieces already found today.", duplicates)
 
         # Remove duplicate images
         _LOGGER.debug("Removing duplicate images.")
@@ -1074,7 +1916,10 @@ def get_mails(
 
             _LOGGER.debug("Resizing images to 724x320...")
             # Resize images to 724x320
-            all_images = resize_images(images, 724, 320)
+            if work_path != image_output_path:
+                all_images = resize_images(images, 724, 320, work_path)
+            else:
+                all_images = resize_images(images, 724, 320)
 
             # Create copy of image list for deleting temporary images
             for image in all_images:
@@ -1085,15 +1930,17 @@ def get_mails(
             img, *imgs = [Image.open(file) for file in all_images]
 
             try:
+                frames = [img, *imgs]
+                if frame_store is not None:
+                    frame_store.set("usps_camera", frames, int(gif_duration))
+                    if not (gen_mp4 or gen_grid):
+                        frames = [img]
                 _LOGGER.debug("Generating animated GIF")
                 # Use Pillow to create mail images
-                img.save(
-                    fp=os.path.join(image_output_path, image_name),
-                    format="GIF",
-                    append_images=imgs,
-                    save_all=True,
-                    duration=gif_duration * 1000,
-                    loop=0,
+                save_animation(
+                    frames,
+                    os.path.join(image_output_path, image_name),
+                    int(gif_duration) * 1000,
                 )
                 _LOGGER.debug("Mail image generated.")
             except Exception as err:
@@ -1103,7 +1950,9 @@ def get_mails(
 
         elif image_count == 0:
             _LOGGER.debug("No mail found.")
-            if os.path.isfile(image_output_path + image_name):
+            if frame_store is not None:
+                frame_store.clear("usps_camera")
+            if store is None and os.path.isfile(image_output_path + image_name):
                 _LOGGER.debug("Removing " + image_output_path + image_name)
                 cleanup_images(image_output_path, image_name)
 
@@ -1113,7 +1962,7 @@ def get_mails(
                     nomail = custom_img
                 else:
                     nomail = os.path.dirname(__file__) + "/mail_none.gif"
-                copyfile(nomail, image_output_path + image_name)
+                write_placeholder(nomail, image_output_path + image_name, store)
             except Exception as err:
                 _LOGGER.error("Error attempting to copy image: %s", err)
 
@@ -1121,15 +1970,290 @@ def get_mails(
             _generate_mp4(image_output_path, image_name)
         if gen_grid:
             generate_grid_img(image_output_path, image_name, image_count)
+        if store is not None:
+            base_name = os.path.splitext(image_name)[0]
+            today = get_formatted_date()
+            if gen_mp4:
+                store.track(
+                    os.path.join(image_output_path, f"{base_name}.mp4"),
+                    "usps_mp4",
+                    today,
+                )
+            if gen_grid:
+                store.track(
+                    os.path.join(image_output_path, f"{base_name}_grid.png"),
+                    "usps_grid",
+                    today,
+                )
 
     return image_count
 
 
+def _encode_gif(frames: list, durations: list, fp: Any) -> None:
+    """Write frames as an endlessly looping animated GIF."""
+    frames[0].save(
+        fp,
+        format="GIF",
+        append_images=frames[1:],
+        save_all=True,
+        duration=durations if len(durations) > 1 else durations[0],
+        loop=0,
+        optimize=True,
+    )
+
+
+def _shared_palette(frames: list, colors: int = 256) -> Image.Image:
+    """Build one adaptive palette covering every frame of an animation.
+
+    Frames are sampled at reduced size into a single strip so the palette
+    reflects the colours of the whole animation, not just the first frame.
+    """
+    samples = []
+    for frame in frames:
+        sample = frame.copy()
+        sample.thumbnail((GIF_PALETTE_SAMPLE, GIF_PALETTE_SAMPLE))
+        samples.append(sample)
+
+    strip = Image.new(
+        "RGB",
+        (
+            sum(sample.width for sample in samples),
+            max(sample.height for sample in samples),
+        ),
+    )
+    offset = 0
+    for sample in samples:
+        strip.paste(sample, (offset, 0))
+        offset += sample.width
+
+    return strip.quantize(colors=colors, method=Image.Quantize.MEDIANCUT)
+
+
+def _encode_webp(frames: list, durations: list, fp: Any) -> None:
+    """Write frames as an endlessly looping animated WebP."""
+    frames[0].save(
+        fp,
+        format="WEBP",
+        append_images=frames[1:],
+        save_all=True,
+        duration=durations,
+        loop=0,
+        quality=80,
+        method=4,
+    )
+
+
+def _encode_apng(frames: list, durations: list, fp: Any) -> None:
+    """Write frames as an endlessly looping animated PNG."""
+    frames[0].save(
+        fp,
+        format="PNG",
+        append_images=frames[1:],
+        save_all=True,
+        duration=durations,
+        loop=0,
+        optimize=True,
+    )
+
+
+def _encode_animation(frames: list, durations: list, fp: Any, ext: str) -> None:
+    """Write RGB frames in the animated format matching a file extension."""
+    if ext == IMAGE_FORMATS["webp"]:
+        _encode_webp(frames, durations, fp)
+    elif ext == IMAGE_FORMATS["apng"]:
+        _encode_apng(frames, durations, fp)
+    else:
+        palette = _shared_palette(frames)
+        quantized = [
+            frame.quantize(palette=palette, dither=Image.Dither.NONE)
+            for frame in frames
+        ]
+        _encode_gif(quantized, durations, fp)
+
+
+def resize_image_bytes(data: bytes, width: int = None, height: int = None) -> bytes:
+    """Downscale image data to fit within width x height.
+
+    The aspect ratio and image format are kept and every frame of an
+    animation is resized. Images are never scaled up.
+
+    Returns bytes of the resized image, or the original data if it already fits
+    """
+    with Image.open(BytesIO(data)) as img:
+        image_format = img.format
+        bound = (width or img.width, height or img.height)
+        if img.width <= bound[0] and img.height <= bound[1]:
+            return data
+
+        frames = []
+        durations = []
+        for frame in ImageSequence.Iterator(img):
+            durations.append(frame.info.get("duration", 100))
+            frame = frame.convert("RGB")
+            frame.thumbnail(bound, resample=Image.Resampling.LANCZOS)
+            frames.append(frame)
+
+    output = BytesIO()
+    if len(frames) > 1:
+        ext = {"WEBP": IMAGE_FORMATS["webp"], "PNG": IMAGE_FORMATS["apng"]}.get(
+            image_format, IMAGE_FORMATS["gif"]
+        )
+        _encode_animation(frames, durations, output, ext)
+    elif image_format in (None, "JPEG", "MPO"):
+        frames[0].save(output, format="JPEG", quality=STREAM_JPEG_QUALITY)
+    else:
+        frames[0].save(output, format=image_format)
+    return output.getvalue()
+
+
+def save_animation(frames: list, path: str, duration: int) -> dict:
+    """Encode frames into an optimized animation.
+
+    The format follows the file extension of path: animated WebP for .webp,
+    APNG for .png and GIF for anything else.
+
+    Identical consecutive frames are collapsed into one (their display
+    times are added together). GIFs additionally have all frames mapped onto
+    a single shared adaptive palette and are written with Pillow's optimizer.
+    The bytes and seconds saved are estimated from the frames dropped, at the
+    average size and encoding time of the frames kept.
+
+    Returns dict of encoder statistics
+    """
+    start = time.perf_counter()
+    rgb_frames = [frame.convert("RGB") for frame in frames]
+
+    unique = []
+    durations = []
+    last = None
+    for frame in rgb_frames:
+        raw = frame.tobytes()
+        if raw == last and frame.size == unique[-1].size:
+            durations[-1] += duration
+            continue
+        unique.append(frame)
+        durations.append(duration)
+        last = raw
+
+    encode_start = time.perf_counter()
+    with publish_file(path) as the_file:
+        _encode_animation(
+            unique, durations, the_file, os.path.splitext(path)[1].lower()
+        )
+    encode_seconds = time.perf_counter() - encode_start
+
+    dropped = len(rgb_frames) - len(unique)
+    size = os.path.getsize(path)
+    stats = {
+        "frames": len(rgb_frames),
+        "unique_frames": len(unique),
+        "bytes": size,
+        "seconds": round(time.perf_counter() - start, 3),
+        "bytes_saved": round(size * dropped / len(unique)),
+        "seconds_saved": round(encode_seconds * dropped / len(unique), 3),
+    }
+
+    _LOGGER.debug("Animation written to %s: %s", path, stats)
+    return stats
+
+
+class FrameStore:
+    """In-memory frames for cameras running in stream mode.
+
+    The update pipeline fills this from the executor while the cameras read
+    from it on the event loop, so every access goes through a lock. Frames are
+    kept JPEG encoded, ready to be written to an MJPEG stream as-is.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the frame store."""
+        self._lock = threading.Lock()
+        self._frames = {}
+
+    def set(self, camera: str, frames: list, interval: float) -> None:
+        """Encode and store frames for a camera, replacing the previous set."""
+        encoded = []
+        for frame in frames:
+            buffer = BytesIO()
+            frame.convert("RGB").save(
+                buffer, format="JPEG", quality=STREAM_JPEG_QUALITY
+            )
+            encoded.append(buffer.getvalue())
+        with self._lock:
+            self._frames[camera] = (encoded, float(interval))
+        _LOGGER.debug("Stored %s stream frames for %s", len(encoded), camera)
+
+    def load(self, camera: str, paths: list, interval: float) -> bool:
+        """Decode image files and store them as the frames for a camera.
+
+        Returns True if at least one frame was stored
+        """
+        frames = []
+        for path in paths:
+            try:
+                with Image.open(path) as img:
+                    frames.append(ImageOps.exif_transpose(img).convert("RGB"))
+            except Exception as err:
+                _LOGGER.error("Error attempting to read image %s: %s", path, err)
+        if not frames:
+            self.clear(camera)
+            return False
+        self.set(camera, frames, interval)
+        return True
+
+    def get(self, camera: str) -> tuple[list, float]:
+        """Return the frames and frame interval stored for a camera."""
+        with self._lock:
+            return self._frames.get(camera, ([], 0.0))
+
+    def clear(self, camera: str) -> None:
+        """Remove the frames stored for a camera."""
+        with self._lock:
+            self._frames.pop(camera, None)
+
+
 def random_filename(ext: str = ".jpg") -> str:
     """Generate random filename."""
     return f"{str(uuid.uuid4())}{ext}"
 
 
+@contextmanager
+def _ffmpeg_input(image: str) -> Iterator[str]:
+    """Yield a GIF of the animation at image for ffmpeg to read.
+
+    Not every ffmpeg build decodes animated WebP, so other formats are
+    converted to a temporary GIF that is removed again afterwards.
+    """
+    if os.path.splitext(image)[1].lower() == IMAGE_FORMATS["gif"]:
+        yield image
+        return
+
+    gif_image = f"{os.path.splitext(image)[0]}_ffmpeg{IMAGE_FORMATS['gif']}"
+    try:
+        with Image.open(image) as img:
+            frames = []
+            durations = []
+            for frame in ImageSequence.Iterator(img):
+                durations.append(frame.info.get("duration", 100))
+                frames.append(frame.convert("RGB"))
+        with open(gif_image, "wb") as the_file:
+            _encode_animation(frames, durations, the_file, IMAGE_FORMATS["gif"])
+    except Exception as err:
+        _LOGGER.error("Error converting %s for ffmpeg: %s", image, err)
+        with suppress(OSError):
+            os.remove(gif_image)
+        gif_image = image
+
+    if gif_image == image:
+        yield image
+        return
+    try:
+        yield gif_image
+    finally:
+        with suppress(OSError):
+            os.remove(gif_image)
+
+
 def _generate_mp4(path: str, image_file: str) -> None:
     """Generate mp4 from gif.
 
@@ -1137,7 +2261,7 @@ def _generate_mp4(path: str, image_file: str) -> None:
     comamnd: ffmpeg -f gif -i infile.gif outfile.mp4
     """
     gif_image = os.path.join(path, image_file)
-    mp4_file = os.path.join(path, image_file.replace(".gif", ".mp4"))
+    mp4_file = os.path.join(path, f"{os.path.splitext(image_file)[0]}.mp4")
     filecheck = os.path.isfile(mp4_file)
     _LOGGER.debug("Generating mp4: %s", mp4_file)
     if filecheck:
@@ -1145,18 +2269,19 @@ def _generate_mp4(path: str, image_file: str) -> None:
         _LOGGER.debug("Removing old mp4: %s", mp4_file)
 
     try:
-        cmd = [
-            "ffmpeg",
-            "-y",
-            "-i",
-            gif_image,
-            "-pix_fmt",
-            "yuv420p",
-            mp4_file,
-        ]
-        subprocess.run(
-            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
-        )
+        with _ffmpeg_input(gif_image) as input_image:
+            cmd = [
+                "ffmpeg",
+                "-y",
+                "-i",
+                input_image,
+                "-pix_fmt",
+                "yuv420p",
+                mp4_file,
+            ]
+            subprocess.run(
+                cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+            )
     except subprocess.CalledProcessError as err:
         _LOGGER.error("FFmpeg failed to generate MP4: %s", err)
 
@@ -1174,7 +2299,7 @@ def generate_grid_img(path: str, image_file: str, count: int) -> None:
         length = int(count / 2) + count % 2
 
     gif_image = os.path.join(path, image_file)
-    png_file = os.path.join(path, image_file.replace(".gif", "_grid.png"))
+    png_file = os.path.join(path, f"{os.path.splitext(image_file)[0]}_grid.png")
     filecheck = os.path.isfile(png_file)
     _LOGGER.debug("Generating png image grid: %s", png_file)
     if filecheck:
@@ -1182,26 +2307,30 @@ def generate_grid_img(path: str, image_file: str, count: int) -> None:
         _LOGGER.debug("Removing old png grid: %s", png_file)
 
     # TODO: find a way to call ffmpeg the right way from HA
-    subprocess.call(
-        [
-            "ffmpeg",
-            "-i",
-            gif_image,
-            "-r",
-            "0.20",
-            "-filter_complex",
-            f"tile=2x{length}:padding=10:color=black",
-            png_file,
-        ],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+    with _ffmpeg_input(gif_image) as input_image:
+        subprocess.call(
+            [
+                "ffmpeg",
+                "-i",
+                input_image,
+                "-r",
+                "0.20",
+                "-filter_complex",
+                f"tile=2x{length}:padding=10:color=black",
+                png_file,
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
 
 
-def resize_images(images: list, width: int, height: int) -> list:
+def resize_images(
+    images: list, width: int, height: int, output_path: str = None
+) -> list:
     """Resize images.
 
-    This should keep the aspect ratio of the images
+    This should keep the aspect ratio of the images, resized images are
+    written next to the originals unless an output_path is given
     Returns list of images
     """
     all_images = []
@@ -1220,6 +2349,8 @@ def resize_images(images: list, width: int, height: int) -> list:
                     img = img.crop((0, 0, width, height))
 
                     pre = os.path.splitext(image)[0]
+                    if output_path is not None:
+                        pre = os.path.join(output_path, os.path.basename(pre))
                     image = pre + ".gif"
                     img.save(image, img.format)
                     fd_img.close()
@@ -1252,66 +2383,42 @@ def copy_overlays(path: str) -> None:
 def cleanup_images(path: str, image: Optional[str] = None) -> None:
     """Clean up image storage directory.
 
-    Only supose to delete .gif, .mp4, and .jpg files
+    Only supose to delete .gif, .mp4, .jpg, .png and .webp files
     """
-    _LOGGER.warning("=== cleanup_images CALLED === path: %s, image: %s", path, image)
-
     if isinstance(path, tuple):
-        path = path[0]
-        image = path[1]
+        path, image = path
     if image is not None:
-        full_path = path + image
-        _LOGGER.warning("cleanup_images - Removing specific file: %s", full_path)
+        full_path = os.path.join(path, image)
         try:
             if os.path.exists(full_path):
                 os.remove(full_path)
-                _LOGGER.warning("cleanup_images - Successfully removed: %s", full_path)
-            else:
-                _LOGGER.warning("cleanup_images - File does not exist: %s", full_path)
+                _LOGGER.debug("Removed image: %s", full_path)
         except Exception as err:
             _LOGGER.error("Error attempting to remove image: %s", err)
         return
 
     # Only clean up if directory exists
     if not os.path.isdir(path):
-        _LOGGER.warning("cleanup_images - Directory does not exist: %s", path)
+        _LOGGER.debug("Image directory does not exist: %s", path)
         return
 
+    removed = 0
     try:
-        files_before = os.listdir(path)
-        _LOGGER.warning(
-            "cleanup_images - Files in directory BEFORE cleanup: %s", files_before
-        )
-        for file in files_before:
-            if (
-                file.endswith(".gif")
-                or file.endswith(".mp4")
-                or file.endswith(".jpg")
-                or file.endswith(".png")
-            ):
+        for file in os.listdir(path):
+            if file.endswith((".gif", ".mp4", ".jpg", ".png", ".webp")):
                 full_path = path + file
-                _LOGGER.warning("cleanup_images - Removing file: %s", full_path)
                 try:
                     if os.path.exists(full_path):
                         os.remove(full_path)
-                        _LOGGER.warning(
-                            "cleanup_images - Successfully removed: %s", full_path
-                        )
-                    else:
-                        _LOGGER.warning(
-                            "cleanup_images - File does not exist: %s", full_path
-                        )
+                        removed += 1
                 except Exception as err:
                     _LOGGER.error("Error attempting to remove found image: %s", err)
-        files_after = os.listdir(path) if os.path.isdir(path) else []
-        _LOGGER.warning(
-            "cleanup_images - Files in directory AFTER cleanup: %s", files_after
-        )
     except FileNotFoundError:
         # Directory was removed between check and listdir
-        _LOGGER.warning("cleanup_images - Directory removed during cleanup: %s", path)
+        _LOGGER.debug("Image directory removed during cleanup: %s", path)
     except Exception as err:
         _LOGGER.error("Error listing directory for cleanup: %s", err)
+    _LOGGER.debug("Removed %s images from %s", removed, path)
 
 
 def get_count(
@@ -1324,9 +2431,14 @@ def get_count(
     amazon_domain: Optional[str] = None,
     forwarded_emails: list[str] = None,
     data: Optional[dict] = None,
+    store: ImageStore = None,
+    budget: PollBudget = None,
 ) -> dict:
     """Get Package Count.
 
+    Delivery photos, tracking numbers and the delivered-by-others scan are
+    skipped once the poll budget is used up.
+
     Returns dict of sensor data
     """
     count = 0
@@ -1348,6 +2460,8 @@ def get_count(
             amazon_domain,
             forwarded_emails,
             data,
+            store,
+            budget,
         )
         result[ATTR_TRACKING] = ""
         return result
@@ -1458,6 +2572,7 @@ def get_count(
         email_addresses = sensor_email
 
     is_delivered_sensor = sensor_type.endswith("_delivered")
+    delivered_by_others = 0
 
     # Loop through all subjects (unified path for both generic delivery and normal sensors)
     for subject in subjects:
@@ -1510,7 +2625,7 @@ def get_count(
                     count += len(new_email_ids)
 
             # If generic delivery sensor, extract images from emails
-            if shipper_name:
+            if shipper_name and (budget is None or budget.allows("delivery photos")):
                 for email_id in new_email_ids:
                     msg = email_fetch(account, email_id, "(RFC822)")[1]
                     for response_part in msg:
@@ -1618,6 +2733,7 @@ def get_count(
                 and sensor_type != AMAZON_DELIVERED
                 and data is not None
                 and new_email_ids
+                and (budget is None or budget.allows("delivered by others scan"))
             ):
                 # Use original email_data for Amazon check (all emails, not just new ones)
                 amazon_mentions = find_text(
@@ -1627,9 +2743,7 @@ def get_count(
                     False,
                 )
                 if amazon_mentions > 0:
-                    data["amazon_delivered_by_others"] = (
-                        data.get("amazon_delivered_by_others", 0) + amazon_mentions
-                    )
+                    delivered_by_others += amazon_mentions
                     _LOGGER.debug(
                         "Sensor: %s — Found %s mention(s) of 'AMAZON' in delivered email.",
                         sensor_type,
@@ -1643,13 +2757,20 @@ def get_count(
         if count == 0 and not new_image_saved and no_delivery_image_file:
             # Clean up image directory before setting default (use absolute path)
             # Only clean up if directory exists
-            if os.path.isdir(absolute_shipper_path):
+            if store is None and os.path.isdir(absolute_shipper_path):
                 cleanup_images(absolute_shipper_path)
             try:
                 # Ensure directory exists before copying (use absolute path)
                 if not os.path.isdir(absolute_shipper_path):
                     os.makedirs(absolute_shipper_path, exist_ok=True)
-                copyfile(no_delivery_image_file, absolute_shipper_path + image_name)
+                if store is not None:
+                    write_placeholder(
+                        no_delivery_image_file,
+                        absolute_shipper_path + image_name,
+                        store,
+                    )
+                else:
+                    copyfile(no_delivery_image_file, absolute_shipper_path + image_name)
                 if data is not None:
                     data[image_attr] = image_name
             except Exception as err:
@@ -1663,7 +2784,12 @@ def get_count(
     ):
         track = SENSOR_DATA[tracking_sensor_key][ATTR_PATTERN][0]
 
-    if track is not None and get_tracking_num and count > 0:
+    if (
+        track is not None
+        and get_tracking_num
+        and count > 0
+        and (budget is None or budget.allows("tracking numbers"))
+    ):
         for sdata in found:
             tracking.extend(get_tracking(sdata, account, track))
         tracking = list(dict.fromkeys(tracking))
@@ -1673,6 +2799,8 @@ def get_count(
         count = len(tracking)
 
     result[ATTR_TRACKING] = tracking
+    if is_delivered_sensor and sensor_type != AMAZON_DELIVERED:
+        result["amazon_delivered_by_others"] = delivered_by_others
 
     # Always ensure ATTR_COUNT is set before returning
     result[ATTR_COUNT] = count
@@ -1905,8 +3033,7 @@ def _generic_delivery_image_extraction(
                             len(image_data) if image_data else 0,
                             full_path,
                         )
-                        with open(full_path, "wb") as the_file:
-                            the_file.write(image_data)
+                        publish_bytes(full_path, image_data)
                         _LOGGER.debug(
                             "%s - File write completed, verifying file exists...",
                             shipper_name,
@@ -1971,8 +3098,7 @@ def _generic_delivery_image_extraction(
                         len(image_data) if image_data else 0,
                         full_path,
                     )
-                    with open(full_path, "wb") as the_file:
-                        the_file.write(image_data)
+                    publish_bytes(full_path, image_data)
                     _LOGGER.debug(
                         "%s - File write completed, verifying file exists...",
                         shipper_name,
@@ -2049,8 +3175,7 @@ def _generic_delivery_image_extraction(
                         len(image_data) if image_data else 0,
                         full_path,
                     )
-                    with open(full_path, "wb") as the_file:
-                        the_file.write(image_data)
+                    publish_bytes(full_path, image_data)
                     _LOGGER.debug(
                         "%s - File write completed, verifying file exists...",
                         shipper_name,
@@ -2098,6 +3223,8 @@ def amazon_search(
     amazon_domain: str,
     fwds: str = None,
     coordinator_data: Optional[dict] = None,
+    store: ImageStore = None,
+    budget: PollBudget = None,
 ) -> int:
     """Find Amazon Delivered email.
 
@@ -2112,8 +3239,9 @@ def amazon_search(
 
     _LOGGER.debug("Today's date: %s", today)
     _LOGGER.debug("Amazon delivered subjects to search: %s", subjects)
-    _LOGGER.debug("Cleaning up amazon images...")
-    cleanup_images(f"{image_path}amazon/")
+    if store is None:
+        _LOGGER.debug("Cleaning up amazon images...")
+        cleanup_images(f"{image_path}amazon/")
 
     address_list = amazon_email_addresses(fwds, amazon_domain)
     _LOGGER.debug("Amazon email list: %s", address_list)
@@ -2132,13 +3260,14 @@ def amazon_search(
             )
             _LOGGER.debug("Email IDs found: %s", data[0])
 
-            get_amazon_image(
-                data[0],
-                account,
-                image_path,
-                hass,
-                amazon_image_name,
-            )
+            if budget is None or budget.allows("delivery photos"):
+                get_amazon_image(
+                    data[0],
+                    account,
+                    image_path,
+                    hass,
+                    amazon_image_name,
+                )
         else:
             _LOGGER.debug("No Amazon delivered emails found for subject '%s'", subject)
 
@@ -2146,7 +3275,12 @@ def amazon_search(
         _LOGGER.debug("No Amazon deliveries found.")
         nomail = f"{os.path.dirname(__file__)}/no_deliveries_amazon.jpg"
         try:
-            copyfile(nomail, f"{image_path}amazon/" + amazon_image_name)
+            if store is not None:
+                write_placeholder(
+                    nomail, f"{image_path}amazon/" + amazon_image_name, store
+                )
+            else:
+                copyfile(nomail, f"{image_path}amazon/" + amazon_image_name)
             # Update coordinator data with the no-delivery filename
             if coordinator_data is not None:
                 coordinator_data[ATTR_AMAZON_IMAGE] = amazon_image_name
@@ -2225,8 +3359,7 @@ async def download_img(
                 if "image" in content_type:
                     data = await resp.read()
                     _LOGGER.debug("Downloading image to: %s", filepath)
-                    the_file = await hass.async_add_executor_job(open, filepath, "wb")
-                    the_file.write(data)
+                    await hass.async_add_executor_job(publish_bytes, filepath, data)
                     _LOGGER.debug("Amazon image downloaded")
         except aiohttp.ClientError as err:
             _LOGGER.error("Problem downloading file connection error: %s", err)
@@ -2807,44 +3940,77 @@ def get_items(
     return value
 
 
-async def generate_delivery_gif(delivery_images: list, gif_path: str) -> bool:
+def image_content_type(data: bytes) -> str:
+    """Return the MIME type of image data based on its signature."""
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    return "image/jpeg"
+
+
+async def generate_delivery_gif(
+    hass: HomeAssistant, delivery_images: list, gif_path: str
+) -> bool:
     """Generate an animated GIF from delivery images.
 
+    The work is done in the executor and skipped entirely when the delivery
+    images are unchanged since the animation at gif_path was last built.
+
     Args:
+        hass: Home Assistant instance
         delivery_images: List of image file paths
-        gif_path: Path where the GIF should be saved
+        gif_path: Path where the animation should be saved, the extension
+            selects GIF, WebP or APNG output
 
     Returns:
         bool: True if GIF was created successfully, False otherwise
     """
-    try:
-        # Open all images
-        corrected_images = []
-        for img_path in delivery_images:
-            img = Image.open(img_path)
-            img = ImageOps.exif_transpose(img)  # auto-rotates according to EXIF
-            corrected_images.append(img)
-
-        # Create animated GIF (3 seconds per image)
-        corrected_images[0].save(
-            gif_path,
-            format="GIF",
-            append_images=corrected_images[1:],
-            save_all=True,
-            duration=3000,  # 3 seconds per image
-            loop=0,  # Infinite loop
-        )
+    return await hass.async_add_executor_job(
+        _generate_delivery_gif, delivery_images, gif_path
+    )
 
-        _LOGGER.debug(
-            "Generated animated GIF with %d delivery images at %s",
-            len(delivery_images),
-            gif_path,
-        )
-        return True
 
-    except Exception as e:
-        _LOGGER.error("Error creating animated GIF: %s", e)
-        return False
+def _generate_delivery_gif(delivery_images: list, gif_path: str) -> bool:
+    """Build the delivery animation unless its inputs are unchanged.
+
+    Returns True if the animation at gif_path is current
+    """
+    with _DELIVERY_GIF_LOCK:
+        try:
+            inputs = tuple((path, os.path.getmtime(path)) for path in delivery_images)
+            if _DELIVERY_GIF_INPUTS.get(gif_path) == inputs and os.path.exists(
+                gif_path
+            ):
+                _LOGGER.debug("Delivery images unchanged, reusing %s", gif_path)
+                return True
+            _DELIVERY_GIF_INPUTS.pop(gif_path, None)
+
+            # Open all images
+            corrected_images = []
+            for img_path in delivery_images:
+                with Image.open(img_path) as img:
+                    # auto-rotates according to EXIF
+                    corrected_images.append(ImageOps.exif_transpose(img).convert("RGB"))
+
+            # Create animated GIF (3 seconds per image)
+            save_animation(
+                corrected_images, gif_path, DEFAULT_DELIVERY_FRAME_DURATION * 1000
+            )
+            _DELIVERY_GIF_INPUTS[gif_path] = inputs
+
+            _LOGGER.debug(
+                "Generated animated GIF with %d delivery images at %s",
+                len(delivery_images),
+                gif_path,
+            )
+            return True
+
+        except Exception as e:
+            _LOGGER.error("Error creating animated GIF: %s", e)
+            return False
 
 
 def generate_service_email_domains(amazon_fwds: list) -> set[str]:
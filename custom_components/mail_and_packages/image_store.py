@@ -0,0 +1,405 @@
+"""Manifest of the images written to the Mail and Packages image directory."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+
+from .const import (
+    DEFAULT_IMAGE_WRITE_MODE,
+    IMAGE_ENTRY_MANIFEST,
+    IMAGE_MANIFEST,
+    MIRROR_EXTENSIONS,
+    OVERLAY,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Image directory -> config entries with a store in it
+_ENTRIES: dict[str, set] = {}
+
+
+def _hash_contents(path: str) -> str:
+    """Return the SHA-1 hash of a file's contents."""
+    the_hash = hashlib.sha1()  # nosec
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            the_hash.update(chunk)
+    return the_hash.hexdigest()
+
+
+def _created(entry: dict) -> datetime.date:
+    """Return the date an image was created, a long time ago if unknown."""
+    try:
+        return datetime.datetime.strptime(entry.get("created"), "%d-%b-%Y").date()
+    except (TypeError, ValueError):
+        return datetime.date.min
+
+
+def _manifest_name(entry_id: str | None) -> str:
+    """Return the file name of the manifest of a config entry."""
+    if entry_id is None:
+        return IMAGE_MANIFEST
+    return IMAGE_ENTRY_MANIFEST.format(entry_id)
+
+
+def _subdirectories(path: str) -> list:
+    """Return the directories directly inside path."""
+    try:
+        return [entry.path for entry in os.scandir(path) if entry.is_dir()]
+    except OSError:
+        return []
+
+
+class ImageStore:
+    """Track the images in the image directory and where they came from.
+
+    Every image the integration publishes is recorded in a small JSON
+    manifest kept in the image directory, by name relative to that directory:
+
+        {"amazon/<uuid>.jpg": {"hash": ..., "created": "19-Oct-2026",
+                               "kind": "amazon", "mtime": ..., "size": ...}}
+
+    The hash identifies the content (for a placeholder, the hash of the
+    bundled image it was made from) and is trusted for as long as the file's
+    mtime and size are unchanged, so no file is hashed twice. The store is
+    only used from the update job, one poll at a time.
+
+    Because every image is in the manifest, images that are no longer in use
+    are collected from it once per poll, without listing any directory.
+    Entries can share an image directory, so each keeps its own manifest and
+    never removes an image another entry's manifest holds.
+
+    It also carries the write mode for placeholder images, counts the
+    bytes written and avoided during a poll and numbers the generations of
+    published images.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        write_mode: str = DEFAULT_IMAGE_WRITE_MODE,
+        entry_id: str = None,
+    ) -> None:
+        """Initialize the store of a config entry for an image directory."""
+        self.path = os.path.join(path, "")
+        self.write_mode = write_mode
+        self.entry_id = entry_id
+        self.bytes_written = 0
+        self.bytes_avoided = 0
+        self.generation = 0
+        self._published = None
+        self._manifest_path = os.path.join(self.path, _manifest_name(entry_id))
+        self._entries = {}
+        self._sources = {}
+        self._placeholders = {}
+        self._live = set()
+        self._loaded = False
+        self._dirty = False
+        self._adopt = False
+        _ENTRIES.setdefault(self.path, set()).add(entry_id)
+
+    def load(self) -> None:
+        """Read the manifest from disk, once."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._manifest_path, encoding="utf-8") as file:
+                entries = json.load(file)
+        except (OSError, ValueError) as err:
+            _LOGGER.debug("Starting a new image manifest: %s", err)
+            # Images written before there was a manifest are adopted once
+            self._adopt = True
+            return
+        if isinstance(entries, dict):
+            self._entries = entries
+
+    def save(self) -> None:
+        """Write the manifest to disk if it changed."""
+        if not self._dirty:
+            return
+        temp_path = f"{self._manifest_path}.tmp"
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(self._entries, file)
+            os.replace(temp_path, self._manifest_path)
+            self._dirty = False
+        except OSError as err:
+            _LOGGER.error("Problem saving image manifest: %s", err)
+
+    def begin_poll(self) -> None:
+        """Reset the write counters and images in use for a new poll."""
+        self.bytes_written = 0
+        self.bytes_avoided = 0
+        self._live = set()
+
+    def count_write(self, written: int = 0, avoided: int = 0) -> None:
+        """Count bytes written to, or spared from, the image directory."""
+        self.bytes_written += written
+        self.bytes_avoided += avoided
+
+    def relative(self, path: str) -> str | None:
+        """Return path relative to the image directory, None if outside it."""
+        path = os.path.abspath(path)
+        root = os.path.abspath(self.path)
+        if os.path.commonpath([path, root]) != root:
+            return None
+        return os.path.relpath(path, root)
+
+    def get(self, name: str) -> dict | None:
+        """Return the manifest entry for an image name."""
+        self.load()
+        return self._entries.get(name)
+
+    def latest(self, kind: str) -> str | None:
+        """Return the name most recently recorded for a kind of image."""
+        self.load()
+        for name in reversed(list(self._entries)):
+            if self._entries[name].get("kind") == kind:
+                return name
+        return None
+
+    def digest(self, path: str) -> str:
+        """Return the content hash of a file, hashing it only if it changed.
+
+        Raises OSError if the file can not be read
+        """
+        self.load()
+        stat = os.stat(path)
+        name = self.relative(path)
+        if name not in self._entries:
+            name = None
+        entry = self._entries[name] if name else self._sources.get(path)
+        if (
+            entry
+            and entry.get("mtime") == stat.st_mtime_ns
+            and entry.get("size") == stat.st_size
+        ):
+            return entry["hash"]
+
+        digest = _hash_contents(path)
+        _LOGGER.debug("Hashed %s: %s", path, digest)
+        if name is None:
+            self._sources[path] = {
+                "hash": digest,
+                "mtime": stat.st_mtime_ns,
+                "size": stat.st_size,
+            }
+        else:
+            entry.update(hash=digest, mtime=stat.st_mtime_ns, size=stat.st_size)
+            self._dirty = True
+        return digest
+
+    def set_placeholder(self, kind: str, digest: str) -> None:
+        """Remember the content hash of the placeholder for a kind of image."""
+        self._placeholders[kind] = digest
+
+    def status(self, images: dict) -> dict:
+        """Return the hash of each image and whether it is its placeholder.
+
+        images maps each kind of image to its path, unreadable images are left out
+        """
+        status = {}
+        for kind, path in images.items():
+            try:
+                digest = self.digest(path)
+            except OSError as err:
+                _LOGGER.debug("Unable to check %s image %s: %s", kind, path, err)
+                continue
+            status[kind] = {
+                "hash": digest,
+                "placeholder": digest == self._placeholders.get(kind),
+            }
+        return status
+
+    def publish(self, images: dict, status: dict) -> int:
+        """Return the image generation, a new one if any image changed.
+
+        images maps each kind of image to its path and status is what
+        status() returned for them.
+        """
+        published = {
+            kind: (path, status.get(kind, {}).get("hash"))
+            for kind, path in images.items()
+        }
+        if published != self._published:
+            self._published = published
+            self.generation += 1
+            _LOGGER.debug("Published image generation %s", self.generation)
+        return self.generation
+
+    def record(
+        self, name: str, digest: str, kind: str = None, created: str = None
+    ) -> None:
+        """Record the image just written under name with its content hash.
+
+        The kind and created date of an image already in the manifest are
+        kept unless given.
+        """
+        self.load()
+        previous = self._entries.get(name, {})
+        kind = kind or previous.get("kind")
+        created = created or previous.get("created")
+        try:
+            stat = os.stat(os.path.join(self.path, name))
+            mtime, size = stat.st_mtime_ns, stat.st_size
+        except OSError:
+            # Unknown on disk, the hash is recomputed on next use
+            mtime = size = None
+        self._entries.pop(name, None)
+        self._entries[name] = {
+            "hash": digest,
+            "created": created,
+            "kind": kind,
+            "mtime": mtime,
+            "size": size,
+        }
+        self._live.add(name)
+        self._dirty = True
+
+    def track(self, path: str, kind: str, created: str) -> None:
+        """Track a file written this poll that has no content hash yet."""
+        name = self.relative(path)
+        if name is None:
+            return
+        self.load()
+        if name not in self._entries or self._entries[name].get("adopted"):
+            self._entries[name] = {
+                "hash": None,
+                "created": created,
+                "kind": kind,
+                "mtime": None,
+                "size": None,
+            }
+            self._dirty = True
+        self._live.add(name)
+
+    def collect(self, in_use: list, days: int, today: datetime.date) -> int:
+        """Remove the images that are no longer in use.
+
+        Images recorded or tracked this poll and the paths in in_use are kept,
+        as is anything created within the last days days. Everything else in
+        the manifest is deleted in a single pass.
+
+        Returns the number of files removed
+        """
+        self.load()
+        if self._adopt:
+            self._adopt_files(today)
+        live = self._live | {self.relative(path) for path in in_use}
+        cutoff = today - datetime.timedelta(days=days)
+        removed = 0
+        shared = None
+        for name in list(self._entries):
+            if name in live or _created(self._entries[name]) > cutoff:
+                continue
+            if shared is None:
+                shared = self._shared()
+            if name in shared:
+                continue
+            try:
+                os.remove(os.path.join(self.path, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as err:
+                _LOGGER.debug("Unable to remove image %s: %s", name, err)
+                continue
+            del self._entries[name]
+            self._dirty = True
+        if removed:
+            _LOGGER.debug("Removed %s images no longer in use", removed)
+        return removed
+
+    def remove(self) -> int:
+        """Remove the images of a deleted entry and its manifest.
+
+        Images another entry in the image directory holds are kept.
+
+        Returns the number of files removed
+        """
+        self.load()
+        shared = self._shared()
+        removed = 0
+        for name in self._entries:
+            if name in shared:
+                continue
+            try:
+                os.remove(os.path.join(self.path, name))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as err:
+                _LOGGER.debug("Unable to remove image %s: %s", name, err)
+        try:
+            os.remove(self._manifest_path)
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            _LOGGER.error("Problem removing image manifest: %s", err)
+        self._entries = {}
+        self._dirty = False
+        self.close()
+        _LOGGER.debug("Removed %s images of entry %s", removed, self.entry_id)
+        return removed
+
+    def close(self) -> None:
+        """Stop counting the entry among those using the image directory."""
+        entries = _ENTRIES.get(self.path)
+        if entries is None:
+            return
+        entries.discard(self.entry_id)
+        if not entries:
+            del _ENTRIES[self.path]
+
+    def _shared(self) -> set:
+        """Return the images the other entries in the image directory hold.
+
+        Images those entries only adopted are left out, so images written
+        before there were manifests are still collected.
+        """
+        shared = set()
+        for entry_id in _ENTRIES.get(self.path, set()) - {self.entry_id}:
+            path = os.path.join(self.path, _manifest_name(entry_id))
+            try:
+                with open(path, encoding="utf-8") as file:
+                    entries = json.load(file)
+            except (OSError, ValueError) as err:
+                _LOGGER.debug("Unable to read image manifest %s: %s", path, err)
+                continue
+            if isinstance(entries, dict):
+                shared.update(
+                    name
+                    for name, entry in entries.items()
+                    if not (isinstance(entry, dict) and entry.get("adopted"))
+                )
+        return shared
+
+    def _adopt_files(self, today: datetime.date) -> None:
+        """Add the images already in the image directory to the manifest."""
+        self._adopt = False
+        created = today.strftime("%d-%b-%Y")
+        for directory in [self.path, *_subdirectories(self.path)]:
+            try:
+                files = os.listdir(directory)
+            except OSError:
+                continue
+            for file in files:
+                if file in OVERLAY or not file.endswith(MIRROR_EXTENSIONS):
+                    continue
+                name = self.relative(os.path.join(directory, file))
+                if name not in self._entries:
+                    self._entries[name] = {
+                        "hash": None,
+                        "created": created,
+                        "kind": None,
+                        "mtime": None,
+                        "size": None,
+                        "adopted": True,
+                    }
+                    self._dirty = True
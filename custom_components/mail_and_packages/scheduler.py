@@ -0,0 +1,196 @@
+"""Polls of every config entry that share a mail server."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import random
+import threading
+import time
+from typing import AsyncIterator
+
+from .breaker import CircuitBreaker
+from .const import (
+    HOST_COMMAND_BURST,
+    HOST_COMMAND_RATE,
+    HOST_POLL_JITTER,
+    HOST_POLL_SPACING,
+    HOST_SESSIONS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket, shared by the update jobs of every config entry.
+
+    A token is reserved rather than taken, so the caller learns how long to
+    wait before using it without holding the lock while it waits. A rate of
+    0 is no limit.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, now: float = None) -> float:
+        """Reserve a token.
+
+        Returns the seconds to wait before the token may be used
+        """
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            elapsed = max(0.0, now - self._updated)
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class HostQueue:
+    """Time one poll spent waiting for its turn on the mail server."""
+
+    def __init__(self, bucket: TokenBucket, waited: float = 0.0) -> None:
+        """Initialize with the time the poll waited to start."""
+        self.bucket = bucket
+        self.waited = waited
+        self.command_wait = 0.0
+
+    def command(self) -> None:
+        """Wait until the mail server may be sent another command.
+
+        Called from the update job before each command
+        """
+        wait = self.bucket.reserve()
+        if wait:
+            time.sleep(wait)
+            self.command_wait += wait
+
+    def report(self) -> dict:
+        """Return the seconds the poll and its commands were queued."""
+        return {
+            "poll": round(self.waited, 3),
+            "commands": round(self.command_wait, 3),
+        }
+
+
+class _Host:
+    """Sessions, commands, queueing delays and logins of one mail server."""
+
+    def __init__(self, host: str, sessions: int, rate: float, burst: int) -> None:
+        """Initialize the host."""
+        self.breaker = CircuitBreaker(host)
+        self.sessions = asyncio.Semaphore(sessions)
+        self.bucket = TokenBucket(rate, burst)
+        self.next_start = 0.0
+        self.waiting = 0
+        self.polls = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    def record(self, delay: float) -> None:
+        """Record the time a poll waited to start."""
+        self.polls += 1
+        self.total_delay += delay
+        self.max_delay = max(self.max_delay, delay)
+
+
+class HostScheduler:
+    """Spread the polls of every config entry over the mail servers they use.
+
+    One scheduler is kept in hass.data[DOMAIN] and shared by every
+    coordinator. On each host a poll starts at least spacing seconds after
+    the one before it, plus a random jitter if it had to wait, so entries
+    set up together drift apart instead of polling in step. At most
+    sessions polls of a host run at once and their commands share a token
+    bucket of rate commands per second.
+    """
+
+    def __init__(
+        self,
+        sessions: int = HOST_SESSIONS,
+        rate: float = HOST_COMMAND_RATE,
+        burst: int = HOST_COMMAND_BURST,
+        spacing: float = HOST_POLL_SPACING,
+        jitter: float = HOST_POLL_JITTER,
+    ) -> None:
+        """Initialize the scheduler with the limits of each host."""
+        self.sessions = sessions
+        self.rate = rate
+        self.burst = burst
+        self.spacing = spacing
+        self.jitter = jitter
+        self._hosts = {}
+
+    def _host(self, host: str) -> _Host:
+        """Return the state of a host, created on first use."""
+        key = (host or "").lower()
+        if key not in self._hosts:
+            self._hosts[key] = _Host(key, self.sessions, self.rate, self.burst)
+        return self._hosts[key]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        """Return the circuit breaker for logging into a host."""
+        return self._host(host).breaker
+
+    def _reserve_start(self, state: _Host, now: float) -> float:
+        """Reserve the next start on a host.
+
+        Returns the seconds to wait before starting
+        """
+        delay = max(0.0, state.next_start - now)
+        if delay:
+            delay += random.uniform(0, self.jitter)  # nosec
+        state.next_start = now + delay + self.spacing
+        return delay
+
+    @contextlib.asynccontextmanager
+    async def session(
+        self, host: str, stagger: bool = True
+    ) -> AsyncIterator[HostQueue]:
+        """Wait for the turn of a poll on a host and hold its session.
+
+        Without stagger the poll only waits for a free session, as on the
+        first refresh of an entry.
+
+        Yields the HostQueue of the poll
+        """
+        state = self._host(host)
+        start = time.monotonic()
+        state.waiting += 1
+        try:
+            delay = self._reserve_start(state, start) if stagger else 0
+            if delay:
+                _LOGGER.debug("Staggering poll of %s by %.1f seconds", host, delay)
+                await asyncio.sleep(delay)
+            await state.sessions.acquire()
+        finally:
+            state.waiting -= 1
+        try:
+            queue = HostQueue(state.bucket, time.monotonic() - start)
+            state.record(queue.waited)
+            _LOGGER.debug("Poll of %s queued for %.3f seconds", host, queue.waited)
+            yield queue
+        finally:
+            state.sessions.release()
+
+    def report(self, host: str) -> dict:
+        """Return the polls queued on a host and how long they waited."""
+        state = self._host(host)
+        return {
+            "polls": state.polls,
+            "waiting": state.waiting,
+            "average_delay": (
+                round(state.total_delay / state.polls, 3) if state.polls else 0.0
+            ),
+            "max_delay": round(state.max_delay, 3),
+        }
@@ -25,6 +25,8 @@ from .const import (
     ATTR_IMAGE_NAME,
     ATTR_IMAGE_PATH,
     ATTR_ORDER,
+    ATTR_STALE,
+    ATTR_STALE_SENSORS,
     ATTR_TRACKING_NUM,
     CONF_PATH,
     COORDINATOR,
@@ -135,6 +137,10 @@ class PackagesSensor(CoordinatorEntity, SensorEntity):
         if self.data is None:
             return attr
 
+        # The last update ran out of time or failed for this sensor
+        if self.type in data.get(ATTR_STALE_SENSORS, []):
+            attr[ATTR_STALE] = True
+
         if "Amazon" in self._name:
             if self._name == AMAZON_EXCEPTION and AMAZON_EXCEPTION_ORDER in data.keys():
                 attr[ATTR_ORDER] = data[AMAZON_EXCEPTION_ORDER]
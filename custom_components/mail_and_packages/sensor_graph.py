@@ -0,0 +1,331 @@
+"""Dependency graph of the sensors updated on every poll."""
+
+from __future__ import annotations
+
+import functools
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from graphlib import TopologicalSorter
+from typing import Any, Callable
+
+from .const import (
+    AMAZON_PACKAGES,
+    SENSOR_STAGES,
+    SENSOR_TIERS,
+    SHIPPERS,
+    TIER_NORMAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+ZPACKAGES_DELIVERED = "zpackages_delivered"
+ZPACKAGES_TRANSIT = "zpackages_transit"
+# Totals add up whichever of their sensors succeeded
+TOTALS = (ZPACKAGES_DELIVERED, ZPACKAGES_TRANSIT)
+
+
+def _dependencies(sensor: str) -> tuple:
+    """Return the sensors a shipper sensor is computed from."""
+    if sensor == AMAZON_PACKAGES:
+        return ()
+    if "_packages" in sensor:
+        prefix = sensor.replace("_packages", "")
+        return (f"{prefix}_delivering", f"{prefix}_delivered")
+    if "_delivering" in sensor:
+        prefix = sensor.replace("_delivering", "")
+        return (f"{prefix}_delivered",)
+    return ()
+
+
+def _totals(sensor: str, sensors: dict) -> tuple:
+    """Return the sensors a total is computed from, of those in the graph."""
+    if sensor == ZPACKAGES_DELIVERED:
+        wanted = [f"{shipper}_delivered" for shipper in SHIPPERS]
+    else:
+        # Amazon packages delivered by other shippers are counted by the
+        # delivered sensors and taken off the packages in transit
+        wanted = [
+            f"{shipper}_delivering" for shipper in SHIPPERS if shipper != "amazon"
+        ]
+        wanted += [f"{shipper}_delivered" for shipper in SHIPPERS]
+        wanted.append(AMAZON_PACKAGES)
+    return tuple(name for name in wanted if name in sensors)
+
+
+class SensorGraph:
+    """Sensors to update and the sensors each of them is computed from.
+
+    The graph holds every sensor that is needed, whether it is enabled or
+    only a dependency of one that is, so each is computed exactly once per
+    poll. Sensors in the same batch do not depend on each other.
+
+    Sensors are also split into stages, run one after the other: a sensor
+    runs in its own stage (see SENSOR_STAGES) or the latest stage of the
+    sensors it depends on, whichever is later.
+    """
+
+    def __init__(self, resources: tuple) -> None:
+        """Build the graph for the enabled sensors."""
+        graph = {}
+        pending = list(resources)
+        while pending:
+            sensor = pending.pop(0)
+            if sensor in graph:
+                continue
+            if sensor in TOTALS:
+                graph[sensor] = ()
+                continue
+            graph[sensor] = _dependencies(sensor)
+            pending.extend(graph[sensor])
+        for sensor in TOTALS:
+            if sensor in graph:
+                graph[sensor] = _totals(sensor, graph)
+        self.graph = graph
+
+        sorter = TopologicalSorter(graph)
+        sorter.prepare()
+        batches = []
+        while sorter.is_active():
+            ready = sorter.get_ready()
+            batches.append(ready)
+            sorter.done(*ready)
+        self.batches = tuple(batches)
+        self.order = tuple(sensor for batch in batches for sensor in batch)
+
+        stage = {}
+        for sensor in self.order:
+            stage[sensor] = max(
+                [SENSOR_STAGES.get(sensor, 0)]
+                + [stage[dependency] for dependency in graph[sensor]]
+            )
+        self.stages = tuple(
+            tuple(sensor for sensor in self.order if stage[sensor] == number)
+            for number in sorted(set(stage.values()))
+        )
+
+    def run(
+        self,
+        compute: Callable[[str], Any],
+        data: dict,
+        workers: int = 1,
+        on_stage: Callable[[int], None] = None,
+    ) -> dict:
+        """Compute the sensors not already in data, dependencies first.
+
+        compute is called once per sensor as soon as the sensors it depends
+        on are done, on up to workers threads; it has to be thread safe when
+        workers is more than one. A sensor that depends on a failed sensor is
+        skipped, except for the totals. on_stage is called with the number of
+        each stage once it is done.
+
+        Returns the time taken by each sensor in milliseconds
+        """
+        timings = {}
+        failed = set()
+        executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for number, stage in enumerate(self.stages):
+                self._run_stage(stage, compute, data, executor, timings, failed)
+                _LOGGER.debug("Finished sensor stage %s: %s", number, stage)
+                if on_stage is not None:
+                    on_stage(number)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        _LOGGER.debug("Sensor timings (ms): %s", timings)
+        return timings
+
+    def _run_stage(
+        self,
+        stage: tuple,
+        compute: Callable[[str], Any],
+        data: dict,
+        executor: ThreadPoolExecutor | None,
+        timings: dict,
+        failed: set,
+    ) -> None:
+        """Compute the sensors of one stage, earlier stages are done."""
+        sorter = TopologicalSorter(
+            {
+                sensor: [
+                    dependency
+                    for dependency in self.graph[sensor]
+                    if dependency in stage
+                ]
+                for sensor in stage
+            }
+        )
+        sorter.prepare()
+        running = {}
+        while sorter.is_active():
+            for sensor in sorter.get_ready():
+                blocked = failed.intersection(self.graph[sensor])
+                if blocked and sensor not in TOTALS:
+                    _LOGGER.error(
+                        "Error updating sensor: %s reason: %s failed",
+                        sensor,
+                        ", ".join(sorted(blocked)),
+                    )
+                    failed.add(sensor)
+                elif sensor not in data:
+                    if executor is not None:
+                        running[executor.submit(_timed, compute, sensor)] = sensor
+                        continue
+                    self._finish(sensor, _timed(compute, sensor), timings, failed)
+                sorter.done(sensor)
+            if running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    sensor = running.pop(future)
+                    self._finish(sensor, future.result(), timings, failed)
+                    sorter.done(sensor)
+
+    @staticmethod
+    def _finish(sensor: str, result: tuple, timings: dict, failed: set) -> None:
+        """Record how long a sensor took and whether it failed."""
+        timings[sensor], err = result
+        if err is not None:
+            _LOGGER.error("Error updating sensor: %s reason: %s", sensor, err)
+            failed.add(sensor)
+
+
+class PollSchedule:
+    """Which sensors are due each poll and the last values of the others.
+
+    Every sensor belongs to a tier (see SENSOR_TIERS) that has its own
+    interval in minutes, and the coordinator polls at the shortest of them.
+    A tier is due once its interval has passed, give or take half a poll. A
+    sensor is due when its tier is, when a sensor it depends on is, or when
+    it has no value yet; the others keep the values of their last update.
+
+    A sensor that could not be updated keeps its last values too, is flagged
+    stale and is due again on the next poll.
+
+    A tier is not due again while the mailbox is in the state it was last
+    updated at, as its sensors would find the same; the poll is skipped when
+    that leaves no tier due. Every tier is due on the first poll of a new
+    day, when the images of the previous day are replaced.
+    """
+
+    def __init__(self, intervals: dict) -> None:
+        """Initialize the schedule with the interval of each tier."""
+        self.intervals = intervals
+        self.tick = min(intervals.values())
+        self.due_tiers = set(intervals)
+        self._refreshed = {}
+        self._values = {}
+        self._stale = set()
+        self._mailbox = {}
+        self._day = None
+        self.polls = 0
+        self.skipped = 0
+
+    def begin_poll(
+        self, now: float = None, mailbox: Any = None, day: Any = None
+    ) -> set:
+        """Work out the tiers due for a new poll.
+
+        mailbox, when given, is the state of the mailbox and the day the poll
+        searches from; tiers last updated at the same state are not due. day,
+        when given, is the day the poll searches from; every tier is due once
+        it changes.
+
+        Returns the set of tiers due
+        """
+        now = time.monotonic() if now is None else now
+        if day is not None and day != self._day:
+            self._day = day
+            self._refreshed = {}
+        slack = self.tick * 30
+        due_tiers = {
+            tier
+            for tier, interval in self.intervals.items()
+            if tier not in self._refreshed
+            or now - self._refreshed[tier] + slack >= interval * 60
+        }
+        self.due_tiers = {
+            tier
+            for tier in due_tiers
+            if mailbox is None or self._mailbox.get(tier) != mailbox
+        }
+        for tier in self.due_tiers:
+            self._refreshed[tier] = now
+            self._mailbox[tier] = mailbox
+        self.polls += 1
+        if due_tiers and not self.due_tiers:
+            self.skipped += 1
+            _LOGGER.debug("Mailbox unchanged, skipping the poll")
+        _LOGGER.debug("Sensor tiers due: %s", sorted(self.due_tiers))
+        return self.due_tiers
+
+    def report(self) -> dict:
+        """Return how many polls were skipped as the mailbox did not change."""
+        return {
+            "polls": self.polls,
+            "skipped": self.skipped,
+            "skip_rate": round(self.skipped / self.polls, 2) if self.polls else 0,
+        }
+
+    def carry(self, graph: SensorGraph, data: dict) -> list:
+        """Copy the last values of the sensors that are not due into data.
+
+        Returns the sensors carried forward
+        """
+        due = set()
+        carried = []
+        for sensor in graph.order:
+            if (
+                SENSOR_TIERS.get(sensor, TIER_NORMAL) in self.due_tiers
+                or sensor not in self._values
+                or sensor in self._stale
+                or due.intersection(graph.graph[sensor])
+            ):
+                due.add(sensor)
+                continue
+            data.update(self._values[sensor])
+            carried.append(sensor)
+        _LOGGER.debug("Sensors carried forward: %s", carried)
+        return carried
+
+    def remember(self, sensor: str, values: dict) -> None:
+        """Keep the values just fetched for a sensor."""
+        self._values[sensor] = values
+        self._stale.discard(sensor)
+
+    def is_stale(self, sensor: str) -> bool:
+        """Return True if the values of a sensor are from an earlier poll."""
+        return sensor in self._stale
+
+    def restore(self, sensor: str, data: dict) -> bool:
+        """Copy the last values of a sensor that could not be updated into data.
+
+        Returns False if the sensor has no values yet
+        """
+        self._stale.add(sensor)
+        if sensor not in self._values:
+            return False
+        data.update(self._values[sensor])
+        return True
+
+
+def _timed(compute: Callable[[str], Any], sensor: str) -> tuple:
+    """Compute a sensor.
+
+    Returns the time taken in milliseconds and the error raised, if any
+    """
+    start = time.perf_counter()
+    err = None
+    try:
+        compute(sensor)
+    except Exception as error:  # pylint: disable=broad-except
+        err = error
+    return round((time.perf_counter() - start) * 1000, 1), err
+
+
+@functools.lru_cache(maxsize=16)
+def compile_graph(resources: tuple) -> SensorGraph:
+    """Return the graph for a set of enabled sensors, built once."""
+    graph = SensorGraph(resources)
+    _LOGGER.debug("Sensor graph batches: %s", graph.batches)
+    return graph
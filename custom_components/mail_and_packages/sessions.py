@@ -0,0 +1,310 @@
+"""IMAP sessions shared by the config entries of the same mail account."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any
+
+from .budget import response_size
+from .const import (
+    SESSION_CACHE_BYTES,
+    SESSION_CACHE_SECONDS,
+    SESSION_IDLE_SECONDS,
+    SESSION_POOL_SIZE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# IMAP commands answered from the cache, they do not change the mailbox
+CACHED_COMMANDS = frozenset(("fetch", "search"))
+
+
+def _logout(account: Any) -> None:
+    """Log out of a connection that is no longer needed."""
+    try:
+        account.logout()
+    except Exception as err:  # pylint: disable=broad-except
+        _LOGGER.debug("Error logging out of IMAP Server: %s", err)
+
+
+def _copy(response: Any) -> Any:
+    """Return a copy of a response that callers may change."""
+    if isinstance(response, tuple) and len(response) == 2:
+        status, data = response
+        return status, list(data) if isinstance(data, list) else data
+    return response
+
+
+class AccountSessions:
+    """Connections and recent responses of one mail account.
+
+    Shared by every config entry logging into the same account. Connections
+    left idle by a poll are handed to the next poll that needs one, of any
+    entry, as long as they still answer. Search and fetch responses are kept
+    for SESSION_CACHE_SECONDS, up to SESSION_CACHE_BYTES, so entries polling
+    the account around the same time do the same work once. The status of its folders and the
+    searches run at that status are kept here too (see FolderAccount).
+    """
+
+    def __init__(self, key: tuple) -> None:
+        """Initialize the sessions of an account."""
+        self.key = key
+        self.entries = 0
+        self.folders = {}
+        self._idle = []
+        self._cache = {}
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def checkout(self, timeout: float = None, now: float = None) -> Any:
+        """Return an idle connection that still answers.
+
+        Returns None if there is none
+        """
+        now = time.monotonic() if now is None else now
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                account, idle_since = self._idle.pop()
+            if now - idle_since > SESSION_IDLE_SECONDS:
+                _logout(account)
+                continue
+            try:
+                account.sock.settimeout(timeout)
+                account.noop()
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.debug("Idle connection to %s is gone: %s", self.key[0], err)
+                continue
+            return account
+
+    def checkin(self, account: Any, now: float = None) -> None:
+        """Keep a connection for the next poll, or log out when enough are."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if len(self._idle) < SESSION_POOL_SIZE:
+                self._idle.append((account, now))
+                return
+        _logout(account)
+
+    def lookup(self, key: tuple, owner: Any, since: float, now: float) -> Any:
+        """Return a cached response, None if there is none.
+
+        A response is used by the poll that stored it, or by the polls of
+        other entries for SESSION_CACHE_SECONDS.
+        """
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is None:
+            return None
+        response, stored_by, stored_at = cached
+        if stored_by is owner:
+            return response if stored_at >= since else None
+        return response if now - stored_at <= SESSION_CACHE_SECONDS else None
+
+    def store(self, key: tuple, response: Any, owner: Any, now: float) -> None:
+        """Keep a response for the polls of every entry.
+
+        The oldest responses are forgotten once they take too much memory.
+        """
+        size = response_size(response)
+        if size > SESSION_CACHE_BYTES:
+            return
+        with self._lock:
+            if key in self._cache:
+                self._cached_bytes -= response_size(self._cache.pop(key)[0])
+            while self._cache and self._cached_bytes + size > SESSION_CACHE_BYTES:
+                oldest = next(iter(self._cache))
+                self._cached_bytes -= response_size(self._cache.pop(oldest)[0])
+            self._cache[key] = (response, owner, now)
+            self._cached_bytes += size
+
+    def prune(self, now: float) -> None:
+        """Forget responses too old to be used."""
+        with self._lock:
+            self._cache = {
+                key: cached
+                for key, cached in self._cache.items()
+                if now - cached[2] <= SESSION_CACHE_SECONDS
+            }
+            self._cached_bytes = sum(
+                response_size(cached[0]) for cached in self._cache.values()
+            )
+
+    def close(self) -> None:
+        """Log out of the idle connections and forget every response."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._cache = {}
+            self._cached_bytes = 0
+        for account, _ in idle:
+            _logout(account)
+
+
+class AccountSession:
+    """The sessions of a mail account, as used by one config entry."""
+
+    def __init__(
+        self, shared: AccountSessions, registry: SessionRegistry = None
+    ) -> None:
+        """Initialize the session of an entry."""
+        self.shared = shared
+        self._registry = registry
+        self._released = False
+        self.reused = False
+        self.hits = 0
+        self.misses = 0
+        self._since = 0.0
+
+    def begin_poll(self, now: float = None) -> None:
+        """Reset the counters for a new poll."""
+        self._since = time.monotonic() if now is None else now
+        self.reused = False
+        self.hits = 0
+        self.misses = 0
+        self.shared.prune(self._since)
+
+    def checkout(self, timeout: float = None) -> Any:
+        """Return an idle connection of the account, None if there is none."""
+        account = self.shared.checkout(timeout)
+        self.reused = account is not None
+        if self.reused:
+            _LOGGER.debug("Reusing a connection to %s", self.shared.key[0])
+        return account
+
+    def checkin(self, account: Any) -> None:
+        """Hand a connection back once the poll is done with it.
+
+        The selected folder is closed first, as the next poll asks the status
+        of its folders and a server need not answer that for the selected
+        one (RFC 3501 6.3.10). Folders are selected read-only, so nothing is
+        expunged.
+        """
+        if getattr(account, "state", None) == "SELECTED":
+            try:
+                response = account.close()
+            except Exception as err:  # pylint: disable=broad-except
+                response = "BAD", [str(err).encode()]
+            if not (isinstance(response, tuple) and response[0] == "OK"):
+                _LOGGER.debug("Error closing the selected folder: %s", response)
+                _logout(account)
+                return
+        self.shared.checkin(account)
+
+    def discard(self, account: Any) -> None:
+        """Log out of a connection that can not be used again."""
+        _logout(account)
+
+    def close(self) -> None:
+        """Let go of the account once the entry unloads.
+
+        The idle connections are logged out once no other entry uses the
+        account.
+        """
+        if self._registry is None:
+            self.shared.close()
+        elif not self._released:
+            self._released = True
+            self._registry.release(self.shared)
+
+    def lookup(self, key: tuple) -> Any:
+        """Return the cached response to a command, None if there is none."""
+        response = self.shared.lookup(key, self, self._since, time.monotonic())
+        if response is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _copy(response)
+
+    def store(self, key: tuple, response: Any) -> None:
+        """Keep the response to a command."""
+        self.shared.store(key, _copy(response), self, time.monotonic())
+
+    def report(self) -> dict:
+        """Return whether the poll reused a connection and its cache use."""
+        return {
+            "reused_connection": self.reused,
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+class SharedAccount:
+    """IMAP account that answers repeated searches and fetches from a cache.
+
+    Responses are kept per folder, so entries reading different folders of
+    the same account do not share them.
+    """
+
+    def __init__(self, account: Any, session: AccountSession, folder: str) -> None:
+        """Wrap an IMAP account."""
+        object.__setattr__(self, "_account", account)
+        object.__setattr__(self, "_session", session)
+        object.__setattr__(self, "_folder", folder)
+        object.__setattr__(self, "_literal", None)
+
+    def __getattr__(self, name: str) -> Any:
+        """Return an attribute of the account, searches and fetches are cached."""
+        value = getattr(self._account, name)
+        if name not in CACHED_COMMANDS:
+            return value
+
+        def command(*args: Any, **kwargs: Any) -> Any:
+            key = (self._folder, name, args, tuple(sorted(kwargs.items())))
+            key += (self._literal,)
+            object.__setattr__(self, "_literal", None)
+            response = self._session.lookup(key)
+            if response is not None:
+                if key[-1] is not None:
+                    # The literal is only sent with a command
+                    self._account.literal = None
+                return response
+            response = value(*args, **kwargs)
+            if isinstance(response, tuple) and response and response[0] == "OK":
+                self._session.store(key, response)
+            return response
+
+        return command
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute on the account, such as the next literal."""
+        if name == "literal":
+            object.__setattr__(self, "_literal", value)
+        setattr(self._account, name, value)
+
+
+class SessionRegistry:
+    """Sessions of every mail account, kept in hass.data[DOMAIN].
+
+    Entries are on the same account when they log into the same host, port,
+    user and security. An account is dropped once the last of its entries
+    closed its session.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the registry."""
+        self._accounts = {}
+        self._lock = threading.Lock()
+
+    def session(self, host: str, port: int, user: str, security: str) -> AccountSession:
+        """Return a session of an account for one config entry."""
+        key = ((host or "").lower(), port, user, security)
+        with self._lock:
+            if key not in self._accounts:
+                self._accounts[key] = AccountSessions(key)
+            shared = self._accounts[key]
+            shared.entries += 1
+        return AccountSession(shared, self)
+
+    def release(self, shared: AccountSessions) -> None:
+        """Let go of an account for one entry, closing it after the last one."""
+        with self._lock:
+            shared.entries -= 1
+            if shared.entries > 0:
+                return
+            if self._accounts.get(shared.key) is shared:
+                del self._accounts[shared.key]
+        _LOGGER.debug("No entry left on %s, closing its sessions", shared.key[0])
+        shared.close()
@@ -0,0 +1,84 @@
+"""Tests for the login circuit breaker."""
+
+import imaplib
+from unittest.mock import patch
+
+from custom_components.mail_and_packages.breaker import (
+    AUTH,
+    NETWORK,
+    THROTTLE,
+    CircuitBreaker,
+    failure_kind,
+)
+
+
+def test_failure_kind():
+    """Test login failures are told apart."""
+    assert failure_kind(imaplib.IMAP4.error("Invalid credentials"), AUTH) == AUTH
+    assert failure_kind(ConnectionRefusedError(111, "refused"), AUTH) == NETWORK
+    assert failure_kind(imaplib.IMAP4.abort("socket error: EOF"), AUTH) == NETWORK
+    assert (
+        failure_kind(imaplib.IMAP4.error("[UNAVAILABLE] Try again later"), AUTH)
+        == THROTTLE
+    )
+    assert failure_kind(Exception("Too many simultaneous connections"), NETWORK) == (
+        THROTTLE
+    )
+    assert failure_kind(Exception("unexpected"), NETWORK) == NETWORK
+
+
+def test_circuit_breaker_backoff(caplog):
+    """Test the backoff doubles with every failure and a probe closes it."""
+    breaker = CircuitBreaker("imap.test.email")
+    assert breaker.allow("user@test.email", 0)
+
+    with patch("random.uniform", return_value=0):
+        assert breaker.failure("user@test.email", NETWORK, 0) == 30
+        assert not breaker.allow("user@test.email", 29)
+        assert breaker.report("user@test.email", 10) == {
+            "state": "open",
+            "kind": NETWORK,
+            "failures": 1,
+            "retry_in": 20,
+        }
+        # Half open, only one poll probes the server
+        assert breaker.allow("user@test.email", 30)
+        assert not breaker.allow("other@test.email", 31)
+        assert breaker.failure("user@test.email", NETWORK, 31) == 60
+    assert "Login to imap.test.email failed (network)" in caplog.text
+    assert not breaker.allow("user@test.email", 90)
+    assert breaker.allow("user@test.email", 91)
+
+    breaker.success("user@test.email")
+    assert breaker.allow("other@test.email", 92)
+    assert breaker.report("user@test.email")["state"] == "closed"
+
+
+def test_circuit_breaker_auth_failure_per_account():
+    """Test a rejected login only stops the account that was rejected."""
+    breaker = CircuitBreaker("imap.test.email")
+    with patch("random.uniform", side_effect=lambda low, high: high):
+        assert breaker.failure("user@test.email", AUTH, 0) == 375
+        for _ in range(10):
+            breaker.failure("user@test.email", AUTH, 0)
+
+    assert not breaker.allow("user@test.email", 3600)
+    assert breaker.allow("other@test.email", 0)
+    assert breaker.report("user@test.email", 0)["retry_in"] == 4500
+    assert breaker.report("other@test.email", 0)["state"] == "closed"
+
+
+def test_circuit_breaker_probe_fails_differently():
+    """Test a probe failing with another kind of failure ends the probe."""
+    breaker = CircuitBreaker("imap.test.email")
+    with patch("random.uniform", return_value=0):
+        breaker.failure("user@test.email", NETWORK, 0)
+        assert breaker.allow("user@test.email", 30)
+        # The server answers again but rejects the login
+        breaker.failure("user@test.email", AUTH, 31)
+
+    assert not breaker.allow("user@test.email", 32)
+    assert breaker.allow("user@test.email", 1000)
+    assert not breaker.allow("other@test.email", 1000)
+    breaker.success("user@test.email")
+    assert breaker.allow("other@test.email", 1001)
@@ -0,0 +1,119 @@
+"""Tests for the poll budget."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from custom_components.mail_and_packages.budget import (
+    MeteredAccount,
+    PollBudget,
+    PollDeadline,
+)
+
+
+def test_metered_account_counts_commands():
+    """Test commands and the bytes they return are counted."""
+    account = MagicMock()
+    account.host = "imap.test.email"
+    account.search.return_value = ("OK", [b"1 2 3"])
+    account.fetch.return_value = ("OK", [(b"1 (RFC822 {5}", b"hello"), b")"])
+    budget = PollBudget()
+    metered = MeteredAccount(account, budget)
+
+    assert metered.host == "imap.test.email"
+    metered.literal = b"subject"
+    assert account.literal == b"subject"
+    assert metered.search(None, "ALL") == ("OK", [b"1 2 3"])
+    metered.fetch("1", "(RFC822)")
+
+    assert budget.commands == 2
+    assert budget.bytes == len(b"1 2 3") + len(b"1 (RFC822 {5}hello)")
+    account.fetch.assert_called_once_with("1", "(RFC822)")
+
+
+def test_metered_account_counts_failed_commands():
+    """Test a command that fails still counts as a round trip."""
+    account = MagicMock()
+    account.fetch.side_effect = OSError("connection reset")
+    budget = PollBudget()
+
+    with pytest.raises(OSError):
+        MeteredAccount(account, budget).fetch("1", "(RFC822)")
+    assert budget.commands == 1
+
+
+def test_metered_account_waits_for_queue():
+    """Test each command waits for its turn on the mail server first."""
+    account = MagicMock()
+    queue = MagicMock()
+    queue.command.side_effect = lambda: account.search.assert_not_called()
+    metered = MeteredAccount(account, None, queue)
+
+    metered.search(None, "ALL")
+    metered.literal = b"subject"
+
+    queue.command.assert_called_once_with()
+    account.search.assert_called_once_with(None, "ALL")
+
+
+def test_poll_budget_defers_optional_work(caplog):
+    """Test optional work is deferred once a limit is reached."""
+    budget = PollBudget(commands=2)
+    assert budget.allows("tracking numbers")
+
+    budget.count(2, 1024)
+    assert budget.exceeded() == ["commands"]
+    assert not budget.allows("tracking numbers")
+    assert not budget.allows("tracking numbers")
+    assert not budget.allows("delivery photos")
+    assert "deferring tracking numbers to the next poll" in caplog.text
+    assert budget.denied == 3
+
+    report = budget.report()
+    assert report["degraded"] is True
+    assert report["deferred"] == ["tracking numbers", "delivery photos"]
+    assert report["commands"] == 2
+    assert report["bytes"] == 1024
+
+    budget.begin_poll()
+    assert budget.allows("tracking numbers")
+    assert budget.report()["degraded"] is False
+
+
+def test_poll_budget_unlimited():
+    """Test limits of 0 never defer any work."""
+    budget = PollBudget(0, 0, 0)
+    budget.count(100000, 1024 * 1024 * 1024)
+    assert budget.exceeded() == []
+    assert budget.allows("delivery photos")
+
+
+def test_poll_deadline_limits_socket_timeout():
+    """Test the socket timeout is cut to the time left until the deadline."""
+    account = MagicMock()
+    deadline = PollDeadline(30)
+    with patch("time.monotonic", return_value=100.0):
+        deadline.begin_poll()
+    with patch("time.monotonic", return_value=120.0):
+        assert deadline.remaining() == 10
+        assert deadline.limit(account)
+    account.sock.settimeout.assert_called_once_with(10)
+
+    with patch("time.monotonic", return_value=129.5):
+        assert deadline.limit(account)
+    account.sock.settimeout.assert_called_with(1)
+
+    with patch("time.monotonic", return_value=131.0):
+        assert deadline.expired()
+        assert not deadline.limit(account)
+
+
+def test_poll_deadline_without_timeout():
+    """Test no deadline is enforced without a timeout."""
+    account = MagicMock()
+    deadline = PollDeadline(None)
+    deadline.begin_poll()
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    assert deadline.limit(account)
+    account.sock.settimeout.assert_not_called()
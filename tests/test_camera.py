@@ -7,8 +7,18 @@ from unittest.mock import MagicMock, mock_open, patch
 import pytest
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.mail_and_packages.camera import MailCam
-from custom_components.mail_and_packages.const import CAMERA, COORDINATOR, DOMAIN
+from custom_components.mail_and_packages.camera import (
+    _IMAGE_CACHE,
+    ImageCache,
+    MailCam,
+)
+from custom_components.mail_and_packages.const import (
+    ATTR_CAMERA_PATHS,
+    CAMERA,
+    COORDINATOR,
+    DOMAIN,
+)
+from custom_components.mail_and_packages.helpers import is_custom_no_mail_image
 from tests.const import FAKE_CONFIG_DATA, FAKE_CONFIG_DATA_CUSTOM_IMG
 
 pytestmark = pytest.mark.asyncio
@@ -247,6 +257,59 @@ async def test_async_camera_image_file_error(
         assert "Could not read camera" in caplog.text
 
 
+async def test_async_camera_image_cached(
+    hass,
+    integration,
+    mock_imap_no_email,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_update_time,
+    mock_copy_overlays,
+    mock_hash_file,
+    mock_getctime_today,
+    mock_update,
+):
+    """Test an unchanged image is served from memory."""
+
+    with patch("os.path.isfile", return_value=True), patch(
+        "os.access", return_value=False
+    ):
+        entry = integration
+
+        cameras = hass.data[DOMAIN][entry.entry_id][CAMERA]
+        m_open = mock_open(read_data=b"GIF89a")
+        with patch("builtins.open", m_open, create=True):
+            first = await cameras[0].async_camera_image()
+            second = await cameras[0].async_camera_image()
+
+        assert first == second == b"GIF89a"
+        assert m_open.call_count == 1
+        assert cameras[0].content_type == "image/gif"
+        _IMAGE_CACHE.invalidate(cameras[0]._file_path)
+
+
+def test_image_cache_evicts_least_recently_used():
+    """Test the image cache stays within its byte budget."""
+    cache = ImageCache(10)
+    cache.put(("a", 1, 4), b"aaaa")
+    cache.put(("b", 1, 4), b"bbbb")
+    assert cache.get(("a", 1, 4)) == b"aaaa"
+
+    cache.put(("c", 1, 4), b"cccc")
+    assert cache.get(("b", 1, 4)) is None
+    assert cache.get(("a", 1, 4)) == b"aaaa"
+
+    cache.put(("a", 1, 4), b"AAAA")
+    assert cache.get(("a", 1, 4)) == b"AAAA"
+
+    cache.put(("d", 1, 11), b"d" * 11)
+    assert cache.get(("d", 1, 11)) is None
+
+    cache.invalidate("c")
+    assert cache.get(("c", 1, 4)) is None
+
+
 async def test_async_on_demand_update(
     hass,
     integration,
@@ -1935,8 +1998,10 @@ async def test_camera_custom_no_mail_image():
 
         # Mock os.path.exists to return True for the custom file
         with patch("os.path.exists", return_value=True):
-            # Test the _is_custom_no_mail_image method
-            result = camera._is_custom_no_mail_image("usps", "images/test.gif")
+            # Test the custom no-mail image check
+            result = is_custom_no_mail_image(
+                camera.config.data, "usps", "images/test.gif"
+            )
 
             # Should return True for custom no-mail image
             assert result is True
@@ -1973,8 +2038,8 @@ async def test_generic_camera_skip_conditions(hass, caplog):
     camera = MailCam(hass, "generic_camera", config, coordinator)
 
     # Mock file existence so it attempts to process
-    with patch("os.path.exists", return_value=True), patch.object(
-        camera, "check_file_path_access"
+    with patch("os.path.exists", return_value=True), patch(
+        "os.access", return_value=True
     ), patch.object(camera, "schedule_update_ha_state"):
 
         await camera.update_file_path()
@@ -1988,8 +2053,8 @@ async def test_generic_camera_skip_conditions(hass, caplog):
     # Update data: Valid image, but still 0 deliveries
     coordinator.data[ATTR_AMAZON_IMAGE] = "package_arrived.jpg"
 
-    with patch("os.path.exists", return_value=True), patch.object(
-        camera, "check_file_path_access"
+    with patch("os.path.exists", return_value=True), patch(
+        "os.access", return_value=True
     ), patch.object(camera, "schedule_update_ha_state"):
 
         await camera.update_file_path()
@@ -2001,16 +2066,15 @@ async def test_generic_camera_skip_conditions(hass, caplog):
     )
 
 
-async def test_camera_fallback_to_recent_file(
+async def test_camera_missing_file_uses_default(
     hass,
     integration,
     mock_imap_no_email,
     caplog,
 ):
-    """Test that camera falls back to the most recent file if specific image is missing."""
+    """Test that camera shows its default image if the published one is missing."""
     entry = integration
 
-    # Setup coordinator data with a file that "doesn't exist"
     coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
     coordinator.data = {
         "amazon_image": "missing_file.jpg",
@@ -2018,41 +2082,24 @@ async def test_camera_fallback_to_recent_file(
         "amazon_delivered": 1,
     }
 
-    # Helper to mock file system state
     def mock_exists_side_effect(path):
-        # The specific file doesn't exist, but the directory does
-        if "missing_file.jpg" in path:
-            return False
-        if "custom_components/mail_and_packages/images/amazon" in path:
-            return True
-        return True
-
-    def mock_getmtime_side_effect(path):
-        if "old.jpg" in path:
-            return 1000
-        if "new.jpg" in path:
-            return 2000
-        return 0
+        return "missing_file.jpg" not in path
 
     with patch("os.path.isfile", return_value=True), patch(
         "os.access", return_value=True
     ), patch("os.path.exists", side_effect=mock_exists_side_effect), patch(
-        "os.listdir", return_value=["old.jpg", "new.jpg"]
-    ), patch(
-        "os.path.getmtime", side_effect=mock_getmtime_side_effect
-    ):
-
-        # Trigger update
+        "os.listdir"
+    ) as mock_listdir:
         cameras = hass.data[DOMAIN][entry.entry_id][CAMERA]
         amazon_camera = next(c for c in cameras if c._type == "amazon_camera")
 
         await amazon_camera.update_file_path()
         await hass.async_block_till_done()
 
-        # Verify it picked the newer file
         state = hass.states.get("camera.mail_amazon_delivery_camera")
-        assert "new.jpg" in state.attributes.get("file_path")
-        assert "found alternative image file" in caplog.text
+        assert state.attributes.get("file_path").endswith("no_deliveries_amazon.jpg")
+        assert "coordinator file not found" in caplog.text
+        mock_listdir.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -2074,3 +2121,58 @@ async def test_camera_service_update_specific_explicit(hass, integration):
 
         # Verify the method was called, confirming lines 175-176 were hit
         mock_update.assert_called_once()
+
+
+async def test_camera_uses_published_paths(hass, integration):
+    """Test that cameras take their image from the paths published by a poll."""
+    entry = integration
+    coordinator = hass.data[DOMAIN][entry.entry_id][COORDINATOR]
+    coordinator.data = {
+        "camera_paths": {"ups_camera": {"path": "/published/ups/delivery.jpg"}},
+    }
+
+    cameras = hass.data[DOMAIN][entry.entry_id][CAMERA]
+    ups_camera = next(c for c in cameras if c._type == "ups_camera")
+    assert ups_camera.should_poll is False
+
+    with patch("os.path.exists") as mock_exists, patch("os.access") as mock_access:
+        await ups_camera.update_file_path()
+        await hass.async_block_till_done()
+
+    state = hass.states.get("camera.mail_ups_camera")
+    assert state.attributes.get("file_path") == "/published/ups/delivery.jpg"
+    mock_exists.assert_not_called()
+    mock_access.assert_not_called()
+
+
+async def test_camera_ignores_stage_updates():
+    """Test the camera only reloads images when a poll published new paths."""
+    mock_coordinator = MagicMock()
+    mock_coordinator.last_update_success = True
+    camera_paths = {"usps_camera": {"path": "/images/mail_today.gif"}}
+    mock_coordinator.data = {"usps_mail": 1, ATTR_CAMERA_PATHS: camera_paths}
+
+    camera = MailCam(
+        hass=MagicMock(),
+        name="usps_camera",
+        config=MagicMock(),
+        coordinator=mock_coordinator,
+    )
+    camera.async_write_ha_state = MagicMock()
+
+    with patch.object(camera, "update_file_path") as mock_update:
+        camera._handle_coordinator_update()
+        assert mock_update.call_count == 1
+
+        # A stage update keeps the camera paths of the last finished poll
+        mock_coordinator.data = {**mock_coordinator.data, "usps_mail": 2}
+        camera._handle_coordinator_update()
+        assert mock_update.call_count == 1
+
+        # A finished poll publishes its own camera paths
+        mock_coordinator.data = {
+            **mock_coordinator.data,
+            ATTR_CAMERA_PATHS: dict(camera_paths),
+        }
+        camera._handle_coordinator_update()
+        assert mock_update.call_count == 2
@@ -29,6 +29,8 @@ from custom_components.mail_and_packages.const import (
     CONF_GENERATE_MP4,
     CONF_GENERIC_CUSTOM_IMG,
     CONF_GENERIC_CUSTOM_IMG_FILE,
+    CONF_SCAN_INTERVAL,
+    CONF_SLOW_SCAN_INTERVAL,
     CONF_STORAGE,
     CONF_UPS_CUSTOM_IMG,
     CONF_UPS_CUSTOM_IMG_FILE,
@@ -7761,3 +7763,20 @@ async def test_validate_user_input_specific_images():
     ):
         errors, _ = await _validate_user_input(user_input)
         assert errors[CONF_FEDEX_CUSTOM_IMG_FILE] == "file_not_found"
+
+
+async def test_validate_slow_scan_interval():
+    """Test the slow scanning interval can not be shorter than the scanning one."""
+    user_input = {
+        CONF_GENERATE_MP4: False,
+        CONF_CUSTOM_IMG: False,
+        CONF_SCAN_INTERVAL: 60,
+        CONF_SLOW_SCAN_INTERVAL: 30,
+    }
+    errors, _ = await _validate_user_input(user_input)
+    assert errors == {CONF_SLOW_SCAN_INTERVAL: "slow_interval_too_short"}
+
+    # 0 follows the scanning interval
+    user_input[CONF_SLOW_SCAN_INTERVAL] = 0
+    errors, _ = await _validate_user_input(user_input)
+    assert errors == {}
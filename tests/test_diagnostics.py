@@ -50,3 +50,28 @@ async def test_device_diagnostics(hass, mock_update):
     result = await async_get_device_diagnostics(hass, entry, None)
 
     assert result == FAKE_UPDATE_DATA_REDACTED
+
+
+@pytest.mark.asyncio
+async def test_config_entry_diagnostics_poll_budget(hass, mock_update):
+    """Test the config entry diagnostics report the poll budget."""
+    budget = {"commands": 12, "degraded": True, "deferred": ["delivery photos"]}
+    mock_update.return_value = {**FAKE_UPDATE_DATA, "poll_budget": budget}
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="imap.test.email",
+        data=FAKE_CONFIG_DATA,
+    )
+
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    result = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert result["poll_budget"] == budget
+    assert result["queue_delay"] is None
+    assert result["change_detection"] is None
+    assert result["host_scheduler"]["polls"] == 1
+    assert result["host_scheduler"]["waiting"] == 0
+    assert result["circuit"]["state"] == "closed"
@@ -0,0 +1,176 @@
+"""Tests for searching several mail folders."""
+
+from unittest.mock import MagicMock
+
+from custom_components.mail_and_packages.folders import FolderAccount, parse_status
+
+
+def _account(statuses: dict) -> MagicMock:
+    """Return an account with a status for each folder."""
+    account = MagicMock()
+    account.capabilities = ("IMAP4REV1", "CONDSTORE")
+    account.status.side_effect = lambda folder, items: statuses[folder]
+    return account
+
+
+def test_parse_status():
+    """Test the items of a STATUS response are read."""
+    response = (
+        "OK",
+        [b'"INBOX" (UIDNEXT 120 UIDVALIDITY 3 MESSAGES 80 HIGHESTMODSEQ 9001)'],
+    )
+    assert parse_status(response) == {
+        "UIDNEXT": 120,
+        "UIDVALIDITY": 3,
+        "MESSAGES": 80,
+        "HIGHESTMODSEQ": 9001,
+    }
+    assert parse_status(("NO", [b"unknown folder"])) is None
+    assert parse_status(("OK", [None])) is None
+
+
+def test_unchanged_folder_not_searched():
+    """Test a folder is only searched again once its status changes."""
+    statuses = {"INBOX": ("OK", [b'"INBOX" (UIDNEXT 120 MESSAGES 80)'])}
+    account = _account(statuses)
+    account.search.return_value = ("OK", [b"4 5"])
+    states = {}
+
+    poll = FolderAccount(account, ["INBOX"], states)
+    assert poll.begin_poll()
+    assert poll.search(None, "(SINCE 01-Jan-2026)") == ("OK", [b"4 5"])
+    account.status.assert_called_with(
+        "INBOX", "(UIDNEXT UIDVALIDITY MESSAGES HIGHESTMODSEQ)"
+    )
+
+    poll = FolderAccount(account, ["INBOX"], states)
+    assert poll.begin_poll()
+    assert poll.report() == {"changed": [], "unchanged": ["INBOX"]}
+    assert poll.search(None, "(SINCE 01-Jan-2026)") == ("OK", [b"4 5"])
+    # A search not run at this status still goes to the server
+    poll.search(None, "(SINCE 02-Jan-2026)")
+    assert account.search.call_count == 2
+    assert account.select.call_count == 2
+
+    statuses["INBOX"] = ("OK", [b'"INBOX" (UIDNEXT 121 MESSAGES 81)'])
+    poll = FolderAccount(account, ["INBOX"], states)
+    assert poll.begin_poll()
+    assert poll.report() == {"changed": ["INBOX"], "unchanged": []}
+    poll.search(None, "(SINCE 01-Jan-2026)")
+    assert account.search.call_count == 3
+
+
+def test_several_folders():
+    """Test the folders are searched as one and fetches go to the right one."""
+    statuses = {
+        "INBOX": ("OK", [b'"INBOX" (MESSAGES 2)']),
+        "Shipping": ("OK", [b'"Shipping" (MESSAGES 1)']),
+        "Missing": ("NO", [b"no such folder"]),
+    }
+    account = _account(statuses)
+    account.search.side_effect = [("OK", [b"1 2"]), ("OK", [b"7"])]
+
+    poll = FolderAccount(account, ["INBOX", "Shipping", "Missing"], {})
+    assert poll.begin_poll()
+    poll.literal = b"Zustellung"
+    assert poll.search("utf-8", "SUBJECT") == ("OK", [b"0.1 0.2 1.7"])
+    assert account.literal == b"Zustellung"
+
+    poll.fetch(b"1.7", "(RFC822)")
+    account.fetch.assert_called_with("7", "(RFC822)")
+    account.select.assert_called_with("Shipping", readonly=True)
+    poll.fetch(b"0.2", "(RFC822)")
+    account.fetch.assert_called_with("2", "(RFC822)")
+    account.select.assert_called_with("INBOX", readonly=True)
+    assert poll.report()["changed"] == ["INBOX", "Shipping"]
+
+
+def test_no_readable_folder(caplog):
+    """Test a poll can not go on without any folder."""
+    account = _account({"INBOX": ("NO", [b"no such folder"])})
+    assert not FolderAccount(account, ["INBOX"], {}).begin_poll()
+    assert "Error selecting folder: INBOX" in caplog.text
+
+
+def test_changed_folder_searched_since_modseq():
+    """Test only what changed is searched and fetched when messages arrive."""
+    statuses = {
+        "INBOX": (
+            "OK",
+            [b'"INBOX" (UIDNEXT 120 UIDVALIDITY 3 MESSAGES 80 HIGHESTMODSEQ 900)'],
+        )
+    }
+    account = _account(statuses)
+    account.search.side_effect = [("OK", [b"4 5"]), ("OK", [b"5 81"])]
+    account.fetch.return_value = ("OK", [(b"4 (RFC822 {5}", b"hello"), b")"])
+    states = {}
+
+    poll = FolderAccount(account, ["INBOX"], states)
+    poll.begin_poll()
+    first = poll.mailbox_state()
+    poll.literal = b"Zustellung"
+    assert poll.search("utf-8", "SUBJECT") == ("OK", [b"4 5"])
+    poll.fetch(b"4", "(RFC822)")
+
+    statuses["INBOX"] = (
+        "OK",
+        [b'"INBOX" (UIDNEXT 121 UIDVALIDITY 3 MESSAGES 81 HIGHESTMODSEQ 905)'],
+    )
+    poll = FolderAccount(account, ["INBOX"], states)
+    poll.begin_poll()
+    assert poll.mailbox_state() != first
+    poll.literal = b"Zustellung"
+    assert poll.search("utf-8", "SUBJECT") == ("OK", [b"4 5 81"])
+    account.search.assert_called_with("utf-8", "MODSEQ 901", "SUBJECT")
+    assert account.literal == b"Zustellung"
+    assert poll.fetch(b"4", "(RFC822)") == account.fetch.return_value
+    poll.fetch(b"4", "(FLAGS)")
+    assert account.fetch.call_count == 2
+
+    # Once a message is expunged the folder is searched and fetched in full
+    statuses["INBOX"] = (
+        "OK",
+        [b'"INBOX" (UIDNEXT 121 UIDVALIDITY 3 MESSAGES 80 HIGHESTMODSEQ 910)'],
+    )
+    account.search.side_effect = [("OK", [b"4 80"])]
+    poll = FolderAccount(account, ["INBOX"], states)
+    poll.begin_poll()
+    poll.literal = b"Zustellung"
+    assert poll.search("utf-8", "SUBJECT") == ("OK", [b"4 80"])
+    account.search.assert_called_with("utf-8", "SUBJECT")
+    poll.fetch(b"4", "(RFC822)")
+    assert account.fetch.call_count == 3
+
+
+def test_mailbox_state_needs_modseq():
+    """Test a mailbox state is only given when every folder has a modseq."""
+    statuses = {
+        "INBOX": ("OK", [b'"INBOX" (MESSAGES 2 HIGHESTMODSEQ 7)']),
+        "Shipping": ("OK", [b'"Shipping" (MESSAGES 1)']),
+    }
+    poll = FolderAccount(_account(statuses), ["INBOX", "Shipping"], {})
+    poll.begin_poll()
+    assert poll.mailbox_state() is None
+
+    poll = FolderAccount(_account(statuses), ["INBOX"], {})
+    poll.begin_poll()
+    assert poll.mailbox_state() == (("INBOX", (("HIGHESTMODSEQ", 7), ("MESSAGES", 2))),)
+
+
+def test_state_moved_on_by_another_entry():
+    """Test a poll does not store what it found at an older status."""
+    statuses = {"INBOX": ("OK", [b'"INBOX" (UIDNEXT 120 MESSAGES 80)'])}
+    account = _account(statuses)
+    account.search.return_value = ("OK", [b"4"])
+    states = {}
+
+    first = FolderAccount(account, ["INBOX"], states)
+    first.begin_poll()
+    statuses["INBOX"] = ("OK", [b'"INBOX" (UIDNEXT 121 MESSAGES 81)'])
+    second = FolderAccount(account, ["INBOX"], states)
+    second.begin_poll()
+
+    first.search(None, "ALL")
+    assert states["INBOX"].searches == {}
+    second.search(None, "ALL")
+    assert list(states["INBOX"].searches.values()) == [("OK", [b"4"])]
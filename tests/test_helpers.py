@@ -1,18 +1,23 @@
 """Tests for helpers module."""
 
 import aiohttp
+import logging
 import os
 import re
 import subprocess
 import tempfile
 from datetime import date, datetime
+from io import BytesIO
 from unittest import mock
 from unittest.mock import MagicMock, call, mock_open, patch
 
 import pytest
 from freezegun import freeze_time
+from PIL import Image
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components.mail_and_packages.breaker import CircuitBreaker
+from custom_components.mail_and_packages.budget import PollBudget
 from custom_components.mail_and_packages.const import (
     ATTR_COUNT,
     ATTR_FEDEX_IMAGE,
@@ -25,6 +30,7 @@ from custom_components.mail_and_packages.const import (
     CONF_AMAZON_CUSTOM_IMG_FILE,
     CONF_FEDEX_CUSTOM_IMG,
     CONF_FEDEX_CUSTOM_IMG_FILE,
+    CONF_SCRATCH_PATH,
     CONF_UPS_CUSTOM_IMG,
     CONF_UPS_CUSTOM_IMG_FILE,
     CONF_WALMART_CUSTOM_IMG,
@@ -38,21 +44,27 @@ from custom_components.mail_and_packages.const import (
     SHIPPERS,
 )
 from custom_components.mail_and_packages.helpers import (
+    FrameStore,
     _check_ffmpeg,
+    _encode_gif,
     _generate_mp4,
+    _stored_image_file_name,
     _generic_delivery_image_extraction,
     amazon_exception,
     amazon_hub,
     amazon_otp,
     amazon_search,
+    camera_file_paths,
     cleanup_images,
     copy_overlays,
+    copy_placeholder,
     default_image_path,
     download_img,
     email_fetch,
     email_search,
     fetch,
     find_text,
+    generate_delivery_gif,
     generate_grid_img,
     get_count,
     get_formatted_date,
@@ -60,13 +72,24 @@ from custom_components.mail_and_packages.helpers import (
     get_mails,
     get_resources,
     hash_file,
+    image_content_type,
     image_file_name,
     login,
+    mirror_images,
     process_emails,
+    publish_bytes,
+    publish_file,
+    resize_image_bytes,
     resize_images,
+    save_animation,
+    scratch_directory,
     selectfolder,
     update_time,
+    write_placeholder,
 )
+from custom_components.mail_and_packages.image_store import ImageStore
+from custom_components.mail_and_packages.sensor_graph import PollSchedule
+from custom_components.mail_and_packages.sessions import SessionRegistry
 from tests.const import (
     FAKE_CONFIG_DATA,
     FAKE_CONFIG_DATA_BAD,
@@ -154,6 +177,285 @@ async def test_process_emails(
     assert result["amazon_packages"] == 0
     assert result["amazon_order"] == []
     assert result["amazon_hub_code"] == []
+    assert set(result["sensor_timings"]) >= set(config["resources"])
+
+
+@pytest.mark.asyncio
+async def test_process_emails_out_of_time(
+    hass,
+    integration,
+    mock_imap_no_email,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_copyfile,
+    mock_copytree,
+    mock_hash_file,
+    mock_getctime_today,
+    caplog,
+):
+    """Test sensors not updated in time keep their last values and are stale."""
+    config = FAKE_CONFIG_DATA_CORRECTED
+    # Every tier is due on every poll
+    schedule = PollSchedule({"fast": 0, "normal": 0, "slow": 0})
+    first = process_emails(hass, config, schedule=schedule)
+    assert first["stale_sensors"] == []
+
+    # Time runs out after the mail folder is selected
+    deadline = MagicMock(seconds=60)
+    deadline.remaining.return_value = 5
+    deadline.limit.side_effect = [True] + [False] * 100
+    deadline.expired.return_value = True
+    result = process_emails(hass, config, schedule=schedule, deadline=deadline)
+
+    assert result["amazon_packages"] == first["amazon_packages"]
+    assert result["mail_updated"] == first["mail_updated"]
+    assert set(result["stale_sensors"]) >= set(config["resources"])
+    assert "Keeping the last value of sensor: usps_mail" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_process_emails_search_timed_out(
+    hass,
+    integration,
+    mock_imap_no_email,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_copyfile,
+    mock_copytree,
+    mock_hash_file,
+    mock_getctime_today,
+):
+    """Test sensors whose searches timed out are stale, not reset to 0."""
+    config = FAKE_CONFIG_DATA_CORRECTED
+    schedule = PollSchedule({"fast": 0, "normal": 0, "slow": 0})
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    with patch(
+        "custom_components.mail_and_packages.helpers.get_items",
+        side_effect=lambda account, param, *args: 3 if param == "count" else [],
+    ):
+        first = process_emails(hass, config, schedule=schedule)
+    assert first["amazon_packages"] == 3
+
+    # The searches time out, which email_search reports as a failed search
+    mock_imap_no_email.search.side_effect = TimeoutError("timed out")
+    deadline = MagicMock(seconds=60)
+    deadline.remaining.return_value = 5
+    deadline.limit.return_value = True
+    deadline.expired.return_value = True
+    result = process_emails(
+        hass, config, schedule=schedule, deadline=deadline, session=session
+    )
+
+    assert result["amazon_packages"] == 3
+    assert "amazon_packages" in result["stale_sensors"]
+    # The connection is not handed to the next poll
+    mock_imap_no_email.logout.assert_called()
+    assert session.checkout() is None
+
+
+@pytest.mark.asyncio
+async def test_process_emails_deferred_work(
+    hass,
+    integration,
+    mock_imap_no_email,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_copyfile,
+    mock_copytree,
+    mock_hash_file,
+    mock_getctime_today,
+):
+    """Test a sensor missing deferred work keeps its last values for a poll."""
+    config = FAKE_CONFIG_DATA_CORRECTED
+    schedule = PollSchedule({"fast": 0, "normal": 0, "slow": 0})
+    budget = PollBudget(commands=1)
+    polls = []
+
+    def fetch_sensor(hass, context, account, data, sensor):
+        values = {sensor: len(polls)}
+        if sensor == "ups_delivering" and len(polls) > 1:
+            budget.allows("tracking numbers")
+        data.update(values)
+        return values
+
+    with patch(
+        "custom_components.mail_and_packages.helpers.fetch_sensor",
+        side_effect=fetch_sensor,
+    ):
+        polls.append(1)
+        process_emails(hass, config, schedule=schedule, budget=budget)
+        polls.append(2)
+        result = process_emails(hass, config, schedule=schedule, budget=budget)
+        assert result["ups_delivering"] == 1
+        assert result["usps_delivering"] == 2
+        assert result["stale_sensors"] == ["ups_delivering"]
+
+        # Not kept for more than one poll in a row
+        polls.append(3)
+        result = process_emails(hass, config, schedule=schedule, budget=budget)
+        assert result["ups_delivering"] == 3
+        assert result["stale_sensors"] == []
+
+
+@pytest.mark.asyncio
+async def test_process_emails_shared_session(
+    hass,
+    integration,
+    mock_imap_no_email,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_copyfile,
+    mock_copytree,
+    mock_hash_file,
+    mock_getctime_today,
+):
+    """Test entries on the same account share a connection and searches."""
+    config = FAKE_CONFIG_DATA_CORRECTED
+    registry = SessionRegistry()
+    first = registry.session("imap.test.email", 993, "user@fake.email", "SSL")
+    second = registry.session("imap.test.email", 993, "user@fake.email", "SSL")
+
+    result = process_emails(hass, config, session=first)
+    assert result["session"]["reused_connection"] is False
+    assert result["session"]["cache_misses"] > 0
+    searches = mock_imap_no_email.search.call_count
+
+    result = process_emails(hass, config, session=second)
+    assert result["session"]["reused_connection"] is True
+    assert result["session"]["cache_hits"] > 0
+    assert mock_imap_no_email.login.call_count == 1
+    assert mock_imap_no_email.search.call_count < searches * 2
+
+
+@pytest.mark.asyncio
+async def test_process_emails_session_error(hass, mock_imap_no_email):
+    """Test a connection left by a failed poll is not handed to the next one."""
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    with patch(
+        "custom_components.mail_and_packages.helpers.process_account",
+        side_effect=OSError("connection reset"),
+    ), pytest.raises(OSError):
+        process_emails(hass, FAKE_CONFIG_DATA_CORRECTED, session=session)
+
+    mock_imap_no_email.logout.assert_called_once()
+    assert session.checkout() is None
+
+
+@pytest.mark.asyncio
+async def test_process_emails_skips_unchanged_mailbox(
+    hass,
+    integration,
+    mock_imap_no_email,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_copyfile,
+    mock_copytree,
+    mock_hash_file,
+    mock_getctime_today,
+):
+    """Test a poll keeps the sensor values while no folder changed."""
+    # CONDSTORE is only listed once logged in
+    mock_imap_no_email.capabilities = ("IMAP4REV1",)
+    mock_imap_no_email.capability.return_value = ("OK", [b"IMAP4rev1 CONDSTORE"])
+    mock_imap_no_email.status.return_value = (
+        "OK",
+        [b'"INBOX" (UIDNEXT 2 UIDVALIDITY 1 MESSAGES 1 HIGHESTMODSEQ 5)'],
+    )
+    config = FAKE_CONFIG_DATA_CORRECTED
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    schedule = PollSchedule({"fast": 5, "normal": 5, "slow": 30})
+
+    with patch("time.monotonic", return_value=0):
+        first = process_emails(hass, config, schedule=schedule, session=session)
+    searches = mock_imap_no_email.search.call_count
+    with patch("time.monotonic", return_value=600):
+        result = process_emails(hass, config, schedule=schedule, session=session)
+
+    assert mock_imap_no_email.search.call_count == searches
+    assert result["change_detection"] == {
+        "polls": 2,
+        "skipped": 1,
+        "skip_rate": 0.5,
+    }
+    assert result["amazon_packages"] == first["amazon_packages"]
+
+
+@pytest.mark.asyncio
+async def test_process_emails_unchanged_mailbox_keeps_images(
+    hass, mock_imap_no_email, tmp_path
+):
+    """Test images of sensors carried forward are not replaced by placeholders."""
+    hass.config.config_dir = str(tmp_path)
+    mock_imap_no_email.capabilities = ("IMAP4REV1",)
+    mock_imap_no_email.capability.return_value = ("OK", [b"IMAP4rev1 CONDSTORE"])
+    mock_imap_no_email.status.return_value = (
+        "OK",
+        [b'"INBOX" (UIDNEXT 2 UIDVALIDITY 1 MESSAGES 1 HIGHESTMODSEQ 5)'],
+    )
+    config = FAKE_CONFIG_DATA_CORRECTED
+    root = f"{hass.config.path()}/{default_image_path(hass, config)}"
+    os.makedirs(os.path.join(root, "amazon"))
+    store = ImageStore(root)
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    schedule = PollSchedule({"fast": 5, "normal": 5, "slow": 30})
+
+    def fetch_sensor(hass, context, account, data, sensor):
+        if sensor == "usps_mail":
+            with open(os.path.join(root, data[ATTR_IMAGE_NAME]), "wb") as file:
+                file.write(b"GIF89a mail")
+        values = {sensor: 2}
+        data.update(values)
+        return values
+
+    with patch(
+        "custom_components.mail_and_packages.helpers.fetch_sensor",
+        side_effect=fetch_sensor,
+    ) as mock_fetch:
+        with patch("time.monotonic", return_value=0):
+            first = process_emails(
+                hass, config, store=store, schedule=schedule, session=session
+            )
+        fetched = mock_fetch.call_count
+        with patch("time.monotonic", return_value=600):
+            result = process_emails(
+                hass, config, store=store, schedule=schedule, session=session
+            )
+
+    assert mock_fetch.call_count == fetched
+    assert result["change_detection"]["skipped"] == 1
+    assert result["usps_mail"] == 2
+    assert result[ATTR_IMAGE_NAME] == first[ATTR_IMAGE_NAME]
+    assert result["image_status"]["usps"]["placeholder"] is False
+    with open(os.path.join(root, result[ATTR_IMAGE_NAME]), "rb") as file:
+        assert file.read() == b"GIF89a mail"
+
+
+@pytest.mark.asyncio
+async def test_process_emails_extra_folders(
+    hass,
+    integration,
+    mock_imap_no_email,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_copyfile,
+    mock_copytree,
+    mock_hash_file,
+    mock_getctime_today,
+):
+    """Test every configured folder is searched."""
+    config = {**FAKE_CONFIG_DATA_CORRECTED, "extra_folders": ['"Shipping"']}
+    result = process_emails(hass, config)
+
+    assert result["folders"]["changed"] == ['"INBOX"', '"Shipping"']
+    assert result["amazon_packages"] == 0
+    mock_imap_no_email.select.assert_any_call('"INBOX"', readonly=True)
+    mock_imap_no_email.select.assert_any_call('"Shipping"', readonly=True)
 
 
 @pytest.mark.asyncio
@@ -513,6 +815,31 @@ async def test_informed_delivery_emails(
         assert "USPS Informed Delivery" in caplog.text
 
 
+@pytest.mark.asyncio
+async def test_informed_delivery_duplicate_digest(
+    mock_imap_usps_informed_digest,
+    mock_osremove,
+    mock_osmakedir,
+    mock_listdir,
+    mock_os_path_splitext,
+    mock_image,
+    mock_resizeimage,
+    mock_copyfile,
+    caplog,
+):
+    """Test a digest that arrives twice only counts its mailpieces once."""
+    mock_imap_usps_informed_digest.search.return_value = ("OK", [b"1 2"])
+    m_open = mock_open()
+    with patch("builtins.open", m_open, create=True):
+        result = get_mails(
+            mock_imap_usps_informed_digest, "./", "5", "mail_today.gif", False
+        )
+    assert result == 3
+    written = [c for c in m_open.call_args_list if c.args[0].endswith(".jpg")]
+    assert len(written) == 3
+    assert "Skipped 3 mailpieces already found today." in caplog.text
+
+
 @pytest.mark.asyncio
 async def test_informed_delivery_forwarded_emails(
     mock_imap_informed_delivery_forwarded_email,
@@ -730,6 +1057,24 @@ async def test_ups_out_for_delivery(hass, mock_imap_ups_out_for_delivery):
     assert result["tracking"] == ["1Z2345YY0678901234"]
 
 
+@pytest.mark.asyncio
+async def test_ups_out_for_delivery_over_budget(hass, mock_imap_ups_out_for_delivery):
+    """Test tracking numbers are deferred once the poll budget is used up."""
+    budget = PollBudget(commands=1)
+    budget.count(1)
+    result = get_count(
+        mock_imap_ups_out_for_delivery,
+        "ups_delivering",
+        True,
+        "./",
+        hass,
+        budget=budget,
+    )
+    assert result["count"] == 1
+    assert result["tracking"] == []
+    assert budget.report()["deferred"] == ["tracking numbers"]
+
+
 @pytest.mark.asyncio
 async def test_usps_delivered(hass, mock_imap_usps_delivered_individual):
     result = get_count(
@@ -1379,6 +1724,43 @@ async def test_login_error(mock_imap_login_error, caplog):
     )
 
 
+@pytest.mark.asyncio
+async def test_login_error_opens_circuit(mock_imap_login_error):
+    breaker = CircuitBreaker("localhost")
+    assert not login(
+        "localhost", 993, "fakeuser", "suchfakemuchpassword", "SSL", breaker=breaker
+    )
+    assert breaker.report("fakeuser")["kind"] == "auth"
+    assert breaker.report("otheruser")["state"] == "closed"
+
+
+@pytest.mark.asyncio
+async def test_login_reads_capabilities_again(mock_imap_no_email):
+    mock_imap_no_email.capabilities = ("IMAP4REV1", "AUTH=PLAIN")
+    mock_imap_no_email.capability.return_value = (
+        "OK",
+        [b"IMAP4rev1 CONDSTORE QRESYNC"],
+    )
+    account = login("localhost", 993, "fakeuser", "suchfakemuchpassword", "SSL")
+    assert account.capabilities == ("IMAP4REV1", "CONDSTORE", "QRESYNC")
+
+    # Capabilities that can not be read again are kept
+    mock_imap_no_email.capability.side_effect = OSError("connection reset")
+    account = login("localhost", 993, "fakeuser", "suchfakemuchpassword", "SSL")
+    assert account.capabilities == ("IMAP4REV1", "CONDSTORE", "QRESYNC")
+
+
+@pytest.mark.asyncio
+async def test_process_emails_circuit_open(hass, mock_imap_no_email, caplog):
+    breaker = CircuitBreaker("imap.test.email")
+    breaker.failure(FAKE_CONFIG_DATA_CORRECTED["username"], "throttle")
+    with patch("custom_components.mail_and_packages.helpers.login") as mock_login:
+        result = process_emails(hass, FAKE_CONFIG_DATA_CORRECTED, breaker=breaker)
+    assert result == {}
+    mock_login.assert_not_called()
+    assert "Not logging into imap.test.email after a throttle failure" in caplog.text
+
+
 @pytest.mark.asyncio
 async def test_selectfolder_list_error(mock_imap_list_error, caplog):
     assert not selectfolder(mock_imap_list_error, "somefolder")
@@ -1441,7 +1823,9 @@ async def test_download_img(
     caplog,
 ):
     m_open = mock_open()
-    with patch("builtins.open", m_open, create=True):
+    with patch("builtins.open", m_open, create=True), patch("os.fsync"), patch(
+        "os.replace"
+    ) as mock_replace:
         await download_img(
             hass,
             "http://fake.website.com/not/a/real/website/image.jpg",
@@ -1449,7 +1833,13 @@ async def test_download_img(
             "testfilename.jpg",
         )
         assert m_open.call_count == 1
-        assert m_open.call_args == call("/fake/directory/amazon/testfilename.jpg", "wb")
+        assert m_open.call_args == call(
+            "/fake/directory/amazon/testfilename.jpg.tmp", "wb"
+        )
+        mock_replace.assert_called_once_with(
+            "/fake/directory/amazon/testfilename.jpg.tmp",
+            "/fake/directory/amazon/testfilename.jpg",
+        )
         assert "URL content-type: image/gif" in caplog.text
         assert "Amazon image downloaded" in caplog.text
 
@@ -2248,7 +2638,9 @@ async def test_walmart_image_extraction(hass):
         "custom_components.mail_and_packages.helpers.os.path.isdir"
     ) as mock_isdir:
         mock_isdir.return_value = True
-        with patch("builtins.open", mock.mock_open()):
+        with patch("builtins.open", mock.mock_open()), patch("os.fsync"), patch(
+            "os.replace"
+        ):
             with patch(
                 "custom_components.mail_and_packages.helpers.os.path.exists",
                 return_value=True,
@@ -2882,7 +3274,9 @@ async def test_fedex_image_extraction(hass):
         "custom_components.mail_and_packages.helpers.os.path.isdir"
     ) as mock_isdir:
         mock_isdir.return_value = True
-        with patch("builtins.open", mock.mock_open()):
+        with patch("builtins.open", mock.mock_open()), patch("os.fsync"), patch(
+            "os.replace"
+        ):
             with patch(
                 "custom_components.mail_and_packages.helpers.os.path.exists",
                 return_value=True,
@@ -3603,7 +3997,7 @@ async def test_zpackages_transit_matches_sum_of_shippers(hass):
     # Amazon packages: 3 in transit
     data["amazon_packages"] = 3
     # Amazon packages delivered by others: 1
-    data["amazon_delivered_by_others"] = 1
+    data["ups_delivered_by_others"] = 1
     with patch(
         "custom_components.mail_and_packages.helpers.default_image_path",
         return_value="test/",
@@ -3624,7 +4018,7 @@ async def test_zpackages_transit_matches_sum_of_shippers(hass):
         amazon_packages = data.get("amazon_packages", 0)
         expected_sum = max(expected_sum, amazon_packages)
         # Subtract Amazon packages delivered by others
-        amazon_delivered_by_others = data.get("amazon_delivered_by_others", 0)
+        amazon_delivered_by_others = data.get("ups_delivered_by_others", 0)
         expected_sum -= amazon_delivered_by_others
         expected_sum = max(0, expected_sum)
         # Verify zpackages_transit matches the expected calculation
@@ -3636,6 +4030,26 @@ async def test_zpackages_transit_matches_sum_of_shippers(hass):
         assert zpackages_transit == 2
 
 
+@pytest.mark.asyncio
+async def test_delivered_by_others_kept_with_sensor(hass):
+    """Test Amazon packages delivered by others are values of the sensor."""
+    mock_account = MagicMock()
+    config = FAKE_CONFIG_DATA.copy()
+    data = {ATTR_IMAGE_NAME: "test.gif", "amazon_image": "test_amazon.jpg"}
+    info = {"count": 2, "tracking": [], "amazon_delivered_by_others": 1}
+
+    with patch(
+        "custom_components.mail_and_packages.helpers.default_image_path",
+        return_value="test/",
+    ), patch(
+        "custom_components.mail_and_packages.helpers.get_count", return_value=info
+    ):
+        assert fetch(hass, config, mock_account, data, "ups_delivered") == 2
+
+    assert data["ups_delivered_by_others"] == 1
+    assert "amazon_delivered_by_others" not in data
+
+
 def test_extract_delivery_image_png(tmp_path):
     """Test extracting a PNG delivery image (e.g. Walmart style)."""
     # Create dummy PNG data (base64)
@@ -3923,3 +4337,375 @@ async def test_process_emails_default_image_copy_errors(hass, integration, caplo
         assert "Error creating default UPS image" in caplog.text
         assert "Error creating default Walmart image" in caplog.text
         assert "Error creating default FedEx image" in caplog.text
+
+
+def test_save_animation_dedupes_frames(tmp_path, caplog):
+    """Test identical consecutive frames are merged and share one palette."""
+    red = Image.new("RGB", (72, 32), (255, 0, 0))
+    blue = Image.new("RGB", (72, 32), (0, 0, 255))
+    gif = str(tmp_path / "mail_today.gif")
+
+    # Debug logging does not encode the animation a second time
+    caplog.set_level(logging.DEBUG)
+    with patch(
+        "custom_components.mail_and_packages.helpers._encode_gif",
+        wraps=_encode_gif,
+    ) as encode:
+        stats = save_animation([red, red.copy(), blue], gif, 5000)
+    encode.assert_called_once()
+
+    assert stats["frames"] == 3
+    assert stats["unique_frames"] == 2
+    assert stats["bytes"] == os.path.getsize(gif)
+    # One frame of two was dropped
+    assert stats["bytes_saved"] == round(stats["bytes"] / 2)
+    assert stats["seconds_saved"] >= 0
+    with Image.open(gif) as result:
+        assert result.n_frames == 2
+        assert result.info["loop"] == 0
+        assert result.info["duration"] == 10000
+        assert result.convert("RGB").getpixel((0, 0)) == (255, 0, 0)
+        result.seek(1)
+        assert result.convert("RGB").getpixel((0, 0)) == (0, 0, 255)
+
+
+@pytest.mark.parametrize(
+    "ext,content_type",
+    [(".gif", "image/gif"), (".webp", "image/webp"), (".png", "image/png")],
+)
+def test_save_animation_formats(tmp_path, ext, content_type):
+    """Test the animation format follows the file extension."""
+    frames = [
+        Image.new("RGB", (72, 32), (255, 0, 0)),
+        Image.new("RGB", (72, 32), (0, 0, 255)),
+    ]
+    path = str(tmp_path / f"mail_today{ext}")
+
+    save_animation(frames, path, 5000)
+
+    with open(path, "rb") as file:
+        assert image_content_type(file.read()) == content_type
+    with Image.open(path) as result:
+        assert result.n_frames == 2
+
+
+def test_copy_placeholder_converts_format(tmp_path):
+    """Test the no mail placeholder is converted to the configured format."""
+    source = os.path.join(
+        os.path.dirname(__file__),
+        "../custom_components/mail_and_packages/mail_none.gif",
+    )
+    target = str(tmp_path / "mail_today.webp")
+
+    copy_placeholder(source, target)
+
+    with open(target, "rb") as file:
+        assert image_content_type(file.read()) == "image/webp"
+
+
+def test_frame_store(tmp_path):
+    """Test frames are stored as JPEG per camera."""
+    store = FrameStore()
+    assert store.get("usps_camera") == ([], 0.0)
+
+    store.set(
+        "usps_camera",
+        [Image.new("RGB", (72, 32), (255, 0, 0)), Image.new("P", (72, 32))],
+        5,
+    )
+    frames, interval = store.get("usps_camera")
+    assert len(frames) == 2
+    assert interval == 5.0
+    assert all(frame.startswith(b"\xff\xd8") for frame in frames)
+
+    path = str(tmp_path / "delivery.jpg")
+    Image.new("RGB", (72, 32), (0, 0, 255)).save(path)
+    assert store.load("generic_camera", [path, str(tmp_path / "missing.jpg")], 3)
+    assert len(store.get("generic_camera")[0]) == 1
+
+    assert not store.load("generic_camera", [str(tmp_path / "missing.jpg")], 3)
+    assert store.get("generic_camera") == ([], 0.0)
+
+    store.clear("usps_camera")
+    assert store.get("usps_camera") == ([], 0.0)
+
+
+def test_resize_image_bytes(tmp_path):
+    """Test images are only ever scaled down and keep their format."""
+    buffer = BytesIO()
+    Image.new("RGB", (400, 200), (255, 0, 0)).save(buffer, format="JPEG")
+    data = buffer.getvalue()
+
+    assert resize_image_bytes(data, 800, 600) is data
+    with Image.open(BytesIO(resize_image_bytes(data, 100))) as result:
+        assert result.format == "JPEG"
+        assert result.size == (100, 50)
+
+    path = str(tmp_path / "mail_today.gif")
+    save_animation(
+        [
+            Image.new("RGB", (400, 200), (255, 0, 0)),
+            Image.new("RGB", (400, 200), (0, 0, 255)),
+        ],
+        path,
+        5000,
+    )
+    with open(path, "rb") as file:
+        data = file.read()
+    with Image.open(BytesIO(resize_image_bytes(data, None, 50))) as result:
+        assert result.format == "GIF"
+        assert result.size == (100, 50)
+        assert result.n_frames == 2
+
+
+async def test_generate_delivery_gif_reuses_unchanged(hass, tmp_path):
+    """Test the delivery animation is only rebuilt when its inputs change."""
+    images = []
+    for name, color in (("amazon.jpg", (255, 0, 0)), ("ups.jpg", (0, 0, 255))):
+        path = str(tmp_path / name)
+        Image.new("RGB", (72, 32), color).save(path)
+        images.append(path)
+    gif_path = str(tmp_path / "generic_deliveries.gif")
+
+    with patch(
+        "custom_components.mail_and_packages.helpers.save_animation",
+        side_effect=lambda frames, path, duration: open(path, "wb").close(),
+    ) as mock_save:
+        assert await generate_delivery_gif(hass, images, gif_path)
+        assert await generate_delivery_gif(hass, images, gif_path)
+        assert mock_save.call_count == 1
+
+        assert await generate_delivery_gif(hass, images[::-1], gif_path)
+        assert mock_save.call_count == 2
+
+
+@freeze_time("2026-10-19")
+def test_stored_image_file_name(tmp_path):
+    """Test image names come from the manifest without rescanning the directory."""
+    store = ImageStore(str(tmp_path))
+    path = str(tmp_path / "amazon")
+    os.makedirs(path)
+    mail_none = os.path.join(
+        os.path.dirname(__file__),
+        "../custom_components/mail_and_packages/no_deliveries_amazon.jpg",
+    )
+
+    with patch("os.listdir") as mock_listdir, patch(
+        "custom_components.mail_and_packages.helpers.copyfile",
+        side_effect=lambda src, dst: open(dst, "wb").close(),
+    ) as mock_copy:
+        name = _stored_image_file_name(
+            store, path, mail_none, "no_deliveries_amazon.jpg", ".jpg", "amazon"
+        )
+        assert name.endswith(".jpg")
+        assert mock_copy.call_count == 1
+
+        # Placeholder already in place, nothing to do
+        assert (
+            _stored_image_file_name(
+                store, path, mail_none, "no_deliveries_amazon.jpg", ".jpg", "amazon"
+            )
+            == name
+        )
+        assert mock_copy.call_count == 1
+
+        # A delivery image from today is kept as it is
+        with open(os.path.join(path, name), "wb") as file:
+            file.write(b"delivery photo")
+        assert (
+            _stored_image_file_name(
+                store, path, mail_none, "no_deliveries_amazon.jpg", ".jpg", "amazon"
+            )
+            == name
+        )
+        assert mock_copy.call_count == 1
+        with open(os.path.join(path, name), "rb") as file:
+            assert file.read() == b"delivery photo"
+
+        # A delivery image from a previous day gets a new name
+        store.get(f"amazon/{name}")["created"] = "18-Oct-2026"
+        new_name = _stored_image_file_name(
+            store, path, mail_none, "no_deliveries_amazon.jpg", ".jpg", "amazon"
+        )
+        assert new_name != name
+        assert mock_copy.call_count == 2
+
+    mock_listdir.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "mode,written,linked",
+    [
+        ("copy", 2, False),
+        ("skip_identical", 1, False),
+        ("hardlink", 0, True),
+        ("symlink", 0, True),
+    ],
+)
+def test_write_placeholder_modes(tmp_path, mode, written, linked):
+    """Test placeholder writes follow the image write mode."""
+    source = tmp_path / "no_deliveries_ups.jpg"
+    source.write_bytes(b"placeholder")
+    os.makedirs(tmp_path / "images" / "ups")
+    target = str(tmp_path / "images" / "ups" / "today.jpg")
+    store = ImageStore(str(tmp_path / "images"), mode)
+
+    write_placeholder(str(source), target, store)
+    write_placeholder(str(source), target, store)
+
+    assert store.bytes_written == written * len(b"placeholder")
+    assert store.bytes_written + store.bytes_avoided == 2 * len(b"placeholder")
+    assert os.path.samefile(source, target) is linked
+    assert store.get("ups/today.jpg")["hash"] == store.digest(str(source))
+
+    # Writing a delivery image must never change the bundled placeholder
+    save_animation([Image.new("RGB", (8, 8))], target, 100)
+    assert source.read_bytes() == b"placeholder"
+
+
+async def test_scratch_directory(hass, tmp_path):
+    """Test intermediate files get a scratch directory per image path."""
+    config = {**FAKE_CONFIG_DATA_CORRECTED, CONF_SCRATCH_PATH: str(tmp_path)}
+    path = scratch_directory(hass, config)
+    assert path.startswith(os.path.join(str(tmp_path), DOMAIN, ""))
+    assert path.endswith("/")
+
+    with patch("os.access", return_value=False):
+        assert scratch_directory(hass, FAKE_CONFIG_DATA_CORRECTED) is None
+    with patch("os.access", return_value=True):
+        assert scratch_directory(hass, FAKE_CONFIG_DATA_CORRECTED).startswith(
+            "/dev/shm/"
+        )
+
+
+def test_resize_images_output_path(tmp_path):
+    """Test resized images can be written to another directory."""
+    source = tmp_path / "mailpiece.jpg"
+    Image.new("RGB", (100, 50)).save(source)
+    os.makedirs(tmp_path / "scratch")
+
+    result = resize_images([str(source)], 724, 320, str(tmp_path / "scratch"))
+
+    assert result == [str(tmp_path / "scratch" / "mailpiece.gif")]
+    with Image.open(result[0]) as img:
+        assert img.size == (724, 320)
+
+
+def test_mirror_images(tmp_path):
+    """Test only changed images are copied to www and stale ones removed."""
+    src = tmp_path / "images"
+    dst = tmp_path / "www"
+    os.makedirs(src / "amazon")
+    (src / "mail_today.gif").write_bytes(b"mail")
+    (src / "amazon" / "delivered.jpg").write_bytes(b"amazon")
+    (src / ".image_manifest.json").write_text("{}")
+
+    assert mirror_images(str(src), str(dst)) == {
+        "copied": 2,
+        "removed": 0,
+        "unchanged": 0,
+    }
+    assert (dst / "amazon" / "delivered.jpg").read_bytes() == b"amazon"
+    assert not (dst / ".image_manifest.json").exists()
+
+    (src / "mail_today.gif").write_bytes(b"new mail")
+    os.remove(src / "amazon" / "delivered.jpg")
+
+    assert mirror_images(str(src), str(dst)) == {
+        "copied": 1,
+        "removed": 1,
+        "unchanged": 0,
+    }
+    assert (dst / "mail_today.gif").read_bytes() == b"new mail"
+    assert os.listdir(dst / "amazon") == []
+    assert mirror_images(str(src), str(dst))["unchanged"] == 1
+
+
+def test_publish_file(tmp_path):
+    """Test images are replaced through a staging file."""
+    target = tmp_path / "today.gif"
+    target.write_bytes(b"old")
+
+    with publish_file(str(target)) as the_file:
+        the_file.write(b"new")
+        assert target.read_bytes() == b"old"
+    assert target.read_bytes() == b"new"
+
+    with pytest.raises(ValueError):
+        with publish_file(str(target)) as the_file:
+            the_file.write(b"partial")
+            raise ValueError
+    assert target.read_bytes() == b"new"
+    assert os.listdir(tmp_path) == ["today.gif"]
+
+    # A link is replaced, the file it points to is left alone
+    source = tmp_path / "bundled.gif"
+    source.write_bytes(b"placeholder")
+    os.remove(target)
+    os.symlink(source, target)
+    publish_bytes(str(target), b"delivery")
+    assert source.read_bytes() == b"placeholder"
+    assert not os.path.islink(target)
+
+
+async def test_camera_file_paths(hass, caplog):
+    """Test the image of every camera is resolved once from the polled data."""
+    config = {
+        "resources": ["amazon_delivered", "ups_delivered"],
+        "ups_custom_img": True,
+        "ups_custom_img_file": "images/test_ups.jpg",
+    }
+    data = {
+        "image_name": "mail_today.gif",
+        "image_path": "images/",
+        "amazon_image": "delivered.jpg",
+        "amazon_delivered": 1,
+        "walmart_image": "missing.jpg",
+        "image_status": {"amazon": {"hash": "abc", "placeholder": False}},
+    }
+
+    def exists(path):
+        return "missing.jpg" not in path
+
+    with patch("os.path.exists", side_effect=exists), patch(
+        "os.access", return_value=True
+    ):
+        paths = camera_file_paths(hass, config, data)
+
+    root = hass.config.path()
+    assert paths["usps_camera"]["path"] == f"{root}/images/mail_today.gif"
+    assert paths["amazon_camera"]["path"] == f"{root}/images/amazon/delivered.jpg"
+    assert paths["ups_camera"]["path"] == "images/test_ups.jpg"
+    assert paths["walmart_camera"]["path"].endswith("no_deliveries_walmart.jpg")
+    assert paths["generic_camera"]["images"] == [f"{root}/images/amazon/delivered.jpg"]
+    assert "walmart camera - coordinator file not found" in caplog.text
+
+    # A placeholder is never animated by the generic camera
+    data["image_status"]["amazon"]["placeholder"] = True
+    with patch("os.path.exists", return_value=True), patch(
+        "os.access", return_value=True
+    ):
+        paths = camera_file_paths(hass, config, data)
+    assert paths["generic_camera"]["images"] == []
+    assert paths["generic_camera"]["path"].endswith("no_deliveries_generic.jpg")
+
+
+def test_generate_mp4_from_webp(tmp_path):
+    """Test ffmpeg reads a GIF when the animation is not a GIF."""
+    frames = [Image.new("RGB", (8, 8), color) for color in ("red", "blue")]
+    save_animation(frames, str(tmp_path / "mail_today.webp"), 1000)
+
+    inputs = []
+
+    def fake_run(cmd, **kwargs):
+        with Image.open(cmd[3]) as img:
+            inputs.append((cmd[3], img.format, img.n_frames))
+
+    with patch(
+        "custom_components.mail_and_packages.helpers.subprocess.run",
+        side_effect=fake_run,
+    ):
+        _generate_mp4(str(tmp_path), "mail_today.webp")
+
+    assert inputs == [(str(tmp_path / "mail_today_ffmpeg.gif"), "GIF", 2)]
+    assert sorted(os.listdir(tmp_path)) == ["mail_today.webp"]
@@ -0,0 +1,200 @@
+"""Tests for the image store."""
+
+import datetime
+import json
+import os
+from unittest.mock import patch
+
+from custom_components.mail_and_packages.const import (
+    IMAGE_ENTRY_MANIFEST,
+    IMAGE_MANIFEST,
+)
+from custom_components.mail_and_packages.image_store import _ENTRIES, ImageStore
+
+
+def test_image_store_manifest_round_trip(tmp_path):
+    """Test recorded images survive a reload of the manifest."""
+    os.makedirs(tmp_path / "amazon")
+    (tmp_path / "amazon" / "first.jpg").write_bytes(b"placeholder")
+    (tmp_path / "amazon" / "second.jpg").write_bytes(b"placeholder")
+
+    store = ImageStore(str(tmp_path))
+    assert store.latest("amazon") is None
+    store.record("amazon/first.jpg", "abc", "amazon", "18-Oct-2026")
+    store.record("amazon/second.jpg", "abc", "amazon", "19-Oct-2026")
+    store.save()
+
+    with open(tmp_path / IMAGE_MANIFEST, encoding="utf-8") as file:
+        assert set(json.load(file)) == {"amazon/first.jpg", "amazon/second.jpg"}
+
+    store = ImageStore(str(tmp_path))
+    assert store.latest("amazon") == "amazon/second.jpg"
+    assert store.latest("ups") is None
+    assert store.get("amazon/first.jpg")["created"] == "18-Oct-2026"
+
+
+def test_image_store_digest_only_hashes_changes(tmp_path):
+    """Test files are only hashed again once they change on disk."""
+    image = tmp_path / "mail.gif"
+    image.write_bytes(b"GIF89a")
+    source = tmp_path.parent / f"{tmp_path.name}_none.gif"
+    source.write_bytes(b"GIF87a")
+
+    store = ImageStore(str(tmp_path))
+    store.record("mail.gif", "placeholder", "usps", "19-Oct-2026")
+
+    with patch(
+        "custom_components.mail_and_packages.image_store._hash_contents",
+        return_value="real",
+    ) as mock_hash:
+        assert store.digest(str(image)) == "placeholder"
+        assert store.digest(str(source)) == "real"
+        assert store.digest(str(source)) == "real"
+        assert mock_hash.call_count == 1
+
+        image.write_bytes(b"GIF89a with mail")
+        assert store.digest(str(image)) == "real"
+        assert store.get("mail.gif")["hash"] == "real"
+        assert mock_hash.call_count == 2
+
+
+def test_image_store_corrupt_manifest(tmp_path):
+    """Test a corrupt manifest starts a new one."""
+    (tmp_path / IMAGE_MANIFEST).write_text("{not json", encoding="utf-8")
+
+    store = ImageStore(str(tmp_path))
+    assert store.latest("usps") is None
+
+
+def test_image_store_status(tmp_path):
+    """Test placeholder images are told apart from real images."""
+    (tmp_path / "mail.gif").write_bytes(b"GIF89a")
+    (tmp_path / "amazon.jpg").write_bytes(b"delivery")
+
+    store = ImageStore(str(tmp_path))
+    store.record("mail.gif", "placeholder", "usps", "19-Oct-2026")
+    store.record("amazon.jpg", "photo", "amazon", "19-Oct-2026")
+    store.set_placeholder("usps", "placeholder")
+    store.set_placeholder("amazon", "placeholder")
+
+    assert store.status(
+        {
+            "usps": str(tmp_path / "mail.gif"),
+            "amazon": str(tmp_path / "amazon.jpg"),
+            "ups": str(tmp_path / "missing.jpg"),
+        }
+    ) == {
+        "usps": {"hash": "placeholder", "placeholder": True},
+        "amazon": {"hash": "photo", "placeholder": False},
+    }
+
+
+def test_image_store_publish_generation(tmp_path):
+    """Test the generation only changes when a published image changes."""
+    store = ImageStore(str(tmp_path))
+    images = {"usps": str(tmp_path / "mail_today.gif")}
+
+    assert store.publish(images, {"usps": {"hash": "a"}}) == 1
+    assert store.publish(images, {"usps": {"hash": "a"}}) == 1
+    assert store.publish(images, {"usps": {"hash": "b"}}) == 2
+    assert store.publish({"usps": str(tmp_path / "other.gif")}, {}) == 3
+
+
+def test_image_store_collect(tmp_path):
+    """Test images no longer in use are removed once past the history."""
+    os.makedirs(tmp_path / "ups")
+    for name in ("old.jpg", "yesterday.jpg", "today.jpg"):
+        (tmp_path / "ups" / name).write_bytes(b"delivery")
+    (tmp_path / IMAGE_MANIFEST).write_text("{}", encoding="utf-8")
+    today = datetime.date(2026, 10, 19)
+
+    store = ImageStore(str(tmp_path))
+    store.record("ups/old.jpg", "a", "ups", "10-Oct-2026")
+    store.record("ups/yesterday.jpg", "b", "ups", "18-Oct-2026")
+    store.record("ups/today.jpg", "c", "ups", "19-Oct-2026")
+    store.begin_poll()
+
+    with patch("os.listdir") as mock_listdir:
+        assert store.collect([], 2, today) == 1
+        mock_listdir.assert_not_called()
+    assert sorted(os.listdir(tmp_path / "ups")) == ["today.jpg", "yesterday.jpg"]
+    assert store.get("ups/old.jpg") is None
+
+    # Images in use are kept whatever their age
+    store.track(str(tmp_path / "ups" / "today.mp4"), "ups_mp4", "19-Oct-2026")
+    assert store.collect([str(tmp_path / "ups" / "yesterday.jpg")], 0, today) == 1
+    assert os.listdir(tmp_path / "ups") == ["yesterday.jpg"]
+    assert store.get("ups/today.mp4") is not None
+
+
+def test_image_store_adopts_existing_images(tmp_path):
+    """Test images written before the manifest existed are collected too."""
+    os.makedirs(tmp_path / "amazon")
+    (tmp_path / "amazon" / "leftover.jpg").write_bytes(b"delivery")
+    (tmp_path / "mail_today.gif").write_bytes(b"GIF89a")
+    (tmp_path / "overlay.png").write_bytes(b"overlay")
+
+    store = ImageStore(str(tmp_path))
+    store.begin_poll()
+    assert (
+        store.collect([str(tmp_path / "mail_today.gif")], 0, datetime.date.today()) == 1
+    )
+    assert not (tmp_path / "amazon" / "leftover.jpg").exists()
+    assert (tmp_path / "overlay.png").exists()
+
+
+def test_image_store_shared_directory(tmp_path):
+    """Test an entry never removes the images of another entry."""
+    os.makedirs(tmp_path / "ups")
+    for name in ("first.jpg", "second.jpg", "leftover.jpg"):
+        (tmp_path / "ups" / name).write_bytes(b"delivery")
+    today = datetime.date(2026, 10, 19)
+
+    first = ImageStore(str(tmp_path), entry_id="first")
+    second = ImageStore(str(tmp_path), entry_id="second")
+    second.record("ups/second.jpg", "b", "ups", "10-Oct-2026")
+    second.save()
+    assert (tmp_path / IMAGE_ENTRY_MANIFEST.format("second")).exists()
+
+    # The first entry adopts the images already there, but keeps the
+    # image of the second entry
+    first.begin_poll()
+    first.record("ups/first.jpg", "a", "ups", "10-Oct-2026")
+    assert first.collect([str(tmp_path / "ups" / "first.jpg")], 0, today) == 1
+    assert sorted(os.listdir(tmp_path / "ups")) == ["first.jpg", "second.jpg"]
+    first.save()
+
+    second.begin_poll()
+    assert second.collect([str(tmp_path / "ups" / "second.jpg")], 0, today) == 0
+    assert sorted(os.listdir(tmp_path / "ups")) == ["first.jpg", "second.jpg"]
+    second.save()
+
+    # Images another entry only adopted do not keep an image
+    first.begin_poll()
+    assert first.collect([], 0, today) == 1
+    assert os.listdir(tmp_path / "ups") == ["second.jpg"]
+
+
+def test_image_store_remove(tmp_path):
+    """Test a deleted entry takes its images and manifest along."""
+    os.makedirs(tmp_path / "ups")
+    for name in ("first.jpg", "both.jpg"):
+        (tmp_path / "ups" / name).write_bytes(b"delivery")
+
+    first = ImageStore(str(tmp_path), entry_id="first")
+    second = ImageStore(str(tmp_path), entry_id="second")
+    first.record("ups/first.jpg", "a", "ups", "19-Oct-2026")
+    first.record("ups/both.jpg", "b", "ups", "19-Oct-2026")
+    first.save()
+    second.record("ups/both.jpg", "b", "ups", "19-Oct-2026")
+    second.save()
+
+    # Unloading the entry keeps its images
+    first.close()
+    assert _ENTRIES[second.path] == {"second"}
+
+    removed = ImageStore(str(tmp_path), entry_id="first")
+    assert removed.remove() == 1
+    assert os.listdir(tmp_path / "ups") == ["both.jpg"]
+    assert not (tmp_path / IMAGE_ENTRY_MANIFEST.format("first")).exists()
+    assert _ENTRIES[second.path] == {"second"}
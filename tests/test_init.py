@@ -1,5 +1,6 @@
 """Tests for init."""
 
+from datetime import timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -314,6 +315,95 @@ async def test_coordinator_binary_sensor_update_usps_hash_comparison():
             assert coordinator._data["usps_update"] is True
 
 
+@pytest.mark.asyncio
+async def test_coordinator_binary_sensor_update_image_status():
+    """Test binary sensors use the image status from the image pipeline."""
+    mock_hass = MagicMock()
+    mock_config = FAKE_CONFIG_DATA.copy()
+
+    # Patch frame.report_usage to avoid "Frame helper not set up" error
+    with patch("homeassistant.helpers.frame.report_usage"):
+        coordinator = MailDataUpdateCoordinator(mock_hass, mock_config)
+        coordinator._data = {
+            "image_name": "test_image.gif",
+            "image_path": "custom_components/mail_and_packages/images/",
+            "image_status": {
+                "usps": {"hash": "hash1", "placeholder": False},
+                "amazon": {"hash": "hash2", "placeholder": True},
+            },
+        }
+        mock_hass.async_add_executor_job = AsyncMock()
+
+        with patch("os.path.exists") as mock_exists:
+            await coordinator._binary_sensor_update()
+
+        assert coordinator._data["usps_update"] is True
+        assert coordinator._data["amazon_update"] is False
+        mock_exists.assert_not_called()
+        mock_hass.async_add_executor_job.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_coordinator_publish_stage():
+    """Test sensor values are published as each stage of an update finishes."""
+    mock_hass = MagicMock()
+    mock_config = FAKE_CONFIG_DATA.copy()
+
+    # Patch frame.report_usage to avoid "Frame helper not set up" error
+    with patch("homeassistant.helpers.frame.report_usage"):
+        coordinator = MailDataUpdateCoordinator(mock_hass, mock_config)
+        coordinator.async_set_updated_data = MagicMock()
+
+        # Nothing to update before the first update finished
+        coordinator._async_publish_stage({"amazon_otp": 1})
+        coordinator.async_set_updated_data.assert_not_called()
+
+        coordinator._data = {"amazon_otp": 0, "usps_mail": 3}
+        coordinator._publish_stage({"amazon_otp": 1})
+        mock_hass.loop.call_soon_threadsafe.assert_called_once_with(
+            coordinator._async_publish_stage, {"amazon_otp": 1}
+        )
+        coordinator._async_publish_stage({"amazon_otp": 1})
+        coordinator.async_set_updated_data.assert_called_once_with(
+            {"amazon_otp": 1, "usps_mail": 3}
+        )
+
+
+@pytest.mark.asyncio
+async def test_coordinator_keeps_stale_data():
+    """Test the last values are kept as stale when nothing could be fetched."""
+    mock_hass = MagicMock()
+    mock_hass.async_add_executor_job = AsyncMock(return_value={})
+    mock_config = FAKE_CONFIG_DATA.copy()
+
+    # Patch frame.report_usage to avoid "Frame helper not set up" error
+    with patch("homeassistant.helpers.frame.report_usage"):
+        coordinator = MailDataUpdateCoordinator(mock_hass, mock_config)
+        coordinator._data = {"usps_mail": 3}
+
+        data = await coordinator._async_update_data()
+
+    assert data["usps_mail"] == 3
+    assert data["stale_sensors"] == mock_config["resources"]
+    args = mock_hass.async_add_executor_job.call_args[0]
+    assert args[-2:] == (coordinator.breaker, coordinator.session)
+
+
+@pytest.mark.asyncio
+async def test_coordinator_slow_tier_follows_scan_interval():
+    """Test the slow tier never polls more often than the scanning interval."""
+    mock_config = {**FAKE_CONFIG_DATA, "scan_interval": 60, "slow_scan_interval": 30}
+
+    with patch("homeassistant.helpers.frame.report_usage"):
+        coordinator = MailDataUpdateCoordinator(MagicMock(), mock_config)
+        assert coordinator.schedule.intervals["slow"] == 60
+        assert coordinator.interval == timedelta(minutes=60)
+
+        del mock_config["slow_scan_interval"]
+        coordinator = MailDataUpdateCoordinator(MagicMock(), mock_config)
+        assert coordinator.schedule.intervals["slow"] == 60
+
+
 @pytest.mark.asyncio
 async def test_coordinator_binary_sensor_update_amazon_hash_comparison():
     """Test coordinator binary sensor update for Amazon hash comparison."""
@@ -0,0 +1,87 @@
+"""Tests for the host scheduler."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.mail_and_packages.scheduler import (
+    HostQueue,
+    HostScheduler,
+    TokenBucket,
+)
+
+
+def test_token_bucket():
+    """Test commands wait once the burst is used up."""
+    bucket = TokenBucket(rate=2, burst=2)
+    assert bucket.reserve(100.0) == 0
+    assert bucket.reserve(100.0) == 0
+    assert bucket.reserve(100.0) == 0.5
+    assert bucket.reserve(100.0) == 1.0
+    # Tokens come back at the rate, up to the burst
+    assert bucket.reserve(110.0) == 0
+    assert TokenBucket(rate=0, burst=0).reserve() == 0
+
+
+def test_host_queue_command_wait():
+    """Test the time commands waited for a token is counted."""
+    queue = HostQueue(TokenBucket(rate=10, burst=0), 1.5)
+    with patch("time.sleep") as mock_sleep:
+        queue.command()
+    assert mock_sleep.call_count == 1
+    assert queue.command_wait == pytest.approx(mock_sleep.call_args[0][0])
+    assert queue.report()["poll"] == 1.5
+
+
+@pytest.mark.asyncio
+async def test_host_scheduler_staggers_polls():
+    """Test polls of the same host start apart, other hosts do not wait."""
+    scheduler = HostScheduler(spacing=15, jitter=0)
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    with patch("time.monotonic", return_value=100.0), patch(
+        "asyncio.sleep", side_effect=sleep
+    ):
+        async with scheduler.session("imap.test.email") as queue:
+            assert queue.waited == 0
+        async with scheduler.session("IMAP.test.email"):
+            pass
+        async with scheduler.session("imap.test.email"):
+            pass
+        async with scheduler.session("imap.other.email"):
+            pass
+        # The first refresh of an entry is not staggered
+        async with scheduler.session("imap.test.email", stagger=False):
+            pass
+
+    assert delays == [15, 30]
+    assert scheduler.report("imap.test.email")["polls"] == 4
+    assert scheduler.report("imap.other.email")["polls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_host_scheduler_caps_sessions():
+    """Test no more polls of a host run at once than it has sessions."""
+    scheduler = HostScheduler(sessions=1, spacing=0)
+    running = []
+    order = []
+
+    async def poll(name):
+        async with scheduler.session("imap.test.email", stagger=False):
+            running.append(name)
+            assert len(running) == 1
+            await asyncio.sleep(0.01)
+            order.append(name)
+            running.remove(name)
+
+    await asyncio.gather(poll("first"), poll("second"))
+
+    assert order == ["first", "second"]
+    report = scheduler.report("imap.test.email")
+    assert report["polls"] == 2
+    assert report["waiting"] == 0
+    assert report["max_delay"] > 0
@@ -0,0 +1,230 @@
+"""Tests for the sensor dependency graph."""
+
+import threading
+
+from custom_components.mail_and_packages.sensor_graph import (
+    PollSchedule,
+    SensorGraph,
+    compile_graph,
+)
+
+RESOURCES = (
+    "amazon_packages",
+    "ups_packages",
+    "usps_delivered",
+    "zpackages_delivered",
+    "zpackages_transit",
+)
+
+
+def test_sensor_graph_dependencies():
+    """Test dependencies are added and every sensor comes after its own."""
+    graph = SensorGraph(RESOURCES)
+
+    assert graph.graph["ups_packages"] == ("ups_delivering", "ups_delivered")
+    assert graph.graph["ups_delivering"] == ("ups_delivered",)
+    assert graph.graph["zpackages_delivered"] == ("ups_delivered", "usps_delivered")
+    assert set(graph.graph["zpackages_transit"]) == {
+        "ups_delivering",
+        "ups_delivered",
+        "usps_delivered",
+        "amazon_packages",
+    }
+    assert sorted(graph.order) == sorted(graph.graph)
+    for sensor, dependencies in graph.graph.items():
+        for dependency in dependencies:
+            assert graph.order.index(dependency) < graph.order.index(sensor)
+    assert set(graph.batches[0]) == {
+        "amazon_packages",
+        "ups_delivered",
+        "usps_delivered",
+    }
+
+
+def test_compile_graph_cached():
+    """Test the graph is only built once for the same sensors."""
+    assert compile_graph(RESOURCES) is compile_graph(RESOURCES)
+
+
+def test_sensor_graph_run_once_each(caplog):
+    """Test each sensor is computed once and failures skip their dependents."""
+    graph = SensorGraph(RESOURCES)
+    data = {"usps_delivered": 1}
+    calls = []
+
+    def compute(sensor):
+        calls.append(sensor)
+        if sensor == "ups_delivered":
+            raise ValueError("no connection")
+        data[sensor] = 1
+
+    timings = graph.run(compute, data)
+
+    assert sorted(calls) == [
+        "amazon_packages",
+        "ups_delivered",
+        "zpackages_delivered",
+        "zpackages_transit",
+    ]
+    assert set(timings) == set(calls)
+    assert "Error updating sensor: ups_delivered reason: no connection" in caplog.text
+    assert (
+        "Error updating sensor: ups_packages reason: ups_delivered, ups_delivering"
+        in caplog.text
+    )
+    assert "ups_packages" not in data
+
+
+def test_sensor_graph_run_parallel():
+    """Test independent sensors can run on several threads."""
+    graph = SensorGraph(RESOURCES)
+    data = {}
+    lock = threading.Lock()
+    threads = set()
+
+    def compute(sensor):
+        for dependency in graph.graph[sensor]:
+            assert dependency in data
+        with lock:
+            threads.add(threading.get_ident())
+            data[sensor] = 1
+
+    timings = graph.run(compute, data, workers=3)
+
+    assert set(timings) == set(graph.graph)
+    assert set(data) == set(graph.graph)
+    assert threading.get_ident() not in threads
+
+
+def test_poll_schedule_tiers():
+    """Test only due sensors are fetched and the others carried forward."""
+    graph = SensorGraph(("amazon_hub", "amazon_packages", "zpackages_transit"))
+    schedule = PollSchedule({"fast": 5, "normal": 10, "slow": 30})
+    assert schedule.tick == 5
+
+    def poll(now):
+        data = {}
+        schedule.begin_poll(now)
+        carried = schedule.carry(graph, data)
+        for sensor in graph.order:
+            if sensor not in data:
+                data[sensor] = now
+                schedule.remember(sensor, {sensor: now})
+        return carried, data
+
+    assert poll(0) == (
+        [],
+        {"amazon_hub": 0, "amazon_packages": 0, "zpackages_transit": 0},
+    )
+    # Only the fast tier is due
+    carried, data = poll(300)
+    assert set(carried) == {"amazon_packages", "zpackages_transit"}
+    assert data == {"amazon_hub": 300, "amazon_packages": 0, "zpackages_transit": 0}
+    # The normal tier is due, within half a poll of its interval
+    carried, data = poll(590)
+    assert carried == ["amazon_packages"]
+    assert data["zpackages_transit"] == 590
+    # The slow tier is due once its interval has passed
+    schedule.begin_poll(1800)
+    assert schedule.due_tiers == {"fast", "normal", "slow"}
+
+
+def test_poll_schedule_new_day():
+    """Test every tier is due on the first poll of a new day."""
+    schedule = PollSchedule({"fast": 5, "normal": 10, "slow": 30})
+    assert schedule.begin_poll(0, day="18-Oct") == {"fast", "normal", "slow"}
+    assert schedule.begin_poll(300, day="18-Oct") == {"fast"}
+    assert schedule.begin_poll(600, day="19-Oct") == {"fast", "normal", "slow"}
+    assert schedule.begin_poll(900, day="19-Oct") == {"fast"}
+
+
+def test_poll_schedule_retries_failed_sensor():
+    """Test a sensor that failed is fetched again on the next poll."""
+    graph = SensorGraph(("amazon_packages",))
+    schedule = PollSchedule({"fast": 5, "normal": 5, "slow": 30})
+
+    schedule.begin_poll(0)
+    assert schedule.carry(graph, {}) == []
+    schedule.begin_poll(300)
+    assert schedule.carry(graph, {}) == []
+    schedule.remember("amazon_packages", {"amazon_packages": 2, "amazon_order": []})
+
+    data = {}
+    schedule.begin_poll(600)
+    assert schedule.carry(graph, data) == ["amazon_packages"]
+    assert data == {"amazon_packages": 2, "amazon_order": []}
+
+
+def test_sensor_graph_stages():
+    """Test sensors that write images run in later stages, after the others."""
+    graph = SensorGraph(
+        (
+            "amazon_otp",
+            "usps_mail",
+            "ups_packages",
+            "dhl_delivering",
+            "zpackages_transit",
+        )
+    )
+
+    assert set(graph.stages[0]) == {"amazon_otp", "dhl_delivered", "dhl_delivering"}
+    assert set(graph.stages[1]) == {
+        "ups_delivered",
+        "ups_delivering",
+        "ups_packages",
+        "zpackages_transit",
+    }
+    assert graph.stages[2] == ("usps_mail",)
+
+    data = {}
+    published = []
+    graph.run(
+        lambda sensor: data.update({sensor: 0}),
+        data,
+        on_stage=lambda number: published.append((number, set(data))),
+    )
+    assert [number for number, _ in published] == [0, 1, 2]
+    assert published[0][1] == set(graph.stages[0])
+
+
+def test_poll_schedule_restores_stale_sensor():
+    """Test a sensor that could not be updated keeps its last values."""
+    graph = SensorGraph(("amazon_packages",))
+    schedule = PollSchedule({"fast": 5, "normal": 5, "slow": 30})
+
+    data = {}
+    assert not schedule.restore("amazon_packages", data)
+    assert data == {}
+
+    schedule.begin_poll(0)
+    schedule.remember("amazon_packages", {"amazon_packages": 2, "amazon_order": []})
+    assert schedule.restore("amazon_packages", data)
+    assert data == {"amazon_packages": 2, "amazon_order": []}
+
+    # Stale sensors are fetched again on the next poll, even if not due
+    schedule.begin_poll(300)
+    assert schedule.carry(graph, {}) == []
+    schedule.remember("amazon_packages", {"amazon_packages": 1, "amazon_order": []})
+    schedule.begin_poll(600)
+    assert schedule.carry(graph, {}) == ["amazon_packages"]
+
+
+def test_poll_schedule_skips_unchanged_mailbox():
+    """Test sensors keep their values while the mailbox stays the same."""
+    graph = SensorGraph(("amazon_hub", "zpackages_transit"))
+    schedule = PollSchedule({"fast": 5, "normal": 5, "slow": 30})
+
+    schedule.begin_poll(0, mailbox="9001")
+    schedule.remember("amazon_hub", {"amazon_hub": 1})
+    schedule.remember("zpackages_transit", {"zpackages_transit": 2})
+
+    data = {}
+    assert schedule.begin_poll(300, mailbox="9001") == set()
+    assert schedule.carry(graph, data) == ["amazon_hub", "zpackages_transit"]
+    assert data == {"amazon_hub": 1, "zpackages_transit": 2}
+    # Not even once their interval has passed
+    assert schedule.begin_poll(1800, mailbox="9001") == set()
+    assert schedule.begin_poll(2100, mailbox="9002") == {"fast", "normal", "slow"}
+    # Without a state only the intervals count
+    assert schedule.begin_poll(2400) == {"fast", "normal"}
+    assert schedule.report() == {"polls": 5, "skipped": 2, "skip_rate": 0.4}
@@ -0,0 +1,160 @@
+"""Tests for the shared IMAP sessions."""
+
+from unittest.mock import MagicMock, patch
+
+from custom_components.mail_and_packages.sessions import (
+    SessionRegistry,
+    SharedAccount,
+)
+
+
+def test_session_registry_same_account():
+    """Test entries on the same account share its sessions."""
+    registry = SessionRegistry()
+    first = registry.session("imap.test.email", 993, "user@test.email", "SSL")
+    second = registry.session("IMAP.test.email", 993, "user@test.email", "SSL")
+    other = registry.session("imap.test.email", 993, "other@test.email", "SSL")
+
+    assert first is not second
+    assert first.shared is second.shared
+    assert other.shared is not first.shared
+
+
+def test_session_registry_release():
+    """Test an account is only closed once its last entry unloads."""
+    registry = SessionRegistry()
+    first = registry.session("imap.test.email", 993, "user@test.email", "SSL")
+    second = registry.session("imap.test.email", 993, "user@test.email", "SSL")
+    account = MagicMock()
+    first.checkin(account)
+
+    first.close()
+    first.close()
+    account.logout.assert_not_called()
+    assert second.checkout() is account
+    second.checkin(account)
+
+    second.close()
+    account.logout.assert_called_once()
+    third = registry.session("imap.test.email", 993, "user@test.email", "SSL")
+    assert third.shared is not second.shared
+
+
+def test_session_pool():
+    """Test idle connections are reused while they still answer."""
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    assert session.checkout() is None
+    assert not session.report()["reused_connection"]
+
+    account = MagicMock()
+    session.checkin(account)
+    assert session.checkout(5) is account
+    account.sock.settimeout.assert_called_once_with(5)
+    account.noop.assert_called_once()
+    assert session.report()["reused_connection"]
+
+    # A connection that stopped answering is dropped
+    account.noop.side_effect = OSError("connection reset")
+    session.checkin(account)
+    assert session.checkout() is None
+
+    # So is one left idle for too long, and one more than the pool holds
+    stale, spare = MagicMock(), MagicMock()
+    with patch("time.monotonic", return_value=0):
+        session.checkin(stale)
+    session.checkin(MagicMock())
+    session.checkin(MagicMock())
+    session.checkin(spare)
+    spare.logout.assert_called_once()
+    session.close()
+    stale.logout.assert_called_once()
+    assert session.checkout() is None
+
+
+def test_session_checkin_closes_folder():
+    """Test connections go back to the pool with no folder selected."""
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    account = MagicMock(state="SELECTED")
+    account.close.return_value = ("OK", [b"CLOSE completed"])
+    session.checkin(account)
+    account.close.assert_called_once()
+    assert session.checkout() is account
+
+    # A connection whose folder can not be closed is logged out
+    account.close.side_effect = OSError("connection reset")
+    session.checkin(account)
+    account.logout.assert_called_once()
+    assert session.checkout() is None
+
+
+def test_shared_account_cache():
+    """Test identical searches are done once for every entry on the account."""
+    registry = SessionRegistry()
+    first = registry.session("imap.test.email", 993, "user", "SSL")
+    second = registry.session("imap.test.email", 993, "user", "SSL")
+    account = MagicMock()
+    account.search.return_value = ("OK", [b"1 2"])
+
+    first.begin_poll()
+    assert SharedAccount(account, first, "INBOX").search(None, "ALL") == (
+        "OK",
+        [b"1 2"],
+    )
+    second.begin_poll()
+    assert SharedAccount(account, second, "INBOX").search(None, "ALL") == (
+        "OK",
+        [b"1 2"],
+    )
+    assert SharedAccount(account, second, "Archive").search(None, "ALL")
+    assert account.search.call_count == 2
+    assert second.report() == {
+        "reused_connection": False,
+        "cache_hits": 1,
+        "cache_misses": 1,
+    }
+
+    # An entry never reuses what it fetched on an earlier poll
+    first.begin_poll()
+    SharedAccount(account, first, "Archive").search(None, "ALL")
+    SharedAccount(account, first, "INBOX").search(None, "ALL")
+    assert account.search.call_count == 3
+
+
+def test_shared_account_literal():
+    """Test searches with a literal are cached by it and do not leave it set."""
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    session.begin_poll()
+    account = MagicMock()
+    account.search.return_value = ("OK", [b"3"])
+    shared = SharedAccount(account, session, "INBOX")
+
+    shared.literal = "Zustellung".encode("utf-8")
+    shared.search("utf-8", "SUBJECT")
+    shared.literal = "Zustellung".encode("utf-8")
+    shared.search("utf-8", "SUBJECT")
+    assert account.literal is None
+    shared.literal = "Paket".encode("utf-8")
+    shared.search("utf-8", "SUBJECT")
+
+    assert account.search.call_count == 2
+    # Failed commands are not cached
+    account.fetch.return_value = ("NO", [b"failed"])
+    shared.fetch("1", "(RFC822)")
+    shared.fetch("1", "(RFC822)")
+    assert account.fetch.call_count == 2
+
+
+def test_session_cache_size_limit():
+    """Test the oldest responses are forgotten once the cache is full."""
+    session = SessionRegistry().session("imap.test.email", 993, "user", "SSL")
+    session.begin_poll()
+    account = MagicMock()
+    account.fetch.side_effect = lambda num, parts: ("OK", [b"x" * 6])
+    shared = SharedAccount(account, session, "INBOX")
+
+    with patch("custom_components.mail_and_packages.sessions.SESSION_CACHE_BYTES", 10):
+        shared.fetch("1", "(RFC822)")
+        shared.fetch("2", "(RFC822)")
+        shared.fetch("2", "(RFC822)")
+        shared.fetch("1", "(RFC822)")
+    assert account.fetch.call_count == 3